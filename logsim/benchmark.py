@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Time the core Logic Simulator data structures as the problem size grows.
+
+Used in the Logic Simulator project to check that the cost of the most
+frequently called operations stays flat (or linear) as netlists get larger.
+
+Usage
+-----
+Run every benchmark: benchmark.py
+Run selected benchmarks: benchmark.py names [...]
+"""
+import contextlib
+import io
+import random
+import sys
+import time
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+
+def time_per_call(function, calls):
+    """Return the average time in microseconds of calling function()."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bench_names(sizes=(1000, 10000, 100000, 1000000, 2000000)):
+    """Time Names.query and Names.lookup as the names table grows.
+
+    With the name_ids index both costs should stay flat as the table grows.
+    """
+    print("names: table size, query (us), lookup (us)")
+    names = Names()
+    for size in sizes:
+        names.lookup(["N" + str(i) for i in range(len(names.names), size)])
+        # Query a name at the end of the table, the worst case for a scan
+        last_name = "N" + str(size - 1)
+        query_time = time_per_call(lambda: names.query(last_name), 10000)
+        lookup_time = time_per_call(lambda: names.lookup([last_name]), 10000)
+        print(f"{size:>10} {query_time:>10.3f} {lookup_time:>10.3f}")
+
+
+def build_network(num_devices, seed=0):
+    """Return names, devices and network for a random acyclic netlist.
+
+    One in ten devices is a switch. The rest are 2-input AND gates whose
+    inputs are connected to randomly chosen earlier devices.
+    """
+    rng = random.Random(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    device_ids = names.lookup(["D" + str(i) for i in range(num_devices)])
+    [I1, I2] = names.lookup(["I1", "I2"])
+    num_switches = max(2, num_devices // 10)
+    for i, device_id in enumerate(device_ids):
+        if i < num_switches:
+            devices.make_device(device_id, devices.SWITCH, rng.randrange(2))
+        else:
+            devices.make_device(device_id, devices.AND, 2)
+            for input_id in [I1, I2]:
+                source_id = device_ids[rng.randrange(i)]
+                network.make_connection(source_id, None, device_id, input_id)
+    return names, devices, network
+
+
+def bench_devices(sizes=(1000, 10000, 100000)):
+    """Time Devices.get_device and Network.execute_network against size.
+
+    get_device should stay flat, and one execute_network cycle should grow
+    linearly with the number of devices.
+    """
+    print("devices: devices, get_device (us), execute_network (ms)")
+    for size in sizes:
+        names, devices, network = build_network(size)
+        last_id = devices.devices_list[-1].device_id
+        get_time = time_per_call(lambda: devices.get_device(last_id), 10000)
+        cycle_time = time_per_call(network.execute_network, 3) / 1000
+        print(f"{size:>10} {get_time:>10.3f} {cycle_time:>10.1f}")
+
+
+def bench_engines(sizes=(1000, 10000, 100000), cycles=20):
+    """Time a low-activity simulation cycle with each network engine.
+
+    One switch is flipped every cycle, so only its fanout cone changes. The
+    event-driven engine should grow with that cone, not the netlist size.
+    """
+    print("engines: devices, cycle time (ms) for iterative, levelized, "
+          "event-driven, vectorized")
+    for size in sizes:
+        times = []
+        for engine in range(4):
+            names, devices, network = build_network(size)
+            if not network.set_engine(engine):  # NumPy is not installed
+                times.append(float("nan"))
+                continue
+            network.execute_network()  # compile and settle
+            switch_id = devices.find_devices(devices.SWITCH)[0]
+
+            def flip_and_execute():
+                device = devices.get_device(switch_id)
+                devices.set_switch(switch_id, 1 - device.switch_state)
+                network.execute_network()
+
+            times.append(time_per_call(flip_and_execute, cycles) / 1000)
+        print(f"{size:>10}" + "".join(f" {t:>10.2f}" for t in times))
+
+
+def build_definition(num_connections, seed=0):
+    """Return the text of a random acyclic definition file.
+
+    The circuit is the same as in build_network, with one 2-input AND gate
+    for every two connections, and the last gate is monitored.
+    """
+    rng = random.Random(seed)
+    num_gates = num_connections // 2
+    num_switches = max(2, num_gates // 10)
+    lines = ["DEVICES {"]
+    lines.extend("    S" + str(i) + " = SWITCH(" + str(rng.randrange(2)) +
+                 ");" for i in range(num_switches))
+    lines.extend("    G" + str(i) + " = AND(2);" for i in range(num_gates))
+    lines.append("}")
+    lines.append("CONNECTIONS {")
+    sources = ["S" + str(i) for i in range(num_switches)]
+    for i in range(num_gates):
+        for pin in ["I1", "I2"]:
+            lines.append("    " + rng.choice(sources) + " -> G" + str(i) +
+                         "." + pin + ";")
+        sources.append("G" + str(i))
+    lines.append("}")
+    lines.append("MONITOR { G" + str(num_gates - 1) + "; }")
+    return "\n".join(lines) + "\n"
+
+
+def bench_parser(sizes=(25000, 50000, 100000, 200000)):
+    """Time Parser.parse_network against the number of connections.
+
+    Every device and connection is checked against the ones declared before
+    it, so the time per connection should stay flat as the file grows.
+    """
+    print("parser: connections, parse (s), per connection (us)")
+    for size in sizes:
+        text = build_definition(size)
+        names = Names()
+        devices = Devices(names)
+        network = Network(names, devices)
+        monitors = Monitors(names, devices, network)
+        scanner = Scanner(text.encode(), names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parse_network()
+        parse_time = time.perf_counter() - start
+        print(f"{size:>10} {parse_time:>10.2f} "
+              f"{parse_time / size * 1e6:>10.2f}")
+
+
+BENCHMARKS = {"names": bench_names, "devices": bench_devices,
+              "engines": bench_engines, "parser": bench_parser}
+
+
+def main(arg_list):
+    """Run the benchmarks named in arg_list, or all of them if it is empty."""
+    selected = arg_list if arg_list else list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print("Error: unknown benchmark " + name)
+            print("Available: " + ", ".join(BENCHMARKS))
+            sys.exit()
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -51,7 +51,8 @@ class Devices:
     """Make and store devices.
 
     This class contains many functions for making devices and ports.
-    It stores all the devices in a list.
+    It stores all the devices in a list, and indexes them by device ID and by
+    device kind in dictionaries.
 
     Parameters
     ----------
@@ -62,7 +63,7 @@ class Devices:
     get_device(self, device_id): Returns the Device object corresponding
                                  to the device ID.
 
-    find_devices(self, device_kind=None): Returns a list of device_ids of
+    find_devices(self, device_kind=None): Returns a tuple of device_ids of
                                           the specified device_kind.
 
     add_device(self, device_id, device_kind): Adds the specified device to the
@@ -94,7 +95,8 @@ class Devices:
 
     make_d_type(self, device_id): Makes a D-type device.
 
-    cold_startup(self): Simulates cold start-up of D-types and clocks.
+    cold_startup(self, rng=random): Simulates cold start-up of D-types and
+                                    clocks.
 
     make_device(self, device_id, device_kind, device_property=None): Creates
                        the specified device and returns errors if unsuccessful.
@@ -106,6 +108,11 @@ class Devices:
         self.names = names
 
         self.devices_list = []
+        self.devices_dictionary = {}  # {device_id: Device}
+        self.kind_dictionary = {}  # {device_kind: [device_id, ...]}
+        # Tuples returned by find_devices, cleared when a device is added
+        self.found_devices = {}  # {device_kind: (device_id, ...)}
+        self.startup_count = 0  # number of cold start-ups so far
 
         gate_strings = ["AND", "OR", "NAND", "NOR", "XOR"]
         device_strings = ["CLOCK","SIGGEN", "SWITCH", "DTYPE"]
@@ -130,31 +137,38 @@ class Devices:
         self.max_gate_inputs = 16
 
     def get_device(self, device_id):
-        """Return the Device object corresponding to device_id."""
-        for device in self.devices_list:
-            if device.device_id == device_id:
-                return device
-        return None
+        """Return the Device object corresponding to device_id.
+
+        Return None if there is no such device.
+        """
+        return self.devices_dictionary.get(device_id)
 
     def find_devices(self, device_kind=None):
-        """Return a list of device IDs of the specified device_kind.
+        """Return a tuple of device IDs of the specified device_kind.
 
-        Return a list of all device IDs in the network if no device_kind is
-        specified.
+        Return a tuple of all device IDs in the network if no device_kind is
+        specified. The tuple is cached until the next device is added.
         """
-        device_id_list = []
-        for device in self.devices_list:
+        device_id_tuple = self.found_devices.get(device_kind)
+        if device_id_tuple is None:
             if device_kind is None:
-                device_id_list.append(device.device_id)
-            elif device.device_kind == device_kind:
-                device_id_list.append(device.device_id)
-        return device_id_list
+                device_id_tuple = tuple(device.device_id
+                                        for device in self.devices_list)
+            else:
+                device_id_tuple = tuple(
+                    self.kind_dictionary.get(device_kind, []))
+            self.found_devices[device_kind] = device_id_tuple
+        return device_id_tuple
 
     def add_device(self, device_id, device_kind):
         """Add the specified device to the network."""
         new_device = Device(device_id)
         new_device.device_kind = device_kind
         self.devices_list.append(new_device)
+        self.devices_dictionary[device_id] = new_device
+        self.kind_dictionary.setdefault(device_kind, []).append(device_id)
+        self.found_devices.pop(device_kind, None)
+        self.found_devices.pop(None, None)
 
     def add_input(self, device_id, input_id):
         """Add the specified input to the specified device.
@@ -271,26 +285,28 @@ class Devices:
             self.add_output(device_id, output_id)
         self.cold_startup()  # D-type initialised to a random state
 
-    def cold_startup(self):
+    def cold_startup(self, rng=random):
         """Simulate cold start-up of D-types and clocks.
 
         Set the memory of the D-types to a random state and make the clocks
-        begin from a random point in their cycles.
+        begin from a random point in their cycles. rng is the source of
+        random numbers, by default the random module, or a random.Random()
+        instance to leave the random module's state alone.
         """
+        self.startup_count += 1
         for device in self.devices_list:
             if device.device_kind == self.D_TYPE:
-                device.dtype_memory = random.choice([self.LOW, self.HIGH])
+                device.dtype_memory = rng.choice([self.LOW, self.HIGH])
 
             elif device.device_kind == self.CLOCK:
-                clock_signal = random.choice([self.LOW, self.HIGH])
+                clock_signal = rng.choice([self.LOW, self.HIGH])
                 self.add_output(device.device_id, output_id=None,
                                 signal=clock_signal)
                 # Initialise it to a random point in its cycle.
-                device.clock_counter = \
-                    random.randrange(device.clock_half_period)
-                
+                device.clock_counter = rng.randrange(device.clock_half_period)
+
             elif device.device_kind == self.SIGGEN:
-                # Initialise it to a random point in its cycle.
+                # Start the pattern from its first element
                 device.clock_counter = 0
                 # Set the first signal to the first value in the list
                 self.add_output(device.device_id, output_id=None,
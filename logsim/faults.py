@@ -0,0 +1,193 @@
+"""Simulate stuck-at faults in bit-parallel groups.
+
+Used in the Logic Simulator project to find which stuck-at faults on device
+pins are detected at the monitored outputs by a given stimulus.
+
+Classes
+-------
+FaultSimulator - simulates groups of faulty networks next to the good one.
+"""
+from parallel import ParallelSimulator
+
+
+class FaultSimulator:
+
+    """Simulate groups of faulty networks next to the good one.
+
+    A fault is a (device_id, port_id, stuck_value) tuple, where port_id is
+    one of the device's outputs or inputs. Faults are simulated in groups
+    using parallel.ParallelSimulator: pattern 0 is the good network and
+    pattern i is the network with the i-th fault of the group. Every
+    pattern gets the same stimulus and starts from the current device
+    states, so one pass of the compiled schedule simulates the whole group.
+
+    Faults are injected with FORCE instructions. A fault on an input pin
+    forces the copy of the signal that pin reads, and a fault on an output
+    forces the copies read by every input it is connected to. A fault is
+    detected when a monitored output differs from the good network at the
+    end of a cycle.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+
+    Public methods
+    --------------
+    list_faults(self): Returns every stuck-at fault on a device pin.
+
+    get_fault_name(self, fault): Returns the name string of a fault.
+
+    load_faults(self, faults): Builds the program for one group of faults.
+
+    simulate(self, stimulus, cycles, faults=None, group_size=1024):
+                 Returns the cycle each fault was first detected at.
+    """
+
+    def __init__(self, names, devices, network, monitors):
+        """Initialise the fault simulator."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+        self.simulator = ParallelSimulator(names, devices, network, monitors)
+
+        self.base_program = []  # the program without FORCE instructions
+        self.pin_count = 0  # number of forced input pin slots
+        # observed stores {(device_id, output_id): [stuck_low, stuck_high]}
+        # for the monitored outputs with faults in the current group
+        self.observed = {}
+        self.oscillating_faults = []  # undetected faults that oscillated
+
+    def list_faults(self):
+        """Return every stuck-at fault on a device output or input pin."""
+        faults = []
+        for device in self.devices.devices_list:
+            for port_id in list(device.outputs) + list(device.inputs):
+                for stuck_value in [self.devices.LOW, self.devices.HIGH]:
+                    faults.append((device.device_id, port_id, stuck_value))
+        return faults
+
+    def get_fault_name(self, fault):
+        """Return the name string of the specified fault."""
+        (device_id, port_id, stuck_value) = fault
+        return "".join([self.devices.get_signal_name(device_id, port_id),
+                        " stuck-at-", str(stuck_value)])
+
+    def load_faults(self, faults):
+        """Build the program for one group of faults.
+
+        Fault i of the group is given pattern i + 1.
+        """
+        devices = self.devices
+        simulator = self.simulator
+        pin_masks = {}  # {(device_id, input_id): [stuck_low, stuck_high]}
+        self.observed = {}
+        for index, (device_id, port_id, stuck_value) in enumerate(faults):
+            bit = 1 << (index + 1)
+            device = devices.get_device(device_id)
+            if port_id in device.inputs:
+                pins = [(device_id, port_id)]
+            else:
+                pins = self.network.fanout.get((device_id, port_id), [])
+                if (device_id, port_id) in self.monitors.monitors_dictionary:
+                    masks = self.observed.setdefault((device_id, port_id),
+                                                     [0, 0])
+                    masks[stuck_value] |= bit
+            for pin in pins:
+                pin_masks.setdefault(pin, [0, 0])[stuck_value] |= bit
+
+        program = []
+        first_pin_slot = len(simulator.slot_index)
+        self.pin_count = 0
+        for instruction, (device, gate) in zip(self.base_program,
+                                               self.network.pass_order):
+            (code, slot, operands) = instruction
+            if gate is not None:
+                input_ids = list(device.inputs)
+                first_input = 0
+            elif code == simulator.D_TYPE:
+                input_ids = devices.dtype_input_ids
+                first_input = 2  # after the Q and QBAR slots
+            else:
+                program.append(instruction)
+                continue
+
+            operands = list(operands)
+            for position, input_id in enumerate(input_ids, first_input):
+                masks = pin_masks.get((device.device_id, input_id))
+                if masks is not None:
+                    pin_slot = first_pin_slot + self.pin_count
+                    self.pin_count += 1
+                    program.append((simulator.FORCE, pin_slot,
+                                    (operands[position], masks[0],
+                                     masks[1])))
+                    operands[position] = pin_slot
+            program.append((code, slot, tuple(operands)))
+        simulator.program = program
+
+    def simulate(self, stimulus, cycles, faults=None, group_size=1024):
+        """Simulate the faults for the specified number of cycles.
+
+        stimulus is a {device_id: setting} dictionary of switch states and
+        signal generator lists, as for ParallelSimulator.set_patterns. If
+        faults is None, every fault from list_faults() is simulated.
+
+        Return a {fault: cycle} dictionary with the cycle each fault was
+        first detected at, or None if it was not detected. Return None if
+        the network cannot be compiled or the good network oscillates.
+        """
+        simulator = self.simulator
+        if faults is None:
+            faults = self.list_faults()
+        if not simulator.compile():
+            return None
+        self.base_program = simulator.program
+        self.oscillating_faults = []
+
+        detected_cycles = {}
+        for start in range(0, len(faults), group_size):
+            group = faults[start:start + group_size]
+            self.load_faults(group)
+            simulator.load_state(len(group) + 1)
+            simulator.values.extend([0] * self.pin_count)
+            simulator.edges.extend([0] * self.pin_count)
+            simulator.set_patterns([stimulus] * (len(group) + 1))
+            all_patterns = simulator.all_patterns
+
+            detected = 0
+            oscillating = 0
+            for cycle in range(cycles):
+                unsettled = simulator.execute_network()
+                if unsettled & 1:  # the good network oscillates
+                    simulator.program = self.base_program
+                    return None
+                oscillating |= unsettled
+                for device_id, output_id in self.monitors.monitors_dictionary:
+                    value, edge = simulator.get_signal_word(device_id,
+                                                            output_id)
+                    [stuck_low, stuck_high] = self.observed.get(
+                        (device_id, output_id), [0, 0])
+                    value = (value & ~stuck_low) | stuck_high
+                    edge &= ~(stuck_low | stuck_high)
+                    # Spread the good network's bits across the word
+                    good_value = -(value & 1) & all_patterns
+                    good_edge = -(edge & 1) & all_patterns
+                    new = ((value ^ good_value) | (edge ^ good_edge)) & \
+                        ~detected
+                    detected |= new
+                    while new:
+                        pattern = new.bit_length() - 1
+                        detected_cycles[group[pattern - 1]] = cycle
+                        new &= ~(1 << pattern)
+                if detected == all_patterns - 1:  # every fault detected
+                    break
+
+            for index, fault in enumerate(group, 1):
+                if (oscillating & ~detected) >> index & 1:
+                    self.oscillating_faults.append(fault)
+
+        simulator.program = self.base_program
+        return {fault: detected_cycles.get(fault) for fault in faults}
@@ -82,6 +82,7 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         self.h_scroll = h_scroll
         self.v_scroll = v_scroll
         self.oscilliscope_mode = False
+        self.oscilloscope_length = 10  # most recent cycles shown
 
         self.SetBackgroundStyle(wx.BG_STYLE_CUSTOM)
         self.SetVirtualSize((800, 600))  # initial virtual size
@@ -171,9 +172,45 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                 y_base = height - padding_y - (j + 0) * signal_height - 50 
             y_high = y_base + signal_height//2
 
-            for i, sig in enumerate(trace):
-                x = padding_x + i * x_step
-                x_next = padding_x+ (i + 1) * x_step
+            # Only the cycles in view are drawn
+            width = self.GetClientSize().width
+            first = max(0, int((-self.pan_x / self.zoom - padding_x) // x_step))
+            last = min(len(trace), int(((width - self.pan_x) / self.zoom
+                                        - padding_x) // x_step) + 2)
+            last = max(first, last)
+
+            # When zoomed out, draw about one min/max bucket per pixel. For
+            # SPILL and RING storage the buckets are worked out from the
+            # cycles in view, otherwise they come from the level-of-detail
+            # pyramid, which is only made the first time it is needed.
+            buckets = self.monitors.get_buckets(*key, first, last, width)
+            if buckets is not None:
+                samples = []
+                for low, high, start, stop in buckets:
+                    x = padding_x + start * x_step
+                    x_next = padding_x + stop * x_step
+                    if low > high:  # only BLANK cycles
+                        continue
+                    y_low = y_high if low else y_base
+                    y_top = y_high if high else y_base
+                    GL.glVertex2f(x, y_low)
+                    GL.glVertex2f(x, y_top)
+                    GL.glVertex2f(x_next, y_top)
+                    GL.glVertex2f(x_next, y_low)
+            # Run-length traces are drawn one run at a time
+            elif hasattr(trace, "runs"):
+                samples = trace.runs()
+            else:
+                # Byte traces are read through a zero-copy view
+                if hasattr(trace, "view"):
+                    signals = trace.view(first, last)
+                else:
+                    signals = trace[first:last]
+                samples = [(sig, i, i + 1)
+                           for i, sig in enumerate(signals, first)]
+            for sig, start, stop in samples:
+                x = padding_x + start * x_step
+                x_next = padding_x + stop * x_step
                 y = int(sig)
                 if y == 0:
                     y = y_base
@@ -182,6 +219,7 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                 GL.glVertex2f(x, y)
                 GL.glVertex2f(x_next, y)
             GL.glEnd()
+            x_next = padding_x + len(trace) * x_step
 
             # Draw time axis below trace
             GL.glColor3f(0.6, 0.6, 0.6)
@@ -191,14 +229,19 @@ class MyGLCanvas(wxcanvas.GLCanvas):
             GL.glVertex2f(x_next, axis_y)
             GL.glEnd()
 
-            # Draw ticks and labels
-            for i in range(len(trace)+1):
+            # Draw ticks and labels in view, about one per 50 pixels when
+            # zoomed out. RING traces are labelled with the cycles they keep.
+            tick_step = 1
+            if buckets is not None:
+                tick_step = max(1, (last - first) // max(1, width // 50))
+            first_cycle = self.monitors.get_first_cycle(*key)
+            for i in range(first - first % tick_step, last + 1, tick_step):
                 tick_x = padding_x + i * x_step
                 GL.glBegin(GL.GL_LINES)
                 GL.glVertex2f(tick_x, axis_y - 3)
                 GL.glVertex2f(tick_x, axis_y + 3)
                 GL.glEnd()
-                self.render_text(str(i), tick_x - 5, axis_y - 15)
+                self.render_text(str(first_cycle + i), tick_x - 5, axis_y - 15)
 
 
             # Draw device name to the left of trace
@@ -212,8 +255,9 @@ class MyGLCanvas(wxcanvas.GLCanvas):
     def render_oscilliscope(self, height, signal_height, x_step, padding_x, padding_y, num_signals):
         # Draw a all trace signals
         j = 0
-        for key in self.monitors.oscilloscope_buffer:
-            trace = self.monitors.oscilloscope_buffer[key]
+        for key in self.monitors.monitors_dictionary:
+            trace = self.monitors.get_recent_signals(
+                *key, self.oscilloscope_length)
             GL.glColor3f(0.0, 0.0, 1.0)
             GL.glBegin(GL.GL_LINE_STRIP)
 
@@ -562,7 +606,6 @@ class Gui(wx.Frame):
     def on_oscilliscope_button(self, event): 
         self.canvas.oscilliscope_mode = not self.canvas.oscilliscope_mode
         if self.canvas.oscilliscope_mode: 
-            self.monitors.oscilloscope_buffer.clear()
             self.oscilloscope_timer.Start(1000)
             #self.oscilliscope_button.SetBackgroundColour('dark grey')
             self.oscilliscope_button.SetBackgroundColour(wx.Colour(80, 80, 80))  # dark grey
@@ -579,8 +622,17 @@ class Gui(wx.Frame):
         self.oscilliscope_button.Refresh()
 
     def on_oscilloscope_tick(self, event):
-        self.network.execute_network()
-        self.monitors.record_oscilloscope_signals(maxlen=10)
+        """Run and record one cycle, or stop the oscilloscope on an error."""
+        if not self.network.execute_network():
+            if self.canvas.oscilliscope_mode:
+                self.on_oscilliscope_button(event)  # stops the timer
+            self.network_oscillating()
+            return
+        self.monitors.record_signals()
+        # Keep the count in step, so monitors added later are padded to
+        # the same length as the others
+        self.cycles += 1
+        self.cycles_completed += 1
         self.canvas.Refresh()
 
     def populate_side_sizer(self):
@@ -734,6 +786,8 @@ class Gui(wx.Frame):
                 self.run_command(text[1])
             elif text[0] == "c":
                 self.continue_command(text[1])
+            elif text[0] == "e":
+                self.edge_command(text[1])
             else:
                 self.invalid_command()    
         elif len(text) == 3:
@@ -759,13 +813,12 @@ class Gui(wx.Frame):
         with open("Help.txt", "r") as file:
             help_text = file.read()
         self.output_text.SetLabel("")
-        help_text = _("User commands:\n    r N       - run the simulation for N cycles\n    c N       - continue the simulation for N cycles\n    s X N     - set switch X to N (0 or 1)\n    m X       - set a monitor on signal X\n    z X       - zap the monitor on signal X\n    h         - help (this command)\n    q         - quit the program")
+        help_text = _("User commands:\n    r N       - run the simulation for N cycles\n    c N       - continue the simulation for N cycles\n    s X N     - set switch X to N (0 or 1)\n    m X       - set a monitor on signal X\n    z X       - zap the monitor on signal X\n    e X       - show the edges of monitor X\n    h         - help (this command)\n    q         - quit the program")
         wx.MessageBox(help_text, _("Help"), wx.ICON_INFORMATION | wx.OK)
 
     def monitor_command(self, text):
         """Set the specified monitor."""
         monitor = self.read_signal_name(text)
-        max_len = 10 if self.canvas.oscilliscope_mode else None
         if monitor is None:
             self.invalid_device_id()
             return
@@ -774,7 +827,7 @@ class Gui(wx.Frame):
             if port is not None:
                 [port] = self.names.lookup([port])
             monitor_error = self.monitors.make_monitor(device, port,
-                                                       self.cycles_completed,max_len)
+                                                       self.cycles_completed)
             if monitor_error == self.monitors.NO_ERROR:
                 self.successful_command()
                 self.populate_side_sizer()  # Refresh the side sizer to reflect changes
@@ -799,6 +852,28 @@ class Gui(wx.Frame):
                 self.unsuccessful_command()
         self.continue_command("0")
     
+    def edge_command(self, text):
+        """Show the edges of the specified monitor, using the transition index."""
+        monitor = self.read_signal_name(text)
+        if monitor is None:
+            return
+        [device, port] = monitor
+        if port is not None:
+            [port] = self.names.lookup([port])
+        key = (device, port)
+        if key not in self.monitors.monitors_dictionary:
+            self.unsuccessful_command()
+            return
+        index = self.monitors.index_transitions()
+        lines = [_("{} rising and {} falling edges").format(
+            index.count_edges(key, True), index.count_edges(key, False))]
+        for rising, edge_text in [(True, _("First rising edge at cycle {}")),
+                                  (False, _("First falling edge at cycle {}"))]:
+            edge = index.first_edge(key, rising)
+            if edge is not None:
+                lines.append(edge_text.format(edge))
+        self.output_text.SetLabel("\n".join(lines))
+
     def run_command(self, N):
         """Run the simulation from scratch."""
         if not(N.isdigit()):
@@ -817,15 +892,18 @@ class Gui(wx.Frame):
 
         Return True if succesful.
         """
+        self.monitors.reserve(N)
         for _ in range(N):
             if self.network.execute_network():
-                if self.canvas.oscilliscope_mode:
-                    self.monitors.record_oscilloscope_signals(maxlen=10)
-                else:
-                    self.monitors.record_signals()
+                self.monitors.record_signals()
+            else:
+                self.canvas.render()
+                self.network_oscillating()
+                return False
 
         self.canvas.render()
         self.successful_command()
+        return True
 
     def continue_command(self, N):
         """Continue the simulation for N more cycles."""
@@ -925,6 +1003,10 @@ class Gui(wx.Frame):
         """Display an error message for empty input."""
         self.output_text.SetLabel(_("No command entered.\n Enter 'h' for help."))
 
+    def network_oscillating(self):
+        """Display an error message for a network that did not settle."""
+        self.output_text.SetLabel(_("Error! Network oscillating."))
+
     def successful_command(self):
         """Display a success message."""
         self.output_text.SetLabel(_("Command executed successfully."))
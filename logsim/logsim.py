@@ -9,7 +9,14 @@ Usage
 Show help: logsim.py -h
 Command line user interface: logsim.py -c <file path>
 Graphical user interface: logsim.py <file path>
+Select the simulation engine: logsim.py -e <engine> [-c] <file path>
+Select how traces are stored: logsim.py -s <storage> [-c] <file path>
+Truth table of a combinational network: logsim.py -t <file path> [-o <output>]
+Write monitored signals to a VCD file: logsim.py -v <VCD file> [-c] <file path>
+
+A file path of - reads the definition from standard input.
 """
+import contextlib
 import getopt
 import sys
 
@@ -23,6 +30,8 @@ from scanner import Scanner
 from parse import Parser
 from userint import UserInterface
 from gui import Gui
+from parallel import ParallelSimulator
+from vcd import VcdWriter
 import builtins
 
 
@@ -35,36 +44,128 @@ def main(arg_list):
     usage_message = ("Usage:\n"
                      "Show help: logsim.py -h\n"
                      "Command line user interface: logsim.py -c <file path>\n"
-                     "Graphical user interface: logsim.py <file path>")
+                     "Graphical user interface: logsim.py <file path>\n"
+                     "Select the simulation engine: logsim.py -e <engine> "
+                     "[-c] <file path>\n"
+                     "Engines: iterative (default), levelized, event, numpy\n"
+                     "Select how traces are stored: logsim.py -s <storage> "
+                     "[-c] <file path>\n"
+                     "Storage: list (default), runlength, array, spill, "
+                     "ring\n"
+                     "Truth table of a combinational network: logsim.py -t "
+                     "<file path> [-o <output file>]\n"
+                     "Write monitored signals to a VCD file: logsim.py -v "
+                     "<VCD file> [-c] <file path>\n"
+                     "A file path of - reads the definition from standard "
+                     "input")
     try:
-        options, arguments = getopt.getopt(arg_list, "hc:")
+        options, arguments = getopt.getopt(arg_list, "hc:e:t:o:v:s:")
     except getopt.GetoptError:
         print("Error: invalid command line arguments\n")
         print(usage_message)
         sys.exit()
 
+    option_names = [option for option, value in options]
+    if "-o" in option_names and "-t" not in option_names:
+        print("Error: -o can only be used with -t\n")
+        print(usage_message)
+        sys.exit()
+    if "-v" in option_names and "-t" in option_names:
+        print("Error: -v cannot be used with -t\n")
+        print(usage_message)
+        sys.exit()
+    if "-s" in option_names and "-t" in option_names:
+        print("Error: -s cannot be used with -t\n")
+        print(usage_message)
+        sys.exit()
+
     # Initialise instances of the four inner simulator classes
     names = Names()
     devices = Devices(names)
     network = Network(names, devices)
     monitors = Monitors(names, devices, network)
 
+    engine_names = {"iterative": network.ITERATIVE,
+                    "levelized": network.LEVELIZED,
+                    "event": network.EVENT_DRIVEN,
+                    "numpy": network.VECTORIZED}
+    engine = network.ITERATIVE
+    for option, value in options:
+        if option == "-e":
+            if value not in engine_names:
+                print("Error: unknown engine " + value + "\n")
+                print(usage_message)
+                sys.exit()
+            engine = engine_names[value]
+            if not network.set_engine(engine):
+                print("Error: the numpy engine needs NumPy to be installed")
+                sys.exit()
+
+    storage_names = {"list": monitors.LIST,
+                     "runlength": monitors.RUN_LENGTH,
+                     "array": monitors.ARRAY,
+                     "spill": monitors.SPILL,
+                     "ring": monitors.RING}
+    storage = monitors.LIST
+    for option, value in options:
+        if option == "-s":
+            if value not in storage_names:
+                print("Error: unknown storage " + value + "\n")
+                print(usage_message)
+                sys.exit()
+            storage = storage_names[value]
+    monitors.set_storage(storage)
+
+    vcd_paths = [value for option, value in options if option == "-v"]
+
     for option, path in options:
         if option == "-h":  # print the usage message
             print(usage_message)
             sys.exit()
         elif option == "-c":  # use the command line user interface
-            scanner = Scanner(path, names)
+            scanner = Scanner(path, names, buffered=True)
             devices = Devices(names)
             network = Network(names, devices)
+            network.set_engine(engine)
             monitors = Monitors(names, devices, network)
+            monitors.set_storage(storage)
             parser = Parser(names, devices, network, monitors, scanner)
             if parser.parse_network():
                 # Initialise an instance of the userint.UserInterface() class
                 userint = UserInterface(names, devices, network, monitors)
+                if vcd_paths:
+                    userint.vcd_writer = VcdWriter(names, devices, monitors,
+                                                   vcd_paths[0])
+                    monitors.add_listener(userint.vcd_writer)
                 userint.command_interface()
+        elif option == "-t":  # write the truth table
+            output_paths = [value for option, value in options
+                            if option == "-o"]
+            # When the table goes to standard output, send the parser's
+            # messages to standard error so the output holds only the table
+            if output_paths:
+                messages = contextlib.nullcontext()
+            else:
+                messages = contextlib.redirect_stdout(sys.stderr)
+            with messages:
+                scanner = Scanner(path, names, buffered=True)
+                parser = Parser(names, devices, network, monitors, scanner)
+                parsed = parser.parse_network()
+            if parsed:
+                simulator = ParallelSimulator(names, devices, network,
+                                              monitors)
+                if output_paths:
+                    with open(output_paths[0], "w") as output_file:
+                        written = simulator.write_truth_table(output_file)
+                else:
+                    written = simulator.write_truth_table(sys.stdout)
+                if not written:
+                    with messages:
+                        print("Error: truth tables need a combinational "
+                              "network with at least one monitor")
 
-    if not options:  # no option given, use the graphical user interface
+    # no user interface option given, use the graphical user interface
+    if not any(option in ["-h", "-c", "-t"] for option, value in options):
 
         if len(arguments) != 1:  # wrong number of arguments
             print("Error: one file path required\n")
@@ -72,7 +173,7 @@ def main(arg_list):
             sys.exit()
 
         [path] = arguments
-        scanner = Scanner(path, names)
+        scanner = Scanner(path, names, buffered=True)
         parser = Parser(names, devices, network, monitors, scanner)
         if parser.parse_network():
             # Initialise an instance of the gui.Gui() class
@@ -85,10 +186,15 @@ def main(arg_list):
             locale.AddCatalog('lang')
             print(locale.GetName())
             builtins._ = wx.GetTranslation
+            if vcd_paths:
+                vcd_writer = VcdWriter(names, devices, monitors, vcd_paths[0])
+                monitors.add_listener(vcd_writer)
             gui = Gui("Logic Simulator", path, names, devices, network,
                       monitors)
             gui.Show(True)
             app.MainLoop()
+            if vcd_paths:
+                vcd_writer.close()
 
 if __name__ == "__main__":
     main(sys.argv[1:])
@@ -10,6 +10,11 @@ Monitors - records and displays specified output signals.
 """
 import collections
 
+from traces import (RunLengthTrace, ArrayTrace, StateMatrix, SpillTrace,
+                    RingTrace, TransitionIndex, DetailPyramid,
+                    SignalStatistics)
+from triggers import TriggerCapture
+
 
 class Monitors:
 
@@ -45,6 +50,46 @@ class Monitors:
     get_margin(self): Returns the length of the longest monitor's name.
 
     display_signals(self): Displays signal trace(s) in the text console.
+
+    set_storage(self, storage, directory=None, ring_size=None): Sets how
+                                                signal traces are stored.
+
+    make_trace(self, signals, prefill=None): Returns a new trace holding
+                                             signals.
+
+    reserve(self, cycles): Makes space in every trace for more cycles.
+
+    record_all(self, enabled=True): Turns recording of every output signal
+                                    on or off.
+
+    add_listener(self, listener): Passes the monitored signals of every
+                                  recorded cycle to listener.
+
+    remove_listener(self, listener): Stops passing signals to listener.
+
+    get_first_cycle(self, device_id, output_id): Returns the cycle of the
+                                                first signal in a trace.
+
+    index_transitions(self): Returns the transition index, making it if
+                             needed.
+
+    summarise_detail(self): Returns the level-of-detail pyramid, making it
+                            if needed.
+
+    get_buckets(self, device_id, output_id, start, stop, count): Returns
+                                                about count min/max buckets
+                                                for a range of a monitor.
+
+    get_recent_signals(self, device_id, output_id, count): Returns the most
+                                                           recent signals of
+                                                           a monitor.
+
+    set_trigger(self, trigger, pre=16, post=16, rearm=False): Records only
+                                                the cycles around trigger.
+
+    clear_trigger(self): Records every cycle again.
+
+    get_statistics(self): Returns the activity statistics of every monitor.
     """
 
     def __init__(self, names, devices, network):
@@ -56,12 +101,34 @@ class Monitors:
         # monitors_dictionary stores
         # {(device_id, output_id): [signal_list]}
         self.monitors_dictionary = collections.OrderedDict()
-        self.oscilloscope_buffer = {}
+
+        # Traces are stored as Python lists, as runs of equal signals with
+        # memory proportional to the number of transitions, as one byte per
+        # cycle, as bytes spilled to a temporary file per trace, or as a
+        # ring buffer of the most recent ring_size cycles. Every view, such
+        # as the GUI oscilloscope, reads the same traces.
+        self.storage_types = [self.LIST, self.RUN_LENGTH, self.ARRAY,
+                              self.SPILL, self.RING] = range(5)
+        self.storage = self.LIST
+        self.spill_directory = None  # default temporary directory
+        self.ring_size = 1024
+        # Every output signal is recorded in state_matrix when it is set
+        self.state_matrix = None
+        # Listeners are given the monitored signals at every cycle
+        self.listeners = []
+        self.cycles_recorded = 0  # cycles recorded since the last reset
+        self.transition_index = None  # made by index_transitions
+        self.detail_pyramid = None  # made by summarise_detail
+        self.signal_statistics = None  # made by get_statistics
+        # While a trigger is set, the monitored signals are only kept in
+        # its captures and not in monitors_dictionary
+        self.trigger_capture = None
+        self.trigger_cycle = None  # cycles_recorded when it was set
 
         [self.NO_ERROR, self.NOT_OUTPUT,
          self.MONITOR_PRESENT] = self.names.unique_error_codes(3)
 
-    def make_monitor(self, device_id, output_id, cycles_completed=0, max_len = None):
+    def make_monitor(self, device_id, output_id, cycles_completed=0):
         """Add the specified signal to the monitors dictionary.
 
         Return NO_ERROR if successful, or the corresponding error if not.
@@ -75,13 +142,10 @@ class Monitors:
             return self.MONITOR_PRESENT
         else:
             # If n simulation cycles have been completed before making this
-            # monitor, then initialise the signal trace with an n-length list
-            # of BLANK signals. Otherwise, initialise the trace with an empty
-            # list.
-            if max_len is None:
-                signal_list = [self.devices.BLANK] * cycles_completed
-            else:
-                signal_list = collections.deque([self.devices.BLANK] * cycles_completed, maxlen=max_len)
+            # monitor, then initialise the signal trace with n BLANK signals.
+            # The traces fill these without building an n-length list.
+            signal_list = self.make_trace(
+                (), (self.devices.BLANK, cycles_completed))
 
             self.monitors_dictionary[(device_id, output_id)] = signal_list
             return self.NO_ERROR
@@ -110,20 +174,27 @@ class Monitors:
     def record_signals(self):
         """Record the current signal level for every monitor.
 
-        This function is called at every simulation cycle.
+        This function is called at every simulation cycle. The dictionary
+        of signals passed to the listeners is only built if there are any.
         """
-        for device_id, output_id in self.monitors_dictionary:
-            signal_level = self.get_monitor_signal(device_id, output_id)
-            self.monitors_dictionary[(device_id,
-                                      output_id)].append(signal_level)
-            
-    def record_oscilloscope_signals(self, maxlen=10):
-        for device_id, output_id in self.monitors_dictionary:
-            signal_level = self.get_monitor_signal(device_id, output_id)
-            key = (device_id, output_id)
-            if key not in self.oscilloscope_buffer:
-                self.oscilloscope_buffer[key] = collections.deque(maxlen=maxlen)
-            self.oscilloscope_buffer[key].append(signal_level)
+        if self.listeners:
+            signals = {}
+            for (device_id, output_id) in self.monitors_dictionary:
+                signals[(device_id, output_id)] = \
+                    self.network.get_output_signal(device_id, output_id)
+            if self.trigger_capture is None:
+                for key, signal_list in self.monitors_dictionary.items():
+                    signal_list.append(signals[key])
+        else:
+            for (device_id, output_id), signal_list in \
+                    self.monitors_dictionary.items():
+                signal_list.append(
+                    self.network.get_output_signal(device_id, output_id))
+        if self.state_matrix is not None:
+            self.state_matrix.record_row()
+        for listener in self.listeners:
+            listener.record_cycle(self.cycles_recorded, signals)
+        self.cycles_recorded += 1
 
     def get_signal_names(self):
         """Return two signal name lists: monitored and not monitored."""
@@ -149,7 +220,236 @@ class Monitors:
         The list of stored signal levels for each monitor is deleted.
         """
         for device_id, output_id in self.monitors_dictionary:
-            self.monitors_dictionary[(device_id, output_id)] = []
+            self.monitors_dictionary[(device_id,
+                                      output_id)] = self.make_trace([])
+        if self.state_matrix is not None:
+            self.state_matrix.clear()
+        for listener in self.listeners:
+            listener.reset()
+        self.cycles_recorded = 0
+        if self.trigger_capture is not None:
+            self.trigger_cycle = 0
+
+    def set_storage(self, storage, directory=None, ring_size=None):
+        """Set how signal traces are stored and convert the existing traces.
+
+        directory is where SPILL traces keep their files, by default the
+        system temporary directory. ring_size is the number of cycles RING
+        traces keep. Return True if successful.
+        """
+        if storage not in self.storage_types:
+            return False
+        if ring_size is not None:
+            if ring_size < 1:
+                return False
+            self.ring_size = ring_size
+        self.storage = storage
+        self.spill_directory = directory
+        if (storage in [self.SPILL, self.RING] and
+                self.detail_pyramid is not None):
+            self.remove_listener(self.detail_pyramid)
+            self.detail_pyramid = None
+        for key, signal_list in self.monitors_dictionary.items():
+            self.monitors_dictionary[key] = self.make_trace(signal_list)
+        return True
+
+    def make_trace(self, signals, prefill=None):
+        """Return a new trace of the current storage type holding signals.
+
+        prefill is an optional (signal, count) tuple added before signals.
+        """
+        if self.storage == self.RUN_LENGTH:
+            return RunLengthTrace(signals, prefill=prefill)
+        elif self.storage == self.ARRAY:
+            return ArrayTrace(signals, prefill=prefill)
+        elif self.storage == self.SPILL:
+            return SpillTrace(signals, self.spill_directory, prefill=prefill)
+        elif self.storage == self.RING:
+            return RingTrace(signals, self.ring_size, prefill=prefill)
+        signal_list = []
+        if prefill is not None:
+            [signal, count] = prefill
+            signal_list = [signal] * count
+        signal_list.extend(signals)
+        return signal_list
+
+    def reserve(self, cycles):
+        """Make space in every trace for the specified number of cycles.
+
+        Traces that do not preallocate are unaffected.
+        """
+        for signal_list in self.monitors_dictionary.values():
+            if isinstance(signal_list, ArrayTrace):
+                signal_list.reserve(len(signal_list) + cycles)
+        if self.state_matrix is not None:
+            self.state_matrix.reserve(self.state_matrix.rows + cycles)
+
+    def record_all(self, enabled=True):
+        """Turn recording of every output signal on or off.
+
+        When enabled, record_signals adds one row with every output signal
+        to state_matrix. The outputs are fixed when recording is turned on.
+        """
+        if enabled:
+            self.state_matrix = StateMatrix(self.devices, self.network)
+        else:
+            self.state_matrix = None
+
+    def add_listener(self, listener):
+        """Pass the monitored signals of every recorded cycle to listener.
+
+        After each cycle, record_signals calls
+        listener.record_cycle(cycle, signals) with the cycle number since
+        the last reset and a {(device_id, output_id): signal} dictionary.
+        reset_monitors calls listener.reset().
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop passing signals to listener.
+
+        Return True if successful.
+        """
+        if listener not in self.listeners:
+            return False
+        self.listeners.remove(listener)
+        return True
+
+    def get_first_cycle(self, device_id, output_id):
+        """Return the cycle of the first signal in the trace of a monitor.
+
+        This is 0 unless RING storage has dropped the oldest cycles, or the
+        trace stopped growing when a trigger was set. Return None if the
+        monitor does not exist.
+        """
+        signal_list = self.monitors_dictionary.get((device_id, output_id))
+        if signal_list is None:
+            return None
+        end = self.cycles_recorded
+        if self.trigger_capture is not None:
+            end = self.trigger_cycle
+        return max(0, end - len(signal_list))
+
+    def index_transitions(self):
+        """Return the transition index of the monitors, making it if needed.
+
+        A new index is filled from the signals already recorded and is then
+        kept up to date by record_signals.
+        """
+        if self.transition_index is None:
+            self.transition_index = TransitionIndex(self.devices)
+            for key, signal_list in self.monitors_dictionary.items():
+                self.transition_index.add_trace(key, signal_list,
+                                                self.get_first_cycle(*key))
+            self.add_listener(self.transition_index)
+        return self.transition_index
+
+    def summarise_detail(self):
+        """Return the level-of-detail pyramid, making it if needed.
+
+        A new pyramid is filled from the signals already recorded and is
+        then kept up to date by record_signals. The pyramid keeps about two
+        bytes per cycle in memory, so return None for SPILL and RING
+        storage, which bound the memory of the traces.
+        """
+        if self.storage in [self.SPILL, self.RING]:
+            return None
+        if self.detail_pyramid is None:
+            self.detail_pyramid = DetailPyramid(self.devices)
+            for key, signal_list in self.monitors_dictionary.items():
+                self.detail_pyramid.add_trace(key, signal_list)
+            self.add_listener(self.detail_pyramid)
+        return self.detail_pyramid
+
+    def get_buckets(self, device_id, output_id, start, stop, count):
+        """Return about count buckets covering a range of a monitor's trace.
+
+        Each bucket is a (low, high, start, stop) tuple, as returned by
+        traces.DetailPyramid.get_buckets. SPILL and RING traces keep no
+        pyramid, so their buckets are worked out from the cycles in the
+        range only. Return None if the monitor does not exist or the range
+        fits in count single cycles.
+        """
+        signal_list = self.monitors_dictionary.get((device_id, output_id))
+        if signal_list is None:
+            return None
+        stop = min(stop, len(signal_list))
+        if stop - start <= count:
+            return None
+        if self.storage not in [self.SPILL, self.RING]:
+            return self.summarise_detail().get_buckets(
+                (device_id, output_id), start, stop, count)
+        size = -(-(stop - start) // count)
+        signals = signal_list.view(start, stop).tobytes()
+        low_signals = bytes([self.devices.LOW, self.devices.FALLING])
+        high_signals = bytes([self.devices.HIGH, self.devices.RISING])
+        buckets = []
+        for first in range(0, stop - start, size):
+            bucket = signals[first:first + size]
+            low = 0 if any(signal in bucket for signal in low_signals) else 1
+            high = 1 if any(signal in bucket for signal in high_signals) else 0
+            buckets.append((low, high, start + first,
+                            min(start + first + size, stop)))
+        return buckets
+
+    def get_statistics(self):
+        """Return the activity statistics of every monitor.
+
+        Return a {(device_id, output_id): statistics} dictionary, where
+        statistics is a dictionary as returned by
+        traces.SignalStatistics.get_statistics, or None for a monitor with
+        no recorded cycles. The first call fills the statistics from the
+        signals already recorded, and they are then kept up to date by
+        record_signals, including the cycles that are not kept in the
+        traces while a trigger is set.
+        """
+        if self.signal_statistics is None:
+            self.signal_statistics = SignalStatistics(self.devices)
+            for key, signal_list in self.monitors_dictionary.items():
+                self.signal_statistics.add_trace(key, signal_list,
+                                                 self.get_first_cycle(*key))
+            self.add_listener(self.signal_statistics)
+        return collections.OrderedDict(
+            (key, self.signal_statistics.get_statistics(key))
+            for key in self.monitors_dictionary)
+
+    def get_recent_signals(self, device_id, output_id, count):
+        """Return a list of the last count signals of a monitor.
+
+        Return None if the monitor does not exist.
+        """
+        signal_list = self.monitors_dictionary.get((device_id, output_id))
+        if signal_list is None:
+            return None
+        return list(signal_list[max(0, len(signal_list) - count):])
+
+    def set_trigger(self, trigger, pre=16, post=16, rearm=False):
+        """Record only the cycles around the specified trigger.
+
+        trigger is an instance of the triggers.Trigger() class. Until the
+        trigger is cleared, record_signals keeps the last pre cycles of
+        each monitor in a ring buffer and, when the trigger fires, captures
+        pre + 1 + post cycles around it, instead of adding to the traces.
+        Return the triggers.TriggerCapture() holding the captures.
+        """
+        if self.trigger_capture is None:
+            self.trigger_cycle = self.cycles_recorded
+        self.clear_trigger()
+        self.trigger_capture = TriggerCapture(trigger, pre, post, rearm)
+        self.add_listener(self.trigger_capture)
+        return self.trigger_capture
+
+    def clear_trigger(self):
+        """Clear the trigger so that every cycle is recorded again.
+
+        Return True if successful.
+        """
+        if self.trigger_capture is None:
+            return False
+        self.remove_listener(self.trigger_capture)
+        self.trigger_capture = None
+        return True
 
     def get_margin(self):
         """Return the length of the longest monitor's name.
@@ -41,6 +41,7 @@ class Names:
         """Initialise names list."""
         self.error_code_count = 0  # how many error codes have been declared
         self.names = []  # list of name strings
+        self.name_ids = {}  # {name_string: name_id}, index into self.names
 
     def unique_error_codes(self, num_error_codes):
         """Return a list of unique integer error codes."""
@@ -57,14 +58,13 @@ class Names:
 
         If the name string is present in the names list, return its index
         If the name string is not present in the names list, return None.
+        The name_ids dictionary makes this a single hash lookup.
         """
         if not isinstance(name_string, str):
             raise TypeError("Expected name_string to be a string.")
         if name_string == "":
             raise ValueError("Empty name string is not allowed.")
-        if name_string in self.names:
-            return self.names.index(name_string)
-        return None
+        return self.name_ids.get(name_string)
 
     def lookup(self, name_string_list):
         """Return a list of name IDs for each name string in name_string_list.
@@ -77,9 +77,12 @@ class Names:
         for name_string in name_string_list:
             if not isinstance(name_string, str):
                 raise TypeError("Expected each item in name_string_list to be a string.")
-            if name_string not in self.names:
+            name_id = self.name_ids.get(name_string)
+            if name_id is None:
+                name_id = len(self.names)
                 self.names.append(name_string)
-            name_ids.append(self.names.index(name_string))
+                self.name_ids[name_string] = name_id
+            name_ids.append(name_id)
         return name_ids
 
     def get_name_string(self, name_id):
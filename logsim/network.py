@@ -6,6 +6,12 @@ Classes
 --------
 Network - builds and executes the network.
 """
+import heapq
+
+try:
+    import vector_engine
+except ImportError:  # NumPy is not installed
+    vector_engine = None
 
 
 class Network:
@@ -57,6 +63,30 @@ class Network:
     update_clocks(self): If it is time to do so, sets clock signals to RISING
                          or FALLING.
 
+    update_siggens(self): Advances all signal generators one step.
+
+    compile_network(self): Levelizes the logic gates into a schedule that
+                           evaluates each gate after the gates driving it.
+
+    execute_compiled_gate(self, gate, edges_as_levels=True): Simulates a
+                                  compiled logic gate and updates its output
+                                  signal value.
+
+    execute_iterative(self): Executes all the devices in a fixed kind order
+                             until the signals settle.
+
+    execute_levelized(self): Executes the sources and then the compiled gate
+                             schedule until the signals settle.
+
+    execute_scheduled(self, position): Executes the device at the given
+                                       position of the event order.
+
+    execute_event_driven(self): Executes only the devices whose inputs have
+                                changed, in the iterative engine's order,
+                                until the signals settle.
+
+    set_engine(self, engine): Selects the engine used by execute_network.
+
     execute_network(self): Executes all the devices in the network for one
                            simulation cycle.
     """
@@ -71,6 +101,45 @@ class Network:
          self.DEVICE_ABSENT] = self.names.unique_error_codes(6)
         self.steady_state = True  # for checking if signals have settled
 
+        # Simulation engines that execute_network can use
+        self.engine_types = [self.ITERATIVE, self.LEVELIZED,
+                             self.EVENT_DRIVEN, self.VECTORIZED] = range(4)
+        # The iterative engine is the reference: the levelized and vectorized
+        # engines read edges as levels, so their traces can differ from it
+        self.engine = self.ITERATIVE
+        self.vector_engine = None  # vector_engine.VectorEngine, if in use
+
+        # Number of iterations to wait for the signals to settle before
+        # declaring the network unstable
+        self.iteration_limit = 20
+        self.iterations = 0  # iterations taken by the last simulation cycle
+
+        # The compiled schedule is rebuilt whenever a device or a connection
+        # has been added since it was compiled.
+        self.schedule_valid = False
+        self.compiled_device_count = 0
+        # gate_levels stores one tuple of compiled gates per level. It is
+        # None if the network has a combinational loop or unconnected input.
+        self.gate_levels = None
+        self.gate_schedule = ()  # all compiled gates in level order
+
+        # pass_order stores (device, compiled gate or None) for the sources
+        # and then the gates, in the order one iteration executes them.
+        self.pass_order = ()
+        self.pass_position = {}  # {device_id: position in pass_order}
+        # event_order is the same, but with the gates in the order
+        # execute_iterative runs them, for the event-driven engine
+        self.event_order = ()
+        self.event_position = {}  # {device_id: position in event_order}
+        # fanout stores {(device_id, output_id): [(device_id, input_id)]}
+        self.fanout = {}
+        # Positions the event-driven engine must execute on its next
+        # iteration. Invalid after a start-up or a cycle run by another
+        # engine, when every device is executed again.
+        self.pending_positions = set()
+        self.events_valid = False
+        self.events_startup_count = None
+
     def get_connected_output(self, device_id, input_id):
         """Return the output connected to the given input.
 
@@ -131,6 +200,7 @@ class Network:
                 # Make connection
                 first_device.inputs[first_port_id] = (second_device_id,
                                                       second_port_id)
+                self.schedule_valid = False
                 error_type = self.NO_ERROR
             else:  # second_port_id is not a valid input or output port
                 error_type = self.PORT_ABSENT
@@ -148,6 +218,7 @@ class Network:
                     #print("yay")
                     second_device.inputs[second_port_id] = (first_device_id,
                                                             first_port_id)
+                    self.schedule_valid = False
                     error_type = self.NO_ERROR
             else:
                 error_type = self.PORT_ABSENT
@@ -399,49 +470,187 @@ class Network:
                 device.outputs[None] = new_signal
             device.clock_counter = (device.clock_counter + 1) % len(device.siggen_list)
 
-    def execute_network(self):
-        """Execute all the devices in the network for one simulation cycle.
+    def compile_network(self):
+        """Levelize the logic gates into a compiled schedule.
+
+        Switches, clocks, signal generators and D-type outputs are treated as
+        primary inputs. Each gate is given a level one higher than the
+        highest level of the gates driving it, so evaluating the gates level
+        by level settles the combinational logic in a single sweep. A
+        compiled gate is a tuple (device, x, y, sources) where x and y are
+        the execute_gate rule and sources lists the (outputs dictionary,
+        output ID) of each driving port.
+
+        Return True if successful, or False if the gates contain a
+        combinational loop or an unconnected input.
+        """
+        gate_rules = {self.devices.AND: (self.devices.HIGH, self.devices.HIGH),
+                      self.devices.OR: (self.devices.LOW, self.devices.LOW),
+                      self.devices.NAND: (self.devices.HIGH, self.devices.LOW),
+                      self.devices.NOR: (self.devices.LOW, self.devices.HIGH),
+                      self.devices.XOR: (None, None)}
+        self.schedule_valid = True
+        self.compiled_device_count = len(self.devices.devices_list)
+        self.gate_levels = None
+        self.gate_schedule = ()
+        self.pass_order = ()
+        self.pass_position = {}
+        self.event_order = ()
+        self.event_position = {}
+        self.fanout = {}
+        self.events_valid = False
+        self.vector_engine = None
+
+        gates = [device for device in self.devices.devices_list
+                 if device.device_kind in gate_rules]
+        compiled_gates = {}  # {device_id: compiled gate}
+        fanout = {}  # {device_id: [IDs of gates driven by the device]}
+        unresolved = {}  # {device_id: number of driving gates not levelled}
+        for device in gates:
+            sources = []
+            unresolved[device.device_id] = 0
+            for connected_output in device.inputs.values():
+                if connected_output is None:  # unconnected input
+                    return False
+                (source_id, source_port_id) = connected_output
+                source = self.devices.get_device(source_id)
+                sources.append((source.outputs, source_port_id))
+                if source.device_kind in gate_rules:
+                    fanout.setdefault(source_id, []).append(device.device_id)
+                    unresolved[device.device_id] += 1
+            (x, y) = gate_rules[device.device_kind]
+            compiled_gates[device.device_id] = (device, x, y, tuple(sources))
+
+        # Kahn's algorithm, one level at a time
+        levels = []
+        level = [device.device_id for device in gates
+                 if unresolved[device.device_id] == 0]
+        levelled_count = 0
+        while level:
+            levels.append(tuple(compiled_gates[device_id]
+                                for device_id in level))
+            levelled_count += len(level)
+            next_level = []
+            for device_id in level:
+                for fanout_id in fanout.get(device_id, []):
+                    unresolved[fanout_id] -= 1
+                    if unresolved[fanout_id] == 0:
+                        next_level.append(fanout_id)
+            level = next_level
+
+        if levelled_count != len(gates):  # some gates are in a loop
+            return False
+        self.gate_levels = levels
+        self.gate_schedule = tuple(gate for level in levels for gate in level)
+
+        pass_order = []
+        for device_kind in [self.devices.SWITCH, self.devices.D_TYPE,
+                            self.devices.SIGGEN, self.devices.CLOCK]:
+            for device_id in self.devices.find_devices(device_kind):
+                pass_order.append((self.devices.get_device(device_id), None))
+        for gate in self.gate_schedule:
+            pass_order.append((gate[0], gate))
+        self.pass_order = tuple(pass_order)
+        self.pass_position = {device.device_id: position for position,
+                              (device, gate) in enumerate(pass_order)}
+
+        event_order = [(device, gate) for (device, gate) in pass_order
+                       if gate is None]
+        for device_kind in [self.devices.AND, self.devices.OR,
+                            self.devices.NAND, self.devices.NOR,
+                            self.devices.XOR]:
+            for device_id in self.devices.find_devices(device_kind):
+                event_order.append((self.devices.get_device(device_id),
+                                    compiled_gates[device_id]))
+        self.event_order = tuple(event_order)
+        self.event_position = {device.device_id: position for position,
+                               (device, gate) in enumerate(event_order)}
+
+        for device in self.devices.devices_list:
+            for input_id, connected_output in device.inputs.items():
+                if connected_output is not None:
+                    self.fanout.setdefault(connected_output, []).append(
+                        (device.device_id, input_id))
+        return True
+
+    def execute_compiled_gate(self, gate, edges_as_levels=True):
+        """Simulate a compiled logic gate and update its output signal value.
+
+        If edges_as_levels is True, RISING and FALLING inputs are read as
+        the level they are heading to, so a single sweep of the compiled
+        schedule carries a change through any depth of logic. This is not
+        what execute_gate does, so the levelized engine can settle D-types
+        differently from the iterative engine when gates drive their
+        inputs. If it is False, inputs are read as execute_gate reads them.
+
+        Return True if successful.
+        """
+        (device, x, y, sources) = gate
+        levels = []
+        for outputs, port_id in sources:
+            signal = outputs[port_id]
+            if edges_as_levels:
+                if signal == self.devices.RISING:
+                    signal = self.devices.HIGH
+                elif signal == self.devices.FALLING:
+                    signal = self.devices.LOW
+            levels.append(signal)
+
+        if x is None:  # XOR: output is high only if both inputs differ
+            if levels[0] == levels[1]:
+                target = self.devices.LOW
+            else:
+                target = self.devices.HIGH
+        elif all(level == x for level in levels):
+            target = y
+        else:
+            target = self.invert_signal(y)
+
+        updated_signal = self.update_signal(device.outputs[None], target)
+        if updated_signal is None:  # if the update is unsuccessful
+            return False
+        device.outputs[None] = updated_signal
+        return True
+
+    def execute_sources(self):
+        """Execute the switches, D-types, signal generators and clocks.
+
+        Return True if successful.
+        """
+        for device_id in self.devices.find_devices(self.devices.SWITCH):
+            if not self.execute_switch(device_id):
+                return False
+        # Execute D-type devices before clocks to catch the rising edge of
+        # the clock
+        for device_id in self.devices.find_devices(self.devices.D_TYPE):
+            if not self.execute_d_type(device_id):
+                return False
+        for device_id in self.devices.find_devices(self.devices.SIGGEN):
+            if not self.execute_siggen(device_id):
+                return False
+        for device_id in self.devices.find_devices(self.devices.CLOCK):
+            if not self.execute_clock(device_id):
+                return False
+        return True
+
+    def execute_iterative(self):
+        """Execute all devices in a fixed kind order until signals settle.
 
         Return True if successful and the network does not oscillate.
         """
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
-        switch_devices = self.devices.find_devices(self.devices.SWITCH)
-        d_type_devices = self.devices.find_devices(self.devices.D_TYPE)
         and_devices = self.devices.find_devices(self.devices.AND)
         or_devices = self.devices.find_devices(self.devices.OR)
         nand_devices = self.devices.find_devices(self.devices.NAND)
         nor_devices = self.devices.find_devices(self.devices.NOR)
         xor_devices = self.devices.find_devices(self.devices.XOR)
-        siggen_devices = self.devices.find_devices(self.devices.SIGGEN)
 
-        # This sets clock signals to RISING or FALLING, where necessary
-        self.update_clocks()
-        # update siggen
-        self.update_siggens()
-
-        # Number of iterations to wait for the signals to settle before
-        # declaring the network unstable
-        iteration_limit = 20
-
-        iterations = 0
-        while iterations < iteration_limit:
-            iterations += 1
+        self.iterations = 0
+        while self.iterations < self.iteration_limit:
+            self.iterations += 1
             self.steady_state = True
 
-            for device_id in switch_devices:  # execute switch devices
-                if not self.execute_switch(device_id):
-                    return False
-            # Execute D-type devices before clocks to catch the rising edge of
-            # the clock
-            for device_id in d_type_devices:  # execute DTYPE devices
-                if not self.execute_d_type(device_id):
-                    return False
-            for device_id in siggen_devices:
-                if not self.execute_siggen(device_id):
-                    return False
-            for device_id in clock_devices:  # complete clock executions
-                if not self.execute_clock(device_id):
-                    return False
+            if not self.execute_sources():
+                return False
             for device_id in and_devices:  # execute AND gate devices
                 if not self.execute_gate(device_id, self.devices.HIGH,
                                          self.devices.HIGH):
@@ -461,7 +670,171 @@ class Network:
             for device_id in xor_devices:  # execute XOR devices
                 if not self.execute_gate(device_id, None, None):
                     return False
-                
+
+            if self.steady_state:
+                break
+        return self.steady_state
+
+    def execute_levelized(self):
+        """Execute the sources and then the compiled schedule until settled.
+
+        Each iteration evaluates every gate once, in level order. Further
+        iterations are only needed to complete RISING and FALLING edges and
+        to let D-types clocked through gates catch their edge.
+
+        Return True if successful and the network does not oscillate.
+        """
+        self.iterations = 0
+        while self.iterations < self.iteration_limit:
+            self.iterations += 1
+            self.steady_state = True
+
+            if not self.execute_sources():
+                return False
+            for gate in self.gate_schedule:
+                if not self.execute_compiled_gate(gate):
+                    return False
+
+            if self.steady_state:
+                break
+        return self.steady_state
+
+    def execute_scheduled(self, position):
+        """Execute the device at the given position of the event order.
+
+        Gates follow execute_gate. Return True if successful.
+        """
+        (device, gate) = self.event_order[position]
+        if gate is not None:
+            return self.execute_compiled_gate(gate, edges_as_levels=False)
+        elif device.device_kind == self.devices.SWITCH:
+            return self.execute_switch(device.device_id)
+        elif device.device_kind == self.devices.D_TYPE:
+            return self.execute_d_type(device.device_id)
+        elif device.device_kind == self.devices.SIGGEN:
+            return self.execute_siggen(device.device_id)
+        else:
+            return self.execute_clock(device.device_id)
+
+    def execute_event_driven(self):
+        """Execute the devices whose inputs have changed until settled.
+
+        Devices are executed in the same order and with the same rules as
+        execute_iterative, so the traces are the same, but a device is
+        skipped when none of its inputs changed since it was last executed
+        and its outputs are not RISING or FALLING, because executing it
+        again would leave everything unchanged. A change at an output
+        queues the devices in its fanout: later in this iteration if they
+        come after it in the event order, otherwise on the next iteration.
+
+        Return True if successful and the network does not oscillate.
+        """
+        transient = (self.devices.RISING, self.devices.FALLING)
+        if (not self.events_valid or
+                self.events_startup_count != self.devices.startup_count):
+            # Start-up, or a cycle run by another engine: execute everything
+            next_positions = set(range(len(self.event_order)))
+            self.events_valid = True
+            self.events_startup_count = self.devices.startup_count
+        else:
+            next_positions = self.pending_positions
+            for device_id in self.devices.find_devices(self.devices.SWITCH):
+                device = self.devices.get_device(device_id)
+                if device.outputs[None] != device.switch_state:
+                    next_positions.add(self.event_position[device_id])
+            # update_clocks and update_siggens have just made edges
+            for device_kind in [self.devices.CLOCK, self.devices.SIGGEN]:
+                for device_id in self.devices.find_devices(device_kind):
+                    device = self.devices.get_device(device_id)
+                    if device.outputs[None] in transient:
+                        next_positions.add(self.event_position[device_id])
+                        for target_id, input_id in self.fanout.get(
+                                (device_id, None), []):
+                            next_positions.add(self.event_position[target_id])
+
+        self.iterations = 0
+        while self.iterations < self.iteration_limit:
+            self.iterations += 1
+            self.steady_state = True
+
+            queued_positions = next_positions
+            next_positions = set()
+            position_heap = list(queued_positions)
+            heapq.heapify(position_heap)
+            while position_heap:
+                position = heapq.heappop(position_heap)
+                device = self.event_order[position][0]
+                old_outputs = list(device.outputs.items())
+                if not self.execute_scheduled(position):
+                    self.events_valid = False
+                    return False
+                for output_id, old_signal in old_outputs:
+                    new_signal = device.outputs[output_id]
+                    if new_signal == old_signal:
+                        continue
+                    if new_signal in transient:  # finish the edge next time
+                        next_positions.add(position)
+                    for target_id, input_id in self.fanout.get(
+                            (device.device_id, output_id), []):
+                        target_position = self.event_position[target_id]
+                        if target_position <= position:
+                            next_positions.add(target_position)
+                        elif target_position not in queued_positions:
+                            queued_positions.add(target_position)
+                            heapq.heappush(position_heap, target_position)
+
             if self.steady_state:
                 break
+        self.pending_positions = next_positions
+        if not self.steady_state:
+            self.events_valid = False
         return self.steady_state
+
+    def set_engine(self, engine):
+        """Select the engine used by execute_network.
+
+        Return True if successful. The vectorized engine is only available
+        if NumPy is installed.
+        """
+        if engine not in self.engine_types:
+            return False
+        if engine == self.VECTORIZED and vector_engine is None:
+            return False
+        self.engine = engine
+        return True
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        The levelized, event-driven and vectorized engines fall back to the
+        iterative engine if the network cannot be levelized, for example
+        because of a combinational loop.
+
+        Return True if successful and the network does not oscillate.
+        """
+        # This sets clock signals to RISING or FALLING, where necessary
+        self.update_clocks()
+        # update siggen
+        self.update_siggens()
+
+        if self.engine != self.ITERATIVE and (
+                not self.schedule_valid or self.compiled_device_count !=
+                len(self.devices.devices_list)):
+            self.compile_network()
+
+        if self.engine == self.VECTORIZED and self.gate_levels is not None:
+            if self.vector_engine is None and self.check_network():
+                self.vector_engine = vector_engine.VectorEngine(self)
+            if self.vector_engine is not None:
+                self.events_valid = False
+                return self.vector_engine.execute_network()
+        elif self.vector_engine is not None:
+            self.vector_engine.synchronised = False
+
+        if self.engine == self.EVENT_DRIVEN and self.gate_levels is not None:
+            return self.execute_event_driven()
+
+        self.events_valid = False
+        if self.engine == self.ITERATIVE or self.gate_levels is None:
+            return self.execute_iterative()
+        return self.execute_levelized()
@@ -0,0 +1,465 @@
+"""Simulate many stimulus patterns at once using bit-parallel words.
+
+Used in the Logic Simulator project to run the same network under many
+switch and signal generator settings in a single pass.
+
+Classes
+-------
+ParallelSimulator - simulates one pattern per bit of Python integers.
+"""
+import collections
+
+
+class ParallelSimulator:
+
+    """Simulate one stimulus pattern per bit of Python integers.
+
+    Every output port holds two words, with bit p belonging to pattern p.
+    The value word holds the level the signal is at or heading to, and the
+    edge word is set while the signal is RISING or FALLING. With this
+    encoding Network.update_signal(signal, target) becomes: value = target,
+    edge = old value ^ target. Gates become bitwise operations on the value
+    words, so one pass of the compiled schedule of network.Network
+    simulates every pattern. Devices are executed in the same order as the
+    levelized engine, so each pattern gives the same trace as running that
+    pattern with Network.execute_network.
+
+    Python integers have no fixed width, so any number of patterns can be
+    packed together. The Device objects are never modified: the simulation
+    starts from their current signals, D-type memories and clock counters.
+
+    A FORCE instruction copies the signal in one slot to another slot with
+    the bits of some patterns held LOW or HIGH. These are not made by
+    compile(), but can be inserted in the program to inject faults.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+
+    Public methods
+    --------------
+    compile(self): Builds the bit-parallel program from the network's
+                   compiled schedule.
+
+    load_state(self, num_patterns): Copies the device signals and states
+                                    into every pattern.
+
+    set_switch_words(self, switch_words): Sets the switch states of every
+                                          pattern from one word per switch.
+
+    set_patterns(self, patterns): Sets the switch states and signal
+                                  generator lists of every pattern.
+
+    execute_network(self): Executes one simulation cycle for every pattern.
+
+    get_signal_word(self, device_id, output_id): Returns the value and edge
+                                                 words of an output.
+
+    decode(self, value, edge, pattern): Returns the signal of one pattern.
+
+    simulate(self, patterns, cycles): Runs every pattern for a number of
+                                      cycles and returns per-pattern traces.
+
+    counting_word(self, bit, start, count): Returns the word of one bit of
+                                            the pattern numbers.
+
+    write_truth_table(self, output_file, chunk_bits=16): Writes the truth
+                                                         table of a
+                                                         combinational
+                                                         network.
+    """
+
+    def __init__(self, names, devices, network, monitors):
+        """Initialise the simulator state."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+
+        self.num_patterns = 0
+        self.all_patterns = 0  # word with one bit set per pattern
+        self.slot_index = {}  # {(device_id, output_id): slot}
+        self.program = []  # (code, slot, operands) per pass order entry
+        self.values = []  # value word per slot
+        self.edges = []  # edge word per slot
+        self.dtype_memory = []  # memory word per D-type
+        self.switch_words = {}  # {device_id: switch state word}
+        self.siggen_groups = {}  # {device_id: [[list, counter, mask], ...]}
+        self.clock_counters = {}  # {device_id: clock counter}
+        self.failed_cycles = []  # cycle each pattern first oscillated at
+        self.cycles_completed = 0
+
+        [self.SWITCH, self.D_TYPE, self.TIMED, self.AND, self.OR, self.NAND,
+         self.NOR, self.XOR, self.FORCE] = range(9)
+
+    def compile(self):
+        """Build the bit-parallel program from the compiled schedule.
+
+        Return True if successful, or False if the network cannot be
+        levelized or has unconnected inputs.
+        """
+        network = self.network
+        devices = self.devices
+        if (not network.schedule_valid or network.compiled_device_count !=
+                len(devices.devices_list)):
+            network.compile_network()
+        if network.gate_levels is None or not network.check_network():
+            return False
+
+        self.slot_index = {}
+        for device in devices.devices_list:
+            for output_id in device.outputs:
+                self.slot_index[(device.device_id, output_id)] = len(
+                    self.slot_index)
+
+        gate_codes = {devices.AND: self.AND, devices.OR: self.OR,
+                      devices.NAND: self.NAND, devices.NOR: self.NOR,
+                      devices.XOR: self.XOR}
+        self.program = []
+        dtype_count = 0
+        for device, gate in network.pass_order:
+            device_id = device.device_id
+            if gate is not None:
+                input_slots = tuple(self.slot_index[connected_output]
+                                    for connected_output
+                                    in device.inputs.values())
+                self.program.append((gate_codes[device.device_kind],
+                                     self.slot_index[(device_id, None)],
+                                     input_slots))
+            elif device.device_kind == devices.SWITCH:
+                self.program.append((self.SWITCH,
+                                     self.slot_index[(device_id, None)],
+                                     device_id))
+            elif device.device_kind == devices.D_TYPE:
+                input_slots = tuple(self.slot_index[device.inputs[input_id]]
+                                    for input_id in devices.dtype_input_ids)
+                self.program.append((self.D_TYPE, dtype_count,
+                                     (self.slot_index[(device_id,
+                                                       devices.Q_ID)],
+                                      self.slot_index[(device_id,
+                                                       devices.QBAR_ID)])
+                                     + input_slots))
+                dtype_count += 1
+            else:  # clocks and signal generators
+                self.program.append((self.TIMED,
+                                     self.slot_index[(device_id, None)],
+                                     device_id))
+        return True
+
+    def load_state(self, num_patterns):
+        """Copy the current device signals and states into every pattern."""
+        devices = self.devices
+        self.num_patterns = num_patterns
+        self.all_patterns = (1 << num_patterns) - 1
+        self.values = [0] * len(self.slot_index)
+        self.edges = [0] * len(self.slot_index)
+        for (device_id, output_id), slot in self.slot_index.items():
+            signal = devices.get_device(device_id).outputs[output_id]
+            if signal in [devices.HIGH, devices.RISING]:
+                self.values[slot] = self.all_patterns
+            if signal in [devices.RISING, devices.FALLING]:
+                self.edges[slot] = self.all_patterns
+
+        self.dtype_memory = []
+        for device_id in devices.find_devices(devices.D_TYPE):
+            device = devices.get_device(device_id)
+            if device.dtype_memory == devices.HIGH:
+                self.dtype_memory.append(self.all_patterns)
+            else:
+                self.dtype_memory.append(0)
+
+        self.switch_words = {}
+        for device_id in devices.find_devices(devices.SWITCH):
+            device = devices.get_device(device_id)
+            if device.switch_state == devices.HIGH:
+                self.switch_words[device_id] = self.all_patterns
+            else:
+                self.switch_words[device_id] = 0
+
+        self.clock_counters = {}
+        for device_id in devices.find_devices(devices.CLOCK):
+            device = devices.get_device(device_id)
+            self.clock_counters[device_id] = device.clock_counter
+
+        self.siggen_groups = {}
+        for device_id in devices.find_devices(devices.SIGGEN):
+            device = devices.get_device(device_id)
+            self.siggen_groups[device_id] = [[device.siggen_list,
+                                              device.clock_counter,
+                                              self.all_patterns]]
+
+        self.failed_cycles = [None] * num_patterns
+        self.cycles_completed = 0
+
+    def set_switch_words(self, switch_words):
+        """Set switch states from a {device_id: word} dictionary.
+
+        Bit p of each word is the state of the switch in pattern p.
+        """
+        for device_id, word in switch_words.items():
+            self.switch_words[device_id] = word & self.all_patterns
+
+    def set_patterns(self, patterns):
+        """Set switch states and signal generator lists for every pattern.
+
+        patterns is a list with one {device_id: setting} dictionary per
+        pattern. A switch setting is 0 or 1, and a signal generator setting
+        is a list of 0s and 1s. A signal generator given a new list restarts
+        it: its output is set to the first value of the list. Devices left
+        out of a pattern keep their current settings.
+        """
+        devices = self.devices
+        siggen_masks = {}  # {device_id: {tuple(list): mask}}
+        for pattern, settings in enumerate(patterns):
+            bit = 1 << pattern
+            for device_id, setting in settings.items():
+                device = devices.get_device(device_id)
+                if device.device_kind == devices.SWITCH:
+                    if setting == devices.HIGH:
+                        self.switch_words[device_id] |= bit
+                    else:
+                        self.switch_words[device_id] &= ~bit
+                elif device.device_kind == devices.SIGGEN:
+                    masks = siggen_masks.setdefault(device_id, {})
+                    masks[tuple(setting)] = masks.get(tuple(setting), 0) | bit
+
+        for device_id, masks in siggen_masks.items():
+            slot = self.slot_index[(device_id, None)]
+            groups = self.siggen_groups[device_id]
+            for siggen_list, mask in masks.items():
+                groups[0][2] &= ~mask
+                groups.append([list(siggen_list), 0, mask])
+                if siggen_list[0] == devices.HIGH:
+                    self.values[slot] |= mask
+                else:
+                    self.values[slot] &= ~mask
+                self.edges[slot] &= ~mask
+
+    def update(self, slot, target):
+        """Update the signals at slot towards target.
+
+        Return a word with the bits of the patterns that changed.
+        """
+        old_value = self.values[slot]
+        old_edge = self.edges[slot]
+        new_edge = old_value ^ target
+        self.values[slot] = target
+        self.edges[slot] = new_edge
+        return new_edge | (old_edge ^ new_edge)
+
+    def update_clocks(self):
+        """Set clock signals to RISING or FALLING if it is time to do so."""
+        for device_id, counter in self.clock_counters.items():
+            device = self.devices.get_device(device_id)
+            if counter == device.clock_half_period:
+                counter = 0
+                slot = self.slot_index[(device_id, None)]
+                if self.edges[slot] == 0:  # a steady HIGH or LOW
+                    self.values[slot] ^= self.all_patterns
+                    self.edges[slot] = self.all_patterns
+            self.clock_counters[device_id] = counter + 1
+
+    def update_siggens(self):
+        """Advance all signal generators one step in every pattern."""
+        for device_id, groups in self.siggen_groups.items():
+            target = 0
+            for group in groups:
+                [siggen_list, counter, mask] = group
+                if siggen_list[counter] == self.devices.HIGH:
+                    target |= mask
+                group[1] = (counter + 1) % len(siggen_list)
+            slot = self.slot_index[(device_id, None)]
+            # Patterns in no group keep their signal
+            unused = self.all_patterns
+            for group in groups:
+                unused &= ~group[2]
+            target |= self.values[slot] & unused
+            self.update(slot, target)
+
+    def execute_network(self):
+        """Execute one simulation cycle for every pattern.
+
+        Return a word with the bits of the patterns that did not settle.
+        """
+        all_patterns = self.all_patterns
+        values = self.values
+        edges = self.edges
+        memory = self.dtype_memory
+        update = self.update
+        self.update_clocks()
+        self.update_siggens()
+
+        for _ in range(self.network.iteration_limit):
+            changed = 0
+            for code, slot, operands in self.program:
+                if code == self.AND:
+                    target = all_patterns
+                    for input_slot in operands:
+                        target &= values[input_slot]
+                elif code == self.OR:
+                    target = 0
+                    for input_slot in operands:
+                        target |= values[input_slot]
+                elif code == self.NAND:
+                    target = all_patterns
+                    for input_slot in operands:
+                        target &= values[input_slot]
+                    target ^= all_patterns
+                elif code == self.NOR:
+                    target = 0
+                    for input_slot in operands:
+                        target |= values[input_slot]
+                    target ^= all_patterns
+                elif code == self.XOR:
+                    target = values[operands[0]] ^ values[operands[1]]
+                elif code == self.FORCE:  # copy a signal with stuck bits
+                    [source_slot, stuck_low, stuck_high] = operands
+                    values[slot] = (values[source_slot] & ~stuck_low) | \
+                        stuck_high
+                    edges[slot] = edges[source_slot] & ~(stuck_low |
+                                                         stuck_high)
+                    continue
+                elif code == self.SWITCH:
+                    target = self.switch_words[operands]
+                elif code == self.TIMED:  # complete clock and siggen edges
+                    target = values[slot]
+                else:  # D_TYPE, slot is the D-type index
+                    [q_slot, qbar_slot, clk_slot, set_slot, clear_slot,
+                     data_slot] = operands
+                    rising = values[clk_slot] & edges[clk_slot]
+                    data = values[data_slot] ^ edges[data_slot]
+                    word = (memory[slot] & ~rising) | (data & rising)
+                    word |= values[set_slot] & ~edges[set_slot]
+                    word &= ~(values[clear_slot] & ~edges[clear_slot])
+                    memory[slot] = word
+                    changed |= update(q_slot, word)
+                    changed |= update(qbar_slot, word ^ all_patterns)
+                    continue
+                changed |= update(slot, target)
+            if not changed:
+                break
+        return changed
+
+    def get_signal_word(self, device_id, output_id):
+        """Return the value and edge words of the specified output."""
+        slot = self.slot_index[(device_id, output_id)]
+        return self.values[slot], self.edges[slot]
+
+    def decode(self, value, edge, pattern):
+        """Return the signal of the specified pattern."""
+        if (edge >> pattern) & 1:
+            if (value >> pattern) & 1:
+                return self.devices.RISING
+            return self.devices.FALLING
+        if (value >> pattern) & 1:
+            return self.devices.HIGH
+        return self.devices.LOW
+
+    def simulate(self, patterns, cycles):
+        """Run every pattern for the specified number of cycles.
+
+        patterns is a list of settings dictionaries, as for set_patterns.
+        Return a list with one trace dictionary per pattern, in the same
+        form as Monitors.monitors_dictionary. Like the command line
+        interface, recording stops at the first cycle a pattern oscillates;
+        that cycle is stored in failed_cycles. Return None if the network
+        cannot be compiled.
+        """
+        if not self.compile():
+            return None
+        self.load_state(len(patterns))
+        self.set_patterns(patterns)
+
+        monitor_slots = [self.slot_index[key]
+                         for key in self.monitors.monitors_dictionary]
+        words = [[] for _ in monitor_slots]  # (value, edge) per cycle
+        for cycle in range(cycles):
+            unsettled = self.execute_network()
+            while unsettled:
+                pattern = unsettled.bit_length() - 1
+                if self.failed_cycles[pattern] is None:
+                    self.failed_cycles[pattern] = cycle
+                unsettled &= ~(1 << pattern)
+            for slot, monitor_words in zip(monitor_slots, words):
+                monitor_words.append((self.values[slot], self.edges[slot]))
+            self.cycles_completed += 1
+
+        traces = []
+        for pattern in range(self.num_patterns):
+            length = self.failed_cycles[pattern]
+            if length is None:
+                length = cycles
+            trace = collections.OrderedDict()
+            for key, monitor_words in zip(self.monitors.monitors_dictionary,
+                                          words):
+                trace[key] = [self.decode(value, edge, pattern)
+                              for value, edge in monitor_words[:length]]
+            traces.append(trace)
+        return traces
+
+    def counting_word(self, bit, start, count):
+        """Return the word of one bit of the pattern numbers.
+
+        Pattern p of the word stands for the number start + p, and bit p of
+        the returned word is the specified bit of that number. count must
+        be a power of two and start a multiple of count.
+        """
+        period = 1 << bit
+        if period >= count:  # the bit is the same for the whole word
+            if (start >> bit) & 1:
+                return (1 << count) - 1
+            return 0
+        # Repeat period zeros followed by period ones along the word
+        block = ((1 << period) - 1) << period
+        return ((1 << count) - 1) // ((1 << 2 * period) - 1) * block
+
+    def write_truth_table(self, output_file, chunk_bits=16):
+        """Write the truth table of a combinational network to output_file.
+
+        Every combination of the switches is simulated, 2**chunk_bits
+        combinations at a time, and a row with the switch states and the
+        monitored outputs is written for each one. The first switch is the
+        most significant bit of the row number.
+
+        Return True if successful, or False if the network cannot be
+        compiled, is not combinational or has no monitors.
+        """
+        devices = self.devices
+        if (devices.find_devices(devices.D_TYPE) or
+                devices.find_devices(devices.CLOCK) or
+                devices.find_devices(devices.SIGGEN)):
+            return False
+        if not self.monitors.monitors_dictionary or not self.compile():
+            return False
+
+        switch_ids = devices.find_devices(devices.SWITCH)
+        num_inputs = len(switch_ids)
+        monitored_names = self.monitors.get_signal_names()[0]
+        input_names = [self.names.get_name_string(device_id)
+                       for device_id in switch_ids]
+        output_file.write(" ".join(input_names) + " | " +
+                          " ".join(monitored_names) + "\n")
+
+        count = 1 << min(chunk_bits, num_inputs)
+        for start in range(0, 1 << num_inputs, count):
+            self.load_state(count)
+            self.set_switch_words(
+                {device_id: self.counting_word(num_inputs - 1 - column,
+                                               start, count)
+                 for column, device_id in enumerate(switch_ids)})
+            self.execute_network()
+            # Bit strings in pattern order, one character per pattern
+            columns = []
+            for device_id, output_id in self.monitors.monitors_dictionary:
+                value = self.get_signal_word(device_id, output_id)[0]
+                columns.append(format(value, "0" + str(count) + "b")[::-1])
+            rows = []
+            for pattern in range(count):
+                inputs = format(start + pattern, "0" + str(num_inputs) + "b")
+                rows.append(" ".join(inputs) + " | " + " ".join(
+                    column[pattern] for column in columns) + "\n")
+            output_file.write("".join(rows))
+        return True
@@ -7,9 +7,48 @@ logic network.
 Classes
 -------
 Parser - parses the definition file and builds the logic network.
+SymbolTable - an ordered collection with constant time membership checks.
 """
 from __future__ import annotations
-from typing import Optional, List, Tuple
+from typing import Optional, Tuple
+
+
+class SymbolTable:
+    """Hold an ordered collection with constant time membership checks.
+
+    The parser checks every device and signal against the ones declared
+    before it. The items are kept in a dictionary, so the checks do not
+    slow down as the definition file grows, and they are iterated in the
+    order they were added. Items must be hashable.
+
+    Parameters
+    ----------
+    items: optional iterable of items to add.
+
+    Public methods
+    --------------
+    append(self, item): Adds an item to the end of the table.
+    """
+
+    def __init__(self, items=()):
+        """Initialise the table."""
+        self.items = dict.fromkeys(items)
+
+    def append(self, item):
+        """Add an item to the end of the table."""
+        self.items[item] = None
+
+    def __contains__(self, item):
+        """Return True if the item is in the table."""
+        return item in self.items
+
+    def __iter__(self):
+        """Iterate over the items in the order they were added."""
+        return iter(self.items)
+
+    def __len__(self):
+        """Return the number of items in the table."""
+        return len(self.items)
 
 
 class Parser:
@@ -54,10 +93,9 @@ class Parser:
         self.end_of_block = False
 
     def _advance(self):
-        """Fetch the next symbol from the scanner, updating line/column."""
-        self.symbol, self.line, self.column = self.scanner.get_symbol(
-            self.line, self.column
-        )
+        """Fetch the next symbol from the scanner's stream, updating line."""
+        self.symbol = self.scanner.next_symbol()
+        self.line = self.symbol.line
 
     # -----------------------------------------------------------------------
     def _accept(self, sym_type: int, sym_id: Optional[int] = None) -> bool:
@@ -84,10 +122,11 @@ class Parser:
         self.error_count += 1
         self.error_flag = True
         self.errors.append((error_msg, self.symbol.line, self.symbol.column))
-        # advance until stopping symbol is found
-        while (self.symbol.type not in self.stopping_set and
+        # skip ahead in the symbol stream until stopping symbol is found
+        if (self.symbol.type not in self.stopping_set and
                 self.symbol.type != self.scanner.EOF):
-            self._advance()
+            self.symbol = self.scanner.skip_symbols(self.stopping_set)
+            self.line = self.symbol.line
         if self.symbol.type == self.scanner.EOF:
             # This is for debugging
             # print("Error recovery was not possible, end of file reached")
@@ -130,14 +169,14 @@ class Parser:
         # For now just return True, so that userint and gui can run in the
         # skeleton code. When complete, should return False when there are
         # errors in the circuit definition file.
-        self.symbol, self.line, self.column = self.scanner.get_symbol(self.line, self.column)
+        self._advance()
 
         # device list
-        self.dev_list: List[int] = []
+        self.dev_list: SymbolTable = SymbolTable()
         # list of connections
-        self.input_con_list: List[Tuple[int, Optional[int]]] = []
+        self.input_con_list: SymbolTable = SymbolTable()
         # list of monitors
-        self.monitors_list: List[Tuple[int, Optional[int]]] = []
+        self.monitors_list: SymbolTable = SymbolTable()
 
         guitest = False
         if guitest:
@@ -218,7 +257,7 @@ class Parser:
             return False
         # first identifier added to names list
         #print("hello", self.names.get_name_string(self.symbol.id))
-        names_list: List[int] = [self._device_name()]
+        names_list: SymbolTable = SymbolTable([self._device_name()])
 
         if self.error_flag:
             print("error")
@@ -704,7 +743,7 @@ class Parser:
             self.error_flag = False
             return False
 
-        local_monitors = [output_signal]
+        local_monitors = SymbolTable([output_signal])
 
         while self._accept(self.scanner.COMMA):
             if self.symbol.type != self.scanner.CLOSECURLY:
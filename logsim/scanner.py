@@ -8,26 +8,38 @@ Classes
 Scanner - reads definition file and translates characters into symbols.
 Symbol - encapsulates a symbol and stores its properties.
 """
+import collections
+import re
+import sys
 
 
 class Symbol:
     """Encapsulate a symbol and store its properties.
 
+    Symbols have fixed slots rather than an attribute dictionary, as one is
+    made for every symbol in the file.
+
     Parameters
     ----------
-    No parameters.
+    symbol_type: optional symbol type.
+    symbol_id: optional name ID or number of the symbol.
+    line: optional line of the symbol.
+    column: optional column of the symbol.
 
     Public methods
     --------------
     No public methods.
     """
 
-    def __init__(self):
+    __slots__ = ('type', 'id', 'line', 'column')
+
+    def __init__(self, symbol_type=None, symbol_id=None, line=None,
+                 column=None):
         """Initialise symbol properties."""
-        self.type = None
-        self.id = None
-        self.line = None
-        self.column = None
+        self.type = symbol_type
+        self.id = symbol_id
+        self.line = line
+        self.column = column
 
 
 class Scanner:
@@ -38,10 +50,21 @@ class Scanner:
     that the parser can use. It also skips over comments and irrelevant
     formatting characters, such as spaces and line breaks.
 
+    By default the file is read one character at a time. In buffered mode
+    the whole file is read once, and get_symbol finds each symbol with
+    compiled regular expressions and slices of the text, giving the same
+    symbols, lines and columns.
+
+    The definition can also be given as UTF-8 bytes or as a text or binary
+    stream, such as an io.StringIO of a generated definition. A path of
+    '-' reads standard input. These are always read in buffered mode, with
+    line endings translated as when a file is opened.
+
     Parameters
     ----------
-    path: path to the circuit definition file.
+    path: path to the circuit definition file, '-', bytes or a stream.
     names: instance of the names.Names() class.
+    buffered: True to read the whole file at once.
 
     Public methods
     -------------
@@ -52,21 +75,49 @@ class Scanner:
     get_number(self, column): Reads a sequence of digits and returns it as an
                         integer.
     advance(self, column): Advances to the next character in the file.
+    read_text(self, source): Returns the definition text from bytes or a
+                      stream.
+    read_character(self): Returns the next character in the file.
     get_symbol(self): Translates the next sequence of characters into a symbol
                       and returns the symbol.
+    get_buffered_symbol(self, line, column): Translates the next symbol in
+                      buffered mode.
+    buffered_symbols(self, line, column, record_state=False): Yields each
+                      symbol in buffered mode.
+    character_symbols(self, line, column): Yields each symbol from
+                      get_symbol.
+    symbols(self, line=1, column=0): Returns a generator of the symbols.
+    next_symbol(self): Returns the next symbol of the symbol stream.
+    peek_symbol(self, count=1): Returns a symbol ahead in the symbol stream.
+    skip_symbols(self, symbol_types): Skips to the next symbol of one of the
+                      specified types.
+    get_line_offsets(self): Returns the offsets at which each line starts.
     get_line(self, line_number): Returns a specific line of the input file.
+    count_lines(self): Returns the number of lines in the input file.
     print_error_line(self, line, column): Prints the line with a caret (^) under
                       the character at the specified line and column.
     """
 
-    def __init__(self, path, names):
+    def __init__(self, path, names, buffered=False):
         """Open specified file and initialise reserved words and IDs."""
-        self.file = open(path, 'r', encoding='utf-8')
-        self.current_char = self.file.read(1)
+        self.file = None
+        self.text = None  # the whole file in buffered mode
+        if isinstance(path, str) and path == '-':
+            path = sys.stdin
+        if isinstance(path, (bytes, bytearray)) or hasattr(path, 'read'):
+            self.text = self.read_text(path)
+        elif buffered:
+            with open(path, 'r', encoding='utf-8') as file:
+                self.text = file.read()
+        else:
+            self.file = open(path, 'r', encoding='utf-8')
+        self.position = 0  # index in text after current_char
+        self.current_char = self.read_character()
         self.names = names
         self.comment_opened = False  # True if a multi-line comment is open
         self.comment_opened_line = None
         self.comment_opened_column = None
+        self.line_offsets = None  # made by get_line_offsets
         # NOTE If you need to add a symbol type, increment the range
         self.symbol_type_list = [self.KEYWORD, self.SEMICOLON, self.EQUALS,
                                  self.COMMA,  self.NUMBER, self.NAME, self.EOF,
@@ -84,6 +135,53 @@ class Scanner:
          self.AND, self.OR, self.NAND, self.NOR, self.XOR, self.DTYPE,
          self.CLOCK,self.SIGGEN, self.SWITCH] = self.names.lookup(self.keywords_list)
 
+        # Buffered mode finds symbols with these patterns. \s and \w match
+        # the same characters as str.isspace() and str.isalnum() or '_'.
+        # The groups of token_pattern are the whitespace before a symbol,
+        # then an ASCII name, punctuation, the start of a comment, a number
+        # or any other character.
+        self.whitespace_pattern = re.compile(r'\s*')
+        self.name_pattern = re.compile(r'\w*')
+        self.token_pattern = re.compile(
+            r'(\s*)(?:([A-Za-z]\w*)|([,;={}().]|->)|([#/])|(\d+)|(.))?',
+            re.DOTALL)
+        self.punctuation = {',': self.COMMA, ';': self.SEMICOLON,
+                            '=': self.EQUALS, '{': self.OPENCURLY,
+                            '}': self.CLOSECURLY, '(': self.OPENBRAC,
+                            ')': self.CLOSEBRAC, '.': self.FULLSTOP,
+                            '->': self.ARROW}
+        self.keywords_set = set(self.keywords_list)
+        self.name_ids = {}  # {name_string: name_id} of the names scanned
+        # get_buffered_symbol resumes buffered_generator while the position,
+        # line and column match buffered_state
+        self.buffered_generator = None
+        self.buffered_state = None
+        # next_symbol reads symbols from lookahead, then from stream, which
+        # starts from the line and column after the last get_symbol call
+        self.stream = None
+        self.next_line_column = (1, 0)
+        self.lookahead = collections.deque()
+
+    def read_text(self, source):
+        """Return the definition text from bytes or a stream.
+
+        Bytes are decoded as UTF-8, and '\\r\\n' and '\\r' line endings
+        become '\\n', as when a file is opened in text mode.
+        """
+        if hasattr(source, 'read'):
+            source = source.read()
+        if isinstance(source, (bytes, bytearray)):
+            source = bytes(source).decode('utf-8')
+        return source.replace('\r\n', '\n').replace('\r', '\n')
+
+    def read_character(self):
+        """Return the next character in the file, or '' at the end."""
+        if self.text is None:
+            return self.file.read(1)
+        char = self.text[self.position:self.position + 1]
+        self.position += len(char)
+        return char
+
     def skip_whitespace(self, line, column):
         """Skip whitespace characters in the file."""
         # Skip whitespace characters
@@ -95,7 +193,7 @@ class Scanner:
                 column = 0
             else:
                 column += 1
-            self.current_char = self.file.read(1)
+            self.current_char = self.read_character()
         return line, column
 
     def skip_comments(self, line, column):
@@ -104,16 +202,16 @@ class Scanner:
         if self.current_char == '#':
             # single lines terminate with newline or EOF
             while self.current_char not in ('\n', ''):
-                self.current_char = self.file.read(1)
+                self.current_char = self.read_character()
                 if self.current_char == '\n':
                     line += 1
                     column = 0
-                    self.current_char = self.file.read(1)
+                    self.current_char = self.read_character()
                     break
 
         # Skip multi-line comments
         elif self.current_char == '/':
-            next_char = self.file.read(1)
+            next_char = self.read_character()
             if next_char == '*':
                 self.comment_opened = True
                 self.comment_opened_line = line
@@ -121,7 +219,7 @@ class Scanner:
                 prev = None
                 # Consume until we see '*' followed by '/'
                 while True:
-                    self.current_char = self.file.read(1)
+                    self.current_char = self.read_character()
                     if self.current_char == '':
                         # EOF reached without closing comment
                         break
@@ -133,7 +231,7 @@ class Scanner:
                     if prev == '*' and self.current_char == '/':
                         # set current_char to the next character after '/'
                         self.comment_opened = False
-                        self.current_char = self.file.read(1)
+                        self.current_char = self.read_character()
                         break
                     prev = self.current_char
         return line, column
@@ -145,7 +243,7 @@ class Scanner:
         while self.current_char.isalnum() or self.current_char == '_':
             name += self.current_char
             column += 1
-            self.current_char = self.file.read(1)
+            self.current_char = self.read_character()
         return name, column
 
     def get_number(self, column):
@@ -154,16 +252,20 @@ class Scanner:
         while self.current_char.isdigit():
             number += self.current_char
             column += 1
-            self.current_char = self.file.read(1)
+            self.current_char = self.read_character()
         return int(number), column
 
     def advance(self, column):
         """Advance to the next character in the file."""
-        self.current_char = self.file.read(1)
+        self.current_char = self.read_character()
         return column + 1
 
     def get_symbol(self, line, column):
         """Translate the next sequence of characters into a symbol."""
+        if self.text is not None:
+            symbol, line, column = self.get_buffered_symbol(line, column)
+            self.next_line_column = (line, column)
+            return symbol, line, column
         symbol = Symbol()
         # skip whitespace and comments before reading the next character
         line, column = self.skip_whitespace(line, column)
@@ -223,27 +325,278 @@ class Scanner:
         else:
             column = self.advance(column)
 
+        self.next_line_column = (line, column)
         return symbol, line, column
 
+    def get_buffered_symbol(self, line, column):
+        """Translate the next symbol in buffered mode.
+
+        Successive calls resume one buffered_symbols generator, which is
+        started again if the position, line or column do not carry on from
+        the previous symbol.
+        """
+        if self.buffered_state != (self.position, line, column):
+            self.buffered_generator = self.buffered_symbols(line, column,
+                                                            True)
+        return next(self.buffered_generator)
+
+    def buffered_symbols(self, line, column, record_state=False):
+        """Yield the next symbol, line and column for ever in buffered mode.
+
+        If record_state is True, the position, line and column after each
+        symbol are kept in buffered_state for get_buffered_symbol.
+
+        This follows get_symbol exactly: comments do not advance the column,
+        only one comment is skipped after whitespace that follows a comment,
+        and a '/' that does not open a comment drops the text up to the next
+        '*', which then opens one. Unlike get_symbol, a '/' with no '*' after
+        it drops the rest of the file rather than never returning. Once the
+        end of the file is reached, the EOF symbol is yielded each time.
+        """
+        text = self.text
+        end = len(text)
+        match_token = self.token_pattern.match
+        match_name = self.name_pattern.match
+        keywords_set = self.keywords_set
+        name_ids = self.name_ids
+        punctuation = self.punctuation
+        [EOF, KEYWORD, NAME, NUMBER] = [self.EOF, self.KEYWORD, self.NAME,
+                                        self.NUMBER]
+        position = self.position - len(self.current_char)
+        while True:
+            match = match_token(text, position)
+            start = match.end(1)
+            if start > position:  # whitespace
+                newline = text.rfind('\n', position, start)
+                if newline < 0:
+                    column += start - position
+                else:
+                    line += text.count('\n', position, newline + 1)
+                    column = start - newline - 1
+            kind = match.lastindex
+            if kind == 4:  # a comment, or a '/' that leads to one
+                line, column, position = self.skip_buffered_comments(
+                    line, column, start)
+                line, column, position = self.skip_buffered_whitespace(
+                    line, column, position)
+                match = match_token(text, position)
+                start = match.end(1)
+                kind = match.lastindex
+                if kind == 4:  # get_symbol only skips comments once
+                    kind = 6
+            symbol_line = line
+            symbol_column = column
+            stop = match.end()
+            symbol_id = None
+
+            if kind == 2:
+                name_string = text[start:stop]
+                # check if the name is a keyword or an identifier
+                if name_string in keywords_set:
+                    symbol_type = KEYWORD
+                else:
+                    symbol_type = NAME
+                symbol_id = name_ids.get(name_string)
+                if symbol_id is None:
+                    [symbol_id] = self.names.lookup([name_string])
+                    name_ids[name_string] = symbol_id
+            elif kind == 3:
+                symbol_type = punctuation[text[start:stop]]
+            elif kind == 1:
+                # End of file
+                symbol_type = EOF
+            elif kind == 5 or text[start].isdigit():
+                # digits that are not decimal are left for int() to reject
+                while stop < end and text[stop].isdigit():
+                    stop += 1
+                symbol_type = NUMBER
+                symbol_id = int(text[start:stop])
+            elif text[start].isalpha():
+                # a name starting with a letter outside ASCII
+                stop = match_name(text, start + 1).end()
+                name_string = text[start:stop]
+                symbol_type = NAME
+                symbol_id = name_ids.get(name_string)
+                if symbol_id is None:
+                    [symbol_id] = self.names.lookup([name_string])
+                    name_ids[name_string] = symbol_id
+            else:
+                # symbol type is None for characters that start no symbol
+                symbol_type = None
+            column += stop - start
+
+            self.current_char = text[stop:stop + 1]
+            self.position = stop + len(self.current_char)
+            if record_state:
+                self.buffered_state = (self.position, line, column)
+            yield (Symbol(symbol_type, symbol_id, symbol_line, symbol_column),
+                   line, column)
+            position = stop
+
+    def character_symbols(self, line, column):
+        """Yield the next symbol, line and column from get_symbol for ever."""
+        while True:
+            symbol, line, column = self.get_symbol(line, column)
+            yield symbol, line, column
+
+    def symbols(self, line=1, column=0):
+        """Return a generator of the symbols from the current position.
+
+        The generator yields the same (symbol, line, column) tuples as
+        successive calls to get_symbol, starting from the specified line
+        and column, and yields the EOF symbol for ever at the end of the
+        file.
+        """
+        if self.text is not None:
+            return self.buffered_symbols(line, column)
+        return self.character_symbols(line, column)
+
+    def next_symbol(self):
+        """Return the next symbol of the symbol stream.
+
+        The stream is started from the current position the first time it
+        is used, carrying on from any symbols read with get_symbol. After
+        that, get_symbol should not be called.
+        """
+        if self.lookahead:
+            return self.lookahead.popleft()
+        if self.stream is None:
+            self.stream = self.symbols(*self.next_line_column)
+        return next(self.stream)[0]
+
+    def peek_symbol(self, count=1):
+        """Return the symbol count places ahead in the symbol stream.
+
+        peek_symbol(1) is the symbol next_symbol will return. The symbols
+        are kept until they are returned by next_symbol.
+        """
+        if self.stream is None:
+            self.stream = self.symbols(*self.next_line_column)
+        while len(self.lookahead) < count:
+            self.lookahead.append(next(self.stream)[0])
+        return self.lookahead[count - 1]
+
+    def skip_symbols(self, symbol_types):
+        """Return the next symbol of one of the specified types, or EOF.
+
+        The symbols of the stream before it are dropped.
+        """
+        symbol = self.next_symbol()
+        while symbol.type not in symbol_types and symbol.type != self.EOF:
+            if self.lookahead:
+                symbol = self.lookahead.popleft()
+            else:
+                symbol = next(self.stream)[0]
+        return symbol
+
+    def skip_buffered_comments(self, line, column, position):
+        """Skip comments from position in buffered mode.
+
+        Return the line, column and position after the comments.
+        """
+        text = self.text
+        end = len(text)
+        while position < end and text[position] in '#/':
+            if text[position] == '#':
+                newline = text.find('\n', position + 1)
+                if newline < 0:
+                    position = end
+                else:
+                    line += 1
+                    column = 0
+                    position = newline + 1
+                continue
+            star = text.find('*', position + 1)
+            if star < 0:
+                return line, column, end
+            self.comment_opened = True
+            self.comment_opened_line = line
+            self.comment_opened_column = column
+            close = text.find('*/', star + 1)
+            if close < 0:
+                close = end
+            newlines = text.count('\n', star + 1, close)
+            if newlines:
+                line += newlines
+                column = 0
+            if close < end:
+                self.comment_opened = False
+                position = close + 2
+            else:
+                position = end
+        return line, column, position
+
+    def skip_buffered_whitespace(self, line, column, position):
+        """Skip whitespace from position in buffered mode.
+
+        Return the line, column and position after the whitespace.
+        """
+        stop = self.whitespace_pattern.match(self.text, position).end()
+        if stop > position:
+            newline = self.text.rfind('\n', position, stop)
+            if newline < 0:
+                column += stop - position
+            else:
+                line += self.text.count('\n', position, newline + 1)
+                column = stop - newline - 1
+        return line, column, stop
+
+    def get_line_offsets(self):
+        """Return the offsets at which each line starts, making them if needed.
+
+        The offsets are found in one pass over the file the first time a
+        line is needed. In buffered mode they are indexes in the text, and
+        otherwise they are file positions from tell().
+        """
+        if self.line_offsets is None:
+            self.line_offsets = []
+            if self.text is not None:
+                start = 0
+                while start < len(self.text):
+                    self.line_offsets.append(start)
+                    start = self.text.find('\n', start) + 1
+                    if start == 0:  # no newline after the last line
+                        break
+            else:
+                scan_position = self.file.tell()
+                self.file.seek(0)
+                while True:
+                    offset = self.file.tell()
+                    if not self.file.readline():
+                        break
+                    self.line_offsets.append(offset)
+                self.file.seek(scan_position)
+        return self.line_offsets
+
     def get_line(self, line_number):
         """Return a specific line of an input file."""
-        self.file.seek(0)  # Reset file pointer to the beginning
-        for current_line_number, line in enumerate(self.file, start=1):
-            if current_line_number == line_number:
-                # Return the line without trailing newline
-                return line.rstrip('\n')
-        return None  # If the line number is out of range
+        offsets = self.get_line_offsets()
+        if not 1 <= line_number <= len(offsets):
+            return None  # If the line number is out of range
+        start = offsets[line_number - 1]
+        if self.text is not None:
+            end = self.text.find('\n', start)
+            return self.text[start:] if end < 0 else self.text[start:end]
+        # Read the line and go back to where the scanner had read to
+        scan_position = self.file.tell()
+        self.file.seek(start)
+        line = self.file.readline()
+        self.file.seek(scan_position)
+        # Return the line without trailing newline
+        return line.rstrip('\n')
+
+    def count_lines(self):
+        """Return the number of lines in the input file."""
+        return len(self.get_line_offsets())
 
     def print_error_line(self, line, column):
         """Print the line with a caret (^) underneath the character at error_pos."""
-        self.file.seek(0)
-        num_lines = len(self.file.readlines())
+        num_lines = self.count_lines()
         if line>num_lines:
             line = num_lines
         if num_lines == 0:
             print("Error: File is empty.")
             return
-        self.file.seek(0)
         line_text = self.get_line(line)
         print(line_text)
         if 0 <= column and column < len(line_text):
@@ -0,0 +1,191 @@
+"""Run many seeded cold starts of a network across a process pool.
+
+Used in the Logic Simulator project to study start-up behaviour, since
+Devices.cold_startup randomises D-type memories and clock phases.
+
+Classes
+-------
+ColdStartSweep - runs seeded cold starts and collects monitor statistics.
+"""
+import concurrent.futures
+import copy
+import os
+import random
+
+from monitors import Monitors
+
+# The network simulated by this worker process, set by init_worker
+worker_state = None
+
+
+def init_worker(names, devices, network, monitor_keys, cycles):
+    """Store the network of a worker process, sent once per worker.
+
+    Only the netlist and the monitored (device_id, output_id) keys are
+    sent, and the worker makes its own empty monitors for them. The device
+    outputs and switch states are saved, so that every seed can start from
+    the network as it was sent.
+    """
+    global worker_state
+    monitors = Monitors(names, devices, network)
+    for device_id, output_id in monitor_keys:
+        monitors.make_monitor(device_id, output_id)
+    snapshot = [(device, dict(device.outputs), device.switch_state)
+                for device in devices.devices_list]
+    worker_state = (devices, network, monitors, cycles, snapshot)
+
+
+def restore_worker(network, snapshot):
+    """Put the worker's network back in the state saved by init_worker."""
+    for device, outputs, switch_state in snapshot:
+        device.outputs.update(outputs)
+        device.switch_state = switch_state
+    network.events_valid = False
+    if network.vector_engine is not None:
+        network.vector_engine.synchronised = False
+
+
+def run_seeds(seeds):
+    """Run one cold start per seed in the worker's network.
+
+    Return a {(device_id, output_id): [[count per signal] per cycle]}
+    dictionary of signal counts and the number of runs that oscillated.
+    """
+    (devices, network, monitors, cycles, snapshot) = worker_state
+    counts = {key: [[0] * len(devices.signal_types) for _ in range(cycles)]
+              for key in monitors.monitors_dictionary}
+    oscillated = 0
+    for seed in seeds:
+        restore_worker(network, snapshot)
+        devices.cold_startup(random.Random(seed))
+        for cycle in range(cycles):
+            if not network.execute_network():
+                oscillated += 1
+                break
+            for key, cycle_counts in counts.items():
+                cycle_counts[cycle][network.get_output_signal(*key)] += 1
+    return counts, oscillated
+
+
+class ColdStartSweep:
+
+    """Run seeded cold starts of a network and collect monitor statistics.
+
+    Run i of a sweep passes a random.Random(seed + i) generator to
+    Devices.cold_startup, so results do not depend on how the runs are
+    split between processes. The names, devices and network are pickled
+    and sent to each worker process once, when it starts, with the keys of
+    the monitored signals. The monitors themselves are not sent, so their
+    traces and listeners stay in this process. Each worker runs a share of
+    the seeds and returns its signal counts, which are added together here.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+
+    Public methods
+    --------------
+    run(self, runs, cycles, seed=0, workers=None): Runs the cold starts and
+                                                   collects the statistics.
+
+    get_high_fraction(self, device_id, output_id): Returns the fraction of
+                                                   runs in which a monitor
+                                                   was HIGH in each cycle.
+
+    display_statistics(self): Displays the sweep statistics in the text
+                              console.
+    """
+
+    def __init__(self, names, devices, network, monitors):
+        """Initialise the sweep statistics."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+
+        # signal_counts stores
+        # {(device_id, output_id): [[count per signal] per cycle]}
+        self.signal_counts = {}
+        self.runs = 0
+        self.oscillated_runs = 0
+
+    def run(self, runs, cycles, seed=0, workers=None):
+        """Run the cold starts and collect the monitor statistics.
+
+        workers is the number of processes, by default one per CPU. With a
+        single worker the runs are done in this process, on a copy of the
+        network, so the devices and the random module are left as they were.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, runs))
+        seeds = range(seed, seed + runs)
+        shares = [seeds[index::workers] for index in range(workers)]
+        state = (self.names, self.devices, self.network,
+                 list(self.monitors.monitors_dictionary), cycles)
+
+        if workers == 1:
+            init_worker(*copy.deepcopy(state))
+            results = [run_seeds(seeds)]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, initializer=init_worker,
+                    initargs=state) as executor:
+                results = list(executor.map(run_seeds, shares))
+
+        self.runs = runs
+        self.oscillated_runs = 0
+        self.signal_counts = {
+            key: [[0] * len(self.devices.signal_types)
+                  for _ in range(cycles)]
+            for key in self.monitors.monitors_dictionary}
+        for counts, oscillated in results:
+            self.oscillated_runs += oscillated
+            for key, cycle_counts in counts.items():
+                for total, count in zip(self.signal_counts[key],
+                                        cycle_counts):
+                    for signal, number in enumerate(count):
+                        total[signal] += number
+
+    def get_high_fraction(self, device_id, output_id):
+        """Return the fraction of runs that were HIGH in each cycle.
+
+        Cycles reached by no run, because every run oscillated, are None.
+        Return None if the signal is not monitored.
+        """
+        if (device_id, output_id) not in self.signal_counts:
+            return None
+        fractions = []
+        for count in self.signal_counts[(device_id, output_id)]:
+            total = sum(count)
+            if total:
+                fractions.append(count[self.devices.HIGH] / total)
+            else:
+                fractions.append(None)
+        return fractions
+
+    def display_statistics(self):
+        """Display the sweep statistics in the text console.
+
+        Each cycle is shown as "_" if every run was LOW, "-" if every run
+        was HIGH, or the fraction of HIGH runs in tenths otherwise.
+        """
+        print(" ".join(["Oscillated in", str(self.oscillated_runs), "of",
+                        str(self.runs), "runs."]))
+        margin = self.monitors.get_margin()
+        for device_id, output_id in self.signal_counts:
+            monitor_name = self.devices.get_signal_name(device_id, output_id)
+            print(monitor_name + (margin - len(monitor_name)) * " ", end=": ")
+            for fraction in self.get_high_fraction(device_id, output_id):
+                if fraction is None:
+                    print(" ", end="")
+                elif fraction == 0:
+                    print("_", end="")
+                elif fraction == 1:
+                    print("-", end="")
+                else:
+                    print(min(9, max(1, int(fraction * 10))), end="")
+            print("\n", end="")
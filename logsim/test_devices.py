@@ -1,4 +1,6 @@
 """Test the devices module."""
+import random
+
 import pytest
 
 from names import Names
@@ -45,11 +47,23 @@ def test_find_devices(devices_with_items):
     device_names = [AND1_ID, NOR1_ID, SW1_ID] = names.lookup(["And1", "Nor1",
                                                               "Sw1"])
 
-    assert devices.find_devices() == device_names
-    assert devices.find_devices(devices.AND) == [AND1_ID]
-    assert devices.find_devices(devices.NOR) == [NOR1_ID]
-    assert devices.find_devices(devices.SWITCH) == [SW1_ID]
-    assert devices.find_devices(devices.XOR) == []
+    assert devices.find_devices() == tuple(device_names)
+    assert devices.find_devices(devices.AND) == (AND1_ID,)
+    assert devices.find_devices(devices.NOR) == (NOR1_ID,)
+    assert devices.find_devices(devices.SWITCH) == (SW1_ID,)
+    assert devices.find_devices(devices.XOR) == ()
+
+
+def test_find_devices_updates_after_add(devices_with_items):
+    """Test if find_devices reflects devices added after an earlier call."""
+    devices = devices_with_items
+    names = devices.names
+    [AND1_ID, AND2_ID] = names.lookup(["And1", "And2"])
+
+    assert devices.find_devices(devices.AND) == (AND1_ID,)
+    devices.make_device(AND2_ID, devices.AND, 2)
+    assert devices.find_devices(devices.AND) == (AND1_ID, AND2_ID)
+    assert devices.find_devices()[-1] == AND2_ID
 
 
 def test_make_device(new_devices):
@@ -148,3 +162,32 @@ def test_set_switch(new_devices):
     # Set switch Sw1 to LOW
     new_devices.set_switch(SW1_ID, new_devices.LOW)
     assert switch_object.switch_state == new_devices.LOW
+
+
+def test_cold_startup_order(new_devices):
+    """Test if cold_startup draws random values in devices_list order."""
+    names = new_devices.names
+    [CL1_ID, D1_ID, CL2_ID, D2_ID] = names.lookup(["Clock1", "D1", "Clock2",
+                                                  "D2"])
+    new_devices.make_device(CL1_ID, new_devices.CLOCK, 5)
+    new_devices.make_device(D1_ID, new_devices.D_TYPE)
+    new_devices.make_device(CL2_ID, new_devices.CLOCK, 7)
+    new_devices.make_device(D2_ID, new_devices.D_TYPE)
+
+    rng = random.Random(3)
+    expected = []
+    for device in new_devices.devices_list:
+        if device.device_kind == new_devices.CLOCK:
+            expected.append((rng.choice([0, 1]),
+                             rng.randrange(device.clock_half_period)))
+        else:
+            expected.append(rng.choice([0, 1]))
+
+    new_devices.cold_startup(random.Random(3))
+    states = []
+    for device in new_devices.devices_list:
+        if device.device_kind == new_devices.CLOCK:
+            states.append((device.outputs[None], device.clock_counter))
+        else:
+            states.append(device.dtype_memory)
+    assert states == expected
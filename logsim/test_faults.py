@@ -0,0 +1,111 @@
+"""Test the faults module."""
+import os
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+from faults import FaultSimulator
+
+
+@pytest.fixture
+def adder_simulator():
+    """Return a FaultSimulator for the full adder definition file."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    path = os.path.join(os.path.dirname(__file__), "test_full_adder.txt")
+    parser = Parser(names, devices, network, monitors, Scanner(path, names))
+    assert parser.parse_network()
+    return FaultSimulator(names, devices, network, monitors)
+
+
+def test_list_faults(adder_simulator):
+    """Test if faults are listed on every output and input pin."""
+    simulator = adder_simulator
+    faults = simulator.list_faults()
+    # 3 switch outputs, 6 gate outputs and 13 gate inputs, stuck at 0 and 1
+    assert len(faults) == 44
+    [OR1_ID, I3] = simulator.names.lookup(["OR1", "I3"])
+    assert (OR1_ID, I3, 1) in faults
+    assert simulator.get_fault_name((OR1_ID, I3, 1)) == "OR1.I3 stuck-at-1"
+
+
+def test_detected_faults(adder_simulator):
+    """Test which faults are detected with every switch LOW."""
+    simulator = adder_simulator
+    names = simulator.names
+    [A_ID, B_ID, C_ID] = names.lookup(["A", "B", "C"])
+    results = simulator.simulate({A_ID: 0, B_ID: 0, C_ID: 0}, 1,
+                                 group_size=5)
+    detected = sorted(simulator.get_fault_name(fault)
+                      for fault, cycle in results.items()
+                      if cycle is not None)
+    assert detected == sorted(
+        ["A stuck-at-1", "B stuck-at-1", "C stuck-at-1", "AND1 stuck-at-1",
+         "AND2 stuck-at-1", "AND3 stuck-at-1", "OR1 stuck-at-1",
+         "OR1.I1 stuck-at-1", "OR1.I2 stuck-at-1", "OR1.I3 stuck-at-1",
+         "XOR1 stuck-at-1", "XOR1.I1 stuck-at-1", "XOR1.I2 stuck-at-1",
+         "XOR2 stuck-at-1", "XOR2.I1 stuck-at-1", "XOR2.I2 stuck-at-1"])
+    # The program is restored for the next run
+    assert simulator.simulator.program == simulator.base_program
+
+
+def test_full_coverage(adder_simulator):
+    """Test if every switch combination together detects every fault."""
+    simulator = adder_simulator
+    [A_ID, B_ID, C_ID] = simulator.names.lookup(["A", "B", "C"])
+    undetected = set(simulator.list_faults())
+    for number in range(8):
+        stimulus = {A_ID: number >> 2 & 1, B_ID: number >> 1 & 1,
+                    C_ID: number & 1}
+        results = simulator.simulate(stimulus, 1)
+        undetected -= {fault for fault, cycle in results.items()
+                       if cycle is not None}
+    assert not undetected
+
+
+def test_sequential_faults():
+    """Test if D-type pin faults are detected on the clock edge."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [SW1_ID, SW2_ID, CL_ID, D_ID] = names.lookup(["Sw1", "Sw2", "Clock1",
+                                                  "D1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 2)
+    devices.make_device(D_ID, devices.D_TYPE)
+    for connection in [(SW1_ID, None, D_ID, devices.DATA_ID),
+                       (CL_ID, None, D_ID, devices.CLK_ID),
+                       (SW2_ID, None, D_ID, devices.SET_ID),
+                       (SW2_ID, None, D_ID, devices.CLEAR_ID)]:
+        assert network.make_connection(*connection) == network.NO_ERROR
+    monitors.make_monitor(D_ID, devices.Q_ID)
+
+    random.seed(0)
+    devices.cold_startup()
+    device = devices.get_device(D_ID)
+    device.dtype_memory = devices.LOW
+    device.outputs[devices.Q_ID] = devices.LOW
+    device.outputs[devices.QBAR_ID] = devices.HIGH
+
+    simulator = FaultSimulator(names, devices, network, monitors)
+    results = simulator.simulate({}, 6)
+    # Without faults, Q rises on the first rising clock edge
+    edge_cycle = results[(D_ID, devices.Q_ID, devices.LOW)]
+    assert edge_cycle is not None
+    for fault in [(D_ID, devices.CLK_ID, devices.LOW),
+                  (D_ID, devices.CLK_ID, devices.HIGH),
+                  (D_ID, devices.DATA_ID, devices.LOW),
+                  (D_ID, devices.CLEAR_ID, devices.HIGH)]:
+        assert results[fault] == edge_cycle
+    assert results[(D_ID, devices.SET_ID, devices.HIGH)] == 0
+    assert results[(D_ID, devices.DATA_ID, devices.HIGH)] is None
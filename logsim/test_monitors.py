@@ -196,3 +196,254 @@ def test_display_signals(capsys, new_monitors):
             "Clock1: -__--__--__--__--__-" in traces)
 
     assert "" in traces  # additional empty line at the end
+
+
+def test_run_length_storage(new_monitors):
+    """Test if run-length traces record the same signals as lists."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+
+    network.execute_network()
+    new_monitors.record_signals()
+    assert new_monitors.set_storage(new_monitors.RUN_LENGTH)
+    assert not new_monitors.set_storage(len(new_monitors.storage_types))
+    for cycle in range(20):
+        devices.set_switch(SW1_ID, int(cycle >= 10))
+        network.execute_network()
+        new_monitors.record_signals()
+
+    trace = new_monitors.monitors_dictionary[(OR1_ID, None)]
+    assert len(trace.values) == 2
+    assert trace == [devices.LOW] * 11 + [devices.HIGH] * 10
+    new_monitors.reset_monitors()
+    assert new_monitors.monitors_dictionary[(OR1_ID, None)].runs() == []
+
+
+def test_array_storage(new_monitors):
+    """Test if byte array traces are reserved and record signals."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    assert new_monitors.set_storage(new_monitors.ARRAY)
+    new_monitors.reserve(50)
+    trace = new_monitors.monitors_dictionary[(SW1_ID, None)]
+    assert len(trace.buffer) >= 50
+    for cycle in range(50):
+        devices.set_switch(SW1_ID, cycle % 2)
+        network.execute_network()
+        new_monitors.record_signals()
+    assert trace.view().tolist() == [0, 1] * 25
+    assert new_monitors.monitors_dictionary[(SW1_ID, None)] is trace
+
+
+def test_record_all(new_monitors):
+    """Test if every output signal is recorded in the state matrix."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+
+    new_monitors.record_all()
+    new_monitors.remove_monitor(OR1_ID, None)
+    matrix = new_monitors.state_matrix
+    assert matrix.slots == [(SW1_ID, None), (SW2_ID, None), (OR1_ID, None)]
+    new_monitors.reserve(3)
+    for state in [0, 1, 0]:
+        devices.set_switch(SW2_ID, state)
+        network.execute_network()
+        new_monitors.record_signals()
+
+    assert matrix.rows == 3
+    assert matrix.get_row(1).tolist() == [0, 1, 1]
+    assert matrix.get_column(OR1_ID, None).tolist() == [0, 1, 0]
+    assert matrix.get_column(OR1_ID, 1) is None
+    new_monitors.reset_monitors()
+    assert matrix.rows == 0
+    new_monitors.record_all(False)
+    assert new_monitors.state_matrix is None
+
+
+def test_spill_storage(new_monitors, tmp_path):
+    """Test if spilled traces record signals through the monitors."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+
+    assert new_monitors.set_storage(new_monitors.SPILL, tmp_path)
+    assert new_monitors.get_recent_signals(OR1_ID, None, 5) == []
+    [SW2_ID] = names.lookup(["Sw2"])
+    new_monitors.remove_monitor(SW2_ID, None)
+    new_monitors.make_monitor(SW2_ID, None, 3)
+    assert new_monitors.monitors_dictionary[(SW2_ID, None)] == \
+        [devices.BLANK] * 3
+    new_monitors.remove_monitor(SW2_ID, None)
+    for cycle in range(10):
+        devices.set_switch(SW1_ID, int(cycle >= 5))
+        network.execute_network()
+        new_monitors.record_signals()
+    assert new_monitors.monitors_dictionary[(OR1_ID, None)] == \
+        [devices.LOW] * 5 + [devices.HIGH] * 5
+
+
+def test_ring_storage(new_monitors):
+    """Test if ring traces keep the recent cycles for every view."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+
+    assert not new_monitors.set_storage(new_monitors.RING, ring_size=0)
+    assert new_monitors.set_storage(new_monitors.RING, ring_size=6)
+    for cycle in range(10):
+        devices.set_switch(SW1_ID, int(cycle >= 7))
+        network.execute_network()
+        new_monitors.record_signals()
+    assert new_monitors.monitors_dictionary[(OR1_ID, None)] == \
+        [devices.LOW] * 3 + [devices.HIGH] * 3
+    assert new_monitors.get_recent_signals(OR1_ID, None, 4) == \
+        [devices.LOW] + [devices.HIGH] * 3
+    assert new_monitors.get_recent_signals(OR1_ID, None, 20) == \
+        [devices.LOW] * 3 + [devices.HIGH] * 3
+    assert new_monitors.get_recent_signals(OR1_ID, SW1_ID, 4) is None
+
+    new_monitors.reset_monitors()
+    assert new_monitors.get_recent_signals(OR1_ID, None, 4) == []
+
+
+def test_index_transitions(new_monitors):
+    """Test if the transition index covers earlier and later cycles."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+
+    for cycle in range(10):
+        devices.set_switch(SW1_ID, int(cycle in [2, 3, 7]))
+        network.execute_network()
+        new_monitors.record_signals()
+        if cycle == 4:
+            index = new_monitors.index_transitions()
+    assert new_monitors.index_transitions() is index
+    assert index.get_changes((OR1_ID, None)) == [0, 2, 4, 7, 8]
+    assert index.count_edges((OR1_ID, None)) == 2
+    assert index.value_at((OR1_ID, None), 7) == devices.HIGH
+    new_monitors.reset_monitors()
+    assert index.get_changes((OR1_ID, None)) == []
+
+
+def test_index_ring_transitions(new_monitors):
+    """Test if an index made from ring traces keeps their cycle numbers."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    assert new_monitors.set_storage(new_monitors.RING, ring_size=4)
+    for cycle in range(10):
+        devices.set_switch(SW1_ID, int(cycle in [2, 3, 7, 8]))
+        network.execute_network()
+        new_monitors.record_signals()
+    assert new_monitors.get_first_cycle(SW1_ID, None) == 6
+    assert new_monitors.get_first_cycle(SW1_ID, 1) is None
+    index = new_monitors.index_transitions()
+    assert index.get_changes((SW1_ID, None)) == [6, 7, 9]
+    assert index.value_at((SW1_ID, None), 5) is None
+    assert index.value_at((SW1_ID, None), 7) == devices.HIGH
+    assert index.first_edge((SW1_ID, None), rising=False) == 9
+
+
+def test_summarise_detail(new_monitors):
+    """Test if the detail pyramid is filled and kept up to date."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    for cycle in range(8):
+        devices.set_switch(SW1_ID, int(cycle == 5))
+        network.execute_network()
+        new_monitors.record_signals()
+        if cycle == 2:
+            pyramid = new_monitors.summarise_detail()
+    assert new_monitors.summarise_detail() is pyramid
+    assert pyramid.maxima[(SW1_ID, None)][0] == bytearray([0, 0, 1, 0])
+    assert pyramid.maxima[(SW1_ID, None)][1] == bytearray([0, 1])
+
+    # Storage that bounds memory drops the pyramid
+    assert new_monitors.set_storage(new_monitors.RING, ring_size=4)
+    assert new_monitors.detail_pyramid is None
+    assert pyramid not in new_monitors.listeners
+    assert new_monitors.summarise_detail() is None
+
+
+def test_get_buckets(new_monitors, tmp_path):
+    """Test if buckets come from the pyramid or from the traces in range."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    for cycle in range(12):
+        devices.set_switch(SW1_ID, int(cycle == 4 or cycle >= 8))
+        network.execute_network()
+        new_monitors.record_signals()
+    expected = [(0, 0, 0, 4), (0, 1, 4, 8), (1, 1, 8, 12)]
+    assert new_monitors.get_buckets(SW1_ID, None, 0, 12, 12) is None
+    assert new_monitors.detail_pyramid is None
+    assert new_monitors.get_buckets(SW1_ID, None, 0, 12, 3) == expected
+    assert new_monitors.get_buckets(SW1_ID, 1, 0, 12, 3) is None
+
+    assert new_monitors.set_storage(new_monitors.SPILL, tmp_path)
+    assert new_monitors.get_buckets(SW1_ID, None, 0, 12, 3) == expected
+    assert new_monitors.get_buckets(SW1_ID, None, 2, 10, 3) == [
+        (0, 1, 2, 5), (0, 0, 5, 8), (1, 1, 8, 10)]
+    assert new_monitors.set_storage(new_monitors.RING, ring_size=8)
+    assert new_monitors.get_buckets(SW1_ID, None, 0, 12, 2) == [
+        (0, 1, 0, 4), (1, 1, 4, 8)]
+
+
+def test_get_statistics(new_monitors):
+    """Test if the statistics cover earlier and later cycles."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+
+    for cycle in range(10):
+        devices.set_switch(SW1_ID, int(cycle in [2, 3, 7]))
+        network.execute_network()
+        new_monitors.record_signals()
+        if cycle == 4:
+            statistics = new_monitors.get_statistics()
+            assert statistics[(SW1_ID, None)]["rising"] == 1
+    statistics = new_monitors.get_statistics()
+    assert list(statistics) == [(SW1_ID, None), (SW2_ID, None),
+                                (OR1_ID, None)]
+    assert statistics[(OR1_ID, None)] == {
+        "rising": 2, "falling": 2, "high": 3, "low": 7, "glitches": 1,
+        "longest_run": 3, "last_change": 8}
+
+    new_monitors.reset_monitors()
+    assert new_monitors.get_statistics()[(OR1_ID, None)] is None
+
+
+def test_ring_statistics(new_monitors):
+    """Test if statistics made from ring traces keep their cycle numbers."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    assert new_monitors.set_storage(new_monitors.RING, ring_size=4)
+    for cycle in range(10):
+        devices.set_switch(SW1_ID, int(cycle in [2, 3, 7, 8]))
+        network.execute_network()
+        new_monitors.record_signals()
+    assert new_monitors.get_statistics()[(SW1_ID, None)] == {
+        "rising": 1, "falling": 1, "high": 2, "low": 2, "glitches": 0,
+        "longest_run": 2, "last_change": 9}
@@ -96,4 +96,14 @@ def test_unique_error_codes_raises_exceptions(new_names):
     with pytest.raises(TypeError):
         new_names.unique_error_codes(1.4)
     with pytest.raises(TypeError):
-        new_names.unique_error_codes("hello")
\ No newline at end of file
+        new_names.unique_error_codes("hello")
+
+
+def test_lookup_ids_stable(used_names):
+    """Test if repeated lookups keep IDs stable and agree with query."""
+    [charlie_id] = used_names.lookup(["Charlie"])
+    assert used_names.lookup(["Charlie", "Alice", "Charlie"]) == [
+        charlie_id, 0, charlie_id]
+    assert used_names.query("Charlie") == charlie_id
+    assert used_names.get_name_string(charlie_id) == "Charlie"
+    assert len(used_names.names) == 4
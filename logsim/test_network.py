@@ -1,4 +1,6 @@
 """Test the network module."""
+import random
+
 import pytest
 
 from names import Names
@@ -348,3 +350,212 @@ def test_oscillating_network(new_network):
     network.make_connection(NOR1, None, NOR1, I1)
 
     assert not network.execute_network()
+
+
+def test_compile_network_levels(new_network):
+    """Test if compile_network orders gates after the gates driving them."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, AND1_ID, OR1_ID, NOR1_ID, I1, I2] = names.lookup(
+        ["Sw1", "And1", "Or1", "Nor1", "I1", "I2"])
+
+    # Make the gates in reverse order of their dependencies
+    devices.make_device(NOR1_ID, devices.NOR, 1)
+    devices.make_device(OR1_ID, devices.OR, 2)
+    devices.make_device(AND1_ID, devices.AND, 1)
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(AND1_ID, None, OR1_ID, I1)
+    network.make_connection(SW1_ID, None, OR1_ID, I2)
+    network.make_connection(OR1_ID, None, NOR1_ID, I1)
+
+    assert network.compile_network()
+    level_ids = [[gate[0].device_id for gate in level]
+                 for level in network.gate_levels]
+    assert level_ids == [[AND1_ID], [OR1_ID], [NOR1_ID]]
+
+
+def test_levelized_deep_chain(new_network):
+    """Test if a deep chain of gates settles in a few iterations."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    assert network.set_engine(network.LEVELIZED)
+
+    [SW1_ID, I1] = names.lookup(["Sw1", "I1"])
+    chain_ids = names.lookup(["And" + str(i) for i in range(50)])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    previous_id = SW1_ID
+    for device_id in chain_ids:
+        devices.make_device(device_id, devices.AND, 1)
+        network.make_connection(previous_id, None, device_id, I1)
+        previous_id = device_id
+
+    assert network.execute_network()
+    devices.set_switch(SW1_ID, devices.HIGH)
+    assert network.execute_network()
+    assert network.iterations == 3
+    assert network.get_output_signal(chain_ids[-1], None) == devices.HIGH
+
+    devices.set_switch(SW1_ID, devices.LOW)
+    assert network.execute_network()
+
+    # The iterative engine needs one iteration per gate for a rising edge
+    network.engine = network.ITERATIVE
+    devices.set_switch(SW1_ID, devices.HIGH)
+    assert not network.execute_network()
+
+
+def test_levelized_falls_back_on_loops(new_network):
+    """Test if combinational loops are run by the iterative engine."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    assert network.set_engine(network.LEVELIZED)
+
+    [SW1_ID, OR1_ID, I1, I2] = names.lookup(["Sw1", "Or1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(OR1_ID, devices.OR, 2)
+
+    # Or1 latches HIGH once Sw1 has been HIGH
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(OR1_ID, None, OR1_ID, I2)
+
+    assert network.execute_network()
+    assert network.gate_levels is None
+    devices.set_switch(SW1_ID, devices.LOW)
+    assert network.execute_network()
+    assert network.get_output_signal(OR1_ID, None) == devices.HIGH
+
+
+def test_event_driven_matches_iterative(new_network):
+    """Test if the event-driven engine gives the same signals as iterative."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, CL_ID, D_ID, AND1_ID, XOR1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Clock1", "D1", "And1", "Xor1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 2)
+    devices.make_device(D_ID, devices.D_TYPE)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(XOR1_ID, devices.XOR)
+
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(D_ID, devices.Q_ID, AND1_ID, I2)
+    network.make_connection(AND1_ID, None, XOR1_ID, I1)
+    network.make_connection(D_ID, devices.QBAR_ID, XOR1_ID, I2)
+    network.make_connection(XOR1_ID, None, D_ID, devices.DATA_ID)
+    network.make_connection(CL_ID, None, D_ID, devices.CLK_ID)
+    network.make_connection(SW2_ID, None, D_ID, devices.SET_ID)
+    network.make_connection(SW2_ID, None, D_ID, devices.CLEAR_ID)
+
+    assert network.compile_network()
+    assert network.fanout[(D_ID, devices.Q_ID)] == [(AND1_ID, I2)]
+    assert sorted(network.fanout[(SW2_ID, None)]) == sorted(
+        [(D_ID, devices.SET_ID), (D_ID, devices.CLEAR_ID)])
+
+    traces = {}
+    for engine in [network.ITERATIVE, network.EVENT_DRIVEN]:
+        network.engine = engine
+        devices.cold_startup()
+        device = devices.get_device(CL_ID)
+        device.clock_counter = 0
+        device.outputs[None] = devices.LOW
+        devices.get_device(D_ID).dtype_memory = devices.LOW
+        trace = []
+        for cycle in range(20):
+            devices.set_switch(SW1_ID, int(cycle % 6 < 3))
+            assert network.execute_network()
+            trace.append([network.get_output_signal(device_id, None)
+                          for device_id in [AND1_ID, XOR1_ID]] +
+                         [network.get_output_signal(D_ID, devices.Q_ID)])
+        traces[engine] = trace
+    assert traces[network.ITERATIVE] == traces[network.EVENT_DRIVEN]
+
+
+def make_random_network(seed):
+    """Return a random network and its switch IDs.
+
+    Every D-type is clocked directly by a clock, and random gates, fed by
+    switches, clocks, D-type outputs and earlier gates, drive the DATA,
+    SET and CLEAR inputs. Devices are made in a random order.
+    """
+    rng = random.Random(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    switch_ids = names.lookup(["Sw" + str(i)
+                               for i in range(rng.randint(1, 3))])
+    clock_ids = names.lookup(["Clock" + str(i)
+                              for i in range(rng.randint(1, 2))])
+    dtype_ids = names.lookup(["D" + str(i) for i in range(rng.randint(1, 3))])
+    gate_ids = names.lookup(["G" + str(i) for i in range(rng.randint(1, 8))])
+    gate_kinds = [devices.AND, devices.OR, devices.NAND, devices.NOR,
+                  devices.XOR]
+    device_ids = switch_ids + clock_ids + dtype_ids + gate_ids
+    rng.shuffle(device_ids)
+    for device_id in device_ids:
+        if device_id in switch_ids:
+            devices.make_device(device_id, devices.SWITCH, rng.randrange(2))
+        elif device_id in clock_ids:
+            devices.make_device(device_id, devices.CLOCK, rng.randint(1, 3))
+        elif device_id in dtype_ids:
+            devices.make_device(device_id, devices.D_TYPE)
+        else:
+            kind = rng.choice(gate_kinds)
+            devices.make_device(device_id, kind, None if kind == devices.XOR
+                                else rng.randint(1, 3))
+
+    sources = [(device_id, None) for device_id in switch_ids + clock_ids]
+    sources += [(device_id, output_id) for device_id in dtype_ids
+                for output_id in [devices.Q_ID, devices.QBAR_ID]]
+    for gate_id in gate_ids:
+        for input_id in list(devices.get_device(gate_id).inputs):
+            assert network.make_connection(*rng.choice(sources), gate_id,
+                                           input_id) == network.NO_ERROR
+        sources.append((gate_id, None))
+    for dtype_id in dtype_ids:
+        assert network.make_connection(rng.choice(clock_ids), None, dtype_id,
+                                       devices.CLK_ID) == network.NO_ERROR
+        for input_id in [devices.DATA_ID, devices.SET_ID, devices.CLEAR_ID]:
+            assert network.make_connection(*rng.choice(sources), dtype_id,
+                                           input_id) == network.NO_ERROR
+    return network, switch_ids
+
+
+def run_random_network(seed, engine=None, cycles=20):
+    """Return the result and every output signal of each cycle."""
+    network, switch_ids = make_random_network(seed)
+    devices = network.devices
+    if engine is not None:
+        assert network.set_engine(engine)
+    devices.cold_startup(random.Random(seed))
+    rng = random.Random(seed)
+    trace = []
+    for cycle in range(cycles):
+        for switch_id in switch_ids:
+            devices.set_switch(switch_id, rng.randrange(2))
+        result = network.execute_network()
+        trace.append((result, [dict(device.outputs)
+                               for device in devices.devices_list]))
+    return trace
+
+
+def test_engines_match_iterative():
+    """Test if the default and event-driven engines match execute_iterative.
+
+    Gates drive the D-type inputs, so the traces depend on when edges on
+    gate outputs are seen, not only on the levels they settle to.
+    """
+    network = Network(Names(), Devices(Names()))
+    assert network.engine == network.ITERATIVE
+    for seed in range(60):
+        iterative = run_random_network(seed, network.ITERATIVE)
+        assert run_random_network(seed) == iterative
+        assert run_random_network(seed, network.EVENT_DRIVEN) == iterative
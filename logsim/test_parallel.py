@@ -0,0 +1,183 @@
+"""Test the parallel module."""
+import io
+import os
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+from parallel import ParallelSimulator
+
+
+@pytest.fixture
+def new_simulator():
+    """Return a ParallelSimulator for a network with every device kind.
+
+    D1 toggles through an XOR with switch Sw1 on each clock edge, and a
+    signal generator feeds a chain of gates with the D-type output.
+    """
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    new_monitors = Monitors(new_names, new_devices, new_network)
+
+    [SW1_ID, SW2_ID, CL_ID, SG_ID, D_ID, XOR1_ID, AND1_ID, OR1_ID,
+     NAND1_ID, NOR1_ID, I1, I2, I3] = new_names.lookup(
+        ["Sw1", "Sw2", "Clock1", "Sig1", "D1", "Xor1", "And1", "Or1",
+         "Nand1", "Nor1", "I1", "I2", "I3"])
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 1)
+    new_devices.make_device(SW2_ID, new_devices.SWITCH, 0)
+    new_devices.make_device(CL_ID, new_devices.CLOCK, 2)
+    new_devices.make_device(SG_ID, new_devices.SIGGEN, [1, 1, 0])
+    new_devices.make_device(D_ID, new_devices.D_TYPE)
+    new_devices.make_device(XOR1_ID, new_devices.XOR)
+    new_devices.make_device(AND1_ID, new_devices.AND, 2)
+    new_devices.make_device(OR1_ID, new_devices.OR, 3)
+    new_devices.make_device(NAND1_ID, new_devices.NAND, 2)
+    new_devices.make_device(NOR1_ID, new_devices.NOR, 1)
+
+    connections = [(SW1_ID, None, XOR1_ID, I1),
+                   (D_ID, new_devices.Q_ID, XOR1_ID, I2),
+                   (XOR1_ID, None, D_ID, new_devices.DATA_ID),
+                   (CL_ID, None, D_ID, new_devices.CLK_ID),
+                   (SW2_ID, None, D_ID, new_devices.SET_ID),
+                   (SW2_ID, None, D_ID, new_devices.CLEAR_ID),
+                   (D_ID, new_devices.QBAR_ID, AND1_ID, I1),
+                   (SG_ID, None, AND1_ID, I2),
+                   (AND1_ID, None, OR1_ID, I1),
+                   (SW2_ID, None, OR1_ID, I2),
+                   (D_ID, new_devices.Q_ID, OR1_ID, I3),
+                   (OR1_ID, None, NAND1_ID, I1),
+                   (XOR1_ID, None, NAND1_ID, I2),
+                   (NAND1_ID, None, NOR1_ID, I1)]
+    for connection in connections:
+        assert new_network.make_connection(*connection) == \
+            new_network.NO_ERROR
+    for device_id, output_id in [(D_ID, new_devices.Q_ID), (AND1_ID, None),
+                                 (NOR1_ID, None), (SG_ID, None)]:
+        assert new_monitors.make_monitor(device_id, output_id) == \
+            new_monitors.NO_ERROR
+    return ParallelSimulator(new_names, new_devices, new_network,
+                             new_monitors)
+
+
+def run_pattern(simulator, settings, cycles):
+    """Return the monitor traces of one pattern run with execute_network."""
+    devices = simulator.devices
+    network = simulator.network
+    monitors = simulator.monitors
+    random.seed(0)
+    devices.cold_startup()
+    saved_lists = {}
+    for device_id, setting in settings.items():
+        device = devices.get_device(device_id)
+        if device.device_kind == devices.SWITCH:
+            devices.set_switch(device_id, setting)
+        else:
+            saved_lists[device_id] = device.siggen_list
+            device.siggen_list = setting
+            device.outputs[None] = setting[0]
+    monitors.reset_monitors()
+    for _ in range(cycles):
+        assert network.execute_network()
+        monitors.record_signals()
+    for device_id, siggen_list in saved_lists.items():
+        devices.get_device(device_id).siggen_list = siggen_list
+    return {key: list(signals)
+            for key, signals in monitors.monitors_dictionary.items()}
+
+
+def test_simulate_matches_execute_network(new_simulator):
+    """Test if every pattern gives the same trace as execute_network."""
+    simulator = new_simulator
+    [SW1_ID, SW2_ID, SG_ID] = simulator.names.lookup(["Sw1", "Sw2", "Sig1"])
+    patterns = [{SW1_ID: sw1, SW2_ID: sw2} for sw1 in [0, 1]
+                for sw2 in [0, 1]]
+    patterns.append({SW1_ID: 1, SG_ID: [0, 1]})
+    patterns.append({SG_ID: [1, 0, 0, 0]})
+    patterns.append({})
+
+    expected = [run_pattern(simulator, settings, 12)
+                for settings in patterns]
+    random.seed(0)
+    simulator.devices.cold_startup()
+    traces = simulator.simulate(patterns, 12)
+
+    assert simulator.failed_cycles == [None] * len(patterns)
+    assert [dict(trace) for trace in traces] == expected
+
+
+def test_switch_words(new_simulator):
+    """Test if one word per switch sets the switches of many patterns."""
+    simulator = new_simulator
+    devices = simulator.devices
+    [SW1_ID, SW2_ID, OR1_ID] = simulator.names.lookup(["Sw1", "Sw2", "Or1"])
+    assert simulator.compile()
+    simulator.load_state(70)
+    sw2_word = 1 << 69
+    simulator.set_switch_words({SW2_ID: sw2_word})
+    simulator.execute_network()
+
+    assert simulator.get_signal_word(SW2_ID, None) == (sw2_word, 0)
+    # Sw2 is connected to OR1, so OR1 is high in the last pattern
+    value, edge = simulator.get_signal_word(OR1_ID, None)
+    assert simulator.decode(value, edge, 69) == devices.HIGH
+    assert simulator.decode(sw2_word, sw2_word, 69) == devices.RISING
+    assert simulator.decode(0, sw2_word, 69) == devices.FALLING
+
+
+def test_simulate_rejects_loops(new_simulator):
+    """Test if simulate returns None for networks with gate loops."""
+    simulator = new_simulator
+    names = simulator.names
+    devices = simulator.devices
+    [NAND2_ID, NAND3_ID, I1, I2] = names.lookup(["Nand2", "Nand3", "I1",
+                                                 "I2"])
+    devices.make_device(NAND2_ID, devices.NAND, 2)
+    devices.make_device(NAND3_ID, devices.NAND, 2)
+    for first_id, second_id in [(NAND2_ID, NAND3_ID), (NAND3_ID, NAND2_ID)]:
+        simulator.network.make_connection(first_id, None, second_id, I1)
+        simulator.network.make_connection(first_id, None, second_id, I2)
+    assert simulator.simulate([{}], 3) is None
+
+
+def test_counting_word(new_simulator):
+    """Test if counting words hold the bits of the pattern numbers."""
+    simulator = new_simulator
+    for start, count in [(0, 8), (16, 16), (32, 4)]:
+        for bit in range(6):
+            word = simulator.counting_word(bit, start, count)
+            assert word == sum(1 << pattern for pattern in range(count)
+                               if ((start + pattern) >> bit) & 1)
+
+
+def test_write_truth_table():
+    """Test if the full adder truth table is written in chunks."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    path = os.path.join(os.path.dirname(__file__), "test_full_adder.txt")
+    parser = Parser(names, devices, network, monitors, Scanner(path, names))
+    assert parser.parse_network()
+    simulator = ParallelSimulator(names, devices, network, monitors)
+
+    output_file = io.StringIO()
+    assert simulator.write_truth_table(output_file, chunk_bits=1)
+    lines = output_file.getvalue().splitlines()
+    assert lines[0] == "A B C | XOR2 OR1"
+    assert len(lines) == 9
+    for number, line in enumerate(lines[1:]):
+        total = bin(number).count("1")
+        [a, b, c] = [(number >> bit) & 1 for bit in [2, 1, 0]]
+        assert line == f"{a} {b} {c} | {total % 2} {int(total >= 2)}"
+
+
+def test_write_truth_table_needs_combinational(new_simulator):
+    """Test if networks with D-types or clocks are rejected."""
+    assert not new_simulator.write_truth_table(io.StringIO())
@@ -2,9 +2,10 @@
 """
 
 import pytest
+import io
 import os
 from scanner import Scanner
-from parse import Parser
+from parse import Parser, SymbolTable
 from names import Names
 from devices import Devices
 from monitors import Monitors
@@ -418,3 +419,42 @@ def test_parse_network_errors(tmp_file, capsys, incorrect_content, error_msg, er
 
 
     
+
+def test_parse_network_from_memory(tmp_file, capsys):
+    """Test that parse_network reads a definition held in memory"""
+    content = "DEVICES{A=SWITCH(0);B=XOR;}CONNECTIONS{A->B.I1}MONITOR{A;}"
+    outputs = []
+    for source in [tmp_file(content), io.StringIO(content)]:
+        names = Names()
+        devices = Devices(names)
+        network = Network(names, devices)
+        monitors = Monitors(names, devices, network)
+        parser = Parser(names, devices, network, monitors,
+                        Scanner(source, names))
+        assert parser.parse_network() == False
+        assert parser.error_count == 1
+        outputs.append(capsys.readouterr()[0])
+    assert outputs[0] == outputs[1]
+
+
+def test_symbol_tables(tmp_file):
+    """Test that the symbol tables keep declaration order and
+    still reject repeated devices and inputs"""
+    table = SymbolTable([3, 1])
+    table.append(2)
+    table.append(1)
+    assert list(table) == [3, 1, 2]
+    assert 2 in table and 4 not in table
+    assert len(table) == 3
+
+    content = ("DEVICES{C, A, B = SWITCH(0); A = XOR; X = XOR;}"
+               "CONNECTIONS{A -> X.I1; B -> X.I1; B -> X.I2;}"
+               "MONITOR{X, A;}")
+    names, devices, network, monitors, scanner, parser = generate_parser(
+        tmp_file(content))
+    assert parser.parse_network() == False
+    assert parser.error_count == 2
+    assert list(parser.dev_list) == names.lookup(["C", "A", "B", "X"])
+    [X, A] = names.lookup(["X", "A"])
+    assert list(parser.input_con_list) == [(X, "I1"), (X, "I2")]
+    assert [dev for dev, pin in parser.monitors_list] == [X, A]
@@ -1,7 +1,10 @@
 """Test the scanner module"""
 
 import pytest
+import io
 import os
+import random
+import re
 from scanner import Scanner, Symbol
 from names import Names
 
@@ -151,3 +154,114 @@ def test_get_symbol():
     assert symbol.type == scanner.COMMA
     assert symbol.line == 4
     assert symbol.column == 5
+
+def scan_all(scanner):
+    """Return every symbol from the scanner with the returned positions."""
+    symbols = []
+    line, col = 1, 0
+    while True:
+        symbol, line, col = scanner.get_symbol(line, col)
+        symbols.append((symbol.type, symbol.id, symbol.line, symbol.column,
+                        line, col, scanner.comment_opened,
+                        scanner.comment_opened_line,
+                        scanner.comment_opened_column))
+        if symbol.type == scanner.EOF:
+            return symbols
+
+@pytest.mark.parametrize("seed", range(40))
+def test_buffered_matches_characters(tmp_file, seed):
+    """Tests the buffered scanner gives the same symbols as reading
+    one character at a time, including its comment quirks"""
+    pieces = ["DEVICES", "A1", "b_2", "x", "12", "007", ",", ";", "=", "{",
+              "}", "(", ")", ".", "->", "-", "*", "/*", "*/", "#", "$",
+              " ", "  ", "\t", "\n", "\n", "\r\n", "é", "\u00a0", "Ω1",
+              "\u0663", "\u2003"]
+    rng = random.Random(seed)
+    content = "".join(rng.choice(pieces) for _ in range(300))
+    # a '/' that never reaches a '*' stops the character scanner returning
+    content = re.sub(r"/(?!\*)", "/*", content)
+    path = tmp_file(content)
+    expected = scan_all(Scanner(path, Names()))
+    scanner = Scanner(path, Names(), buffered=True)
+    assert scan_all(scanner) == expected
+    assert scanner.current_char == ''
+
+def test_buffered_error_line(capsys):
+    """Tests print_error_line in buffered mode"""
+    scanner = Scanner("test_full_adder.txt", Names(), buffered=True)
+    scanner.print_error_line(11, 20)
+    scanner.print_error_line(11, 4)
+    captout, capterror = capsys.readouterr()
+    assert captout == ("    A -> AND1.I1;\n"
+                       "                 ^ (error position out of bounds)\n"
+                       "    A -> AND1.I1;\n"
+                       "    ^\n")
+    assert scanner.get_line(0) is None
+    assert scanner.get_line(scanner.count_lines() + 1) is None
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_get_line_offsets(tmp_file, buffered):
+    """Tests lines are read from the offset index, without moving
+    the scanner"""
+    content = "A = 1;\n\n  é -> B;\nlast"
+    scanner = Scanner(tmp_file(content), Names(), buffered=buffered)
+    symbol, line, col = scanner.get_symbol(1, 0)
+    assert scanner.get_line_offsets()[:3] == [0, 7, 8]
+    assert scanner.count_lines() == 4
+    assert [scanner.get_line(number) for number in range(6)] == [
+        None, "A = 1;", "", "  é -> B;", "last", None]
+    # the scanner carries on from where it was
+    symbol, line, col = scanner.get_symbol(line, col)
+    assert (symbol.type, symbol.line, symbol.column) == (scanner.EQUALS,
+                                                         1, 2)
+    assert Scanner(tmp_file(""), Names(), buffered=buffered).count_lines() == 0
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_symbol_stream(buffered):
+    """Tests the symbol stream gives the symbols of get_symbol, with
+    peeking and skipping ahead"""
+    expected = scan_all(Scanner("test_full_adder.txt", Names()))
+    scanner = Scanner("test_full_adder.txt", Names(), buffered=buffered)
+    stream = scanner.symbols()
+    for values in expected:
+        symbol, line, col = next(stream)
+        assert (symbol.type, symbol.id, symbol.line, symbol.column,
+                line, col) == values[:6]
+    assert next(stream)[0].type == scanner.EOF
+
+    scanner = Scanner("test_full_adder.txt", Names(), buffered=buffered)
+    assert scanner.next_symbol().id == scanner.DEVICES
+    third = scanner.peek_symbol(3)
+    assert scanner.peek_symbol(1).type == scanner.OPENCURLY
+    assert (third.type, third.line, third.column) == (scanner.COMMA, 4, 5)
+    scanner.next_symbol()
+    assert scanner.next_symbol().id == scanner.names.query("A")
+    assert scanner.next_symbol() is third
+    symbol = scanner.skip_symbols({scanner.SEMICOLON, scanner.CLOSECURLY})
+    assert (symbol.type, symbol.line) == (scanner.SEMICOLON, 4)
+    assert scanner.skip_symbols(set()).type == scanner.EOF
+    assert scanner.next_symbol().type == scanner.EOF
+    assert not hasattr(symbol, "__dict__")
+
+@pytest.mark.parametrize("source", ["bytes", "text stream", "binary stream",
+                                    "stdin"])
+def test_scan_from_memory(monkeypatch, source):
+    """Tests definitions can be scanned from bytes and streams, with
+    the same symbols as from the file"""
+    with open("test_full_adder.txt", "rb") as file:
+        content = file.read().replace(b"\n", b"\r\n")
+    if source == "bytes":
+        path = content
+    elif source == "text stream":
+        path = io.StringIO(content.decode("utf-8"), newline="")
+    elif source == "binary stream":
+        path = io.BytesIO(content)
+    else:
+        monkeypatch.setattr("sys.stdin", io.StringIO(content.decode("utf-8"),
+                                                     newline=""))
+        path = "-"
+    scanner = Scanner(path, Names())
+    assert scanner.file is None
+    assert scan_all(scanner) == scan_all(Scanner("test_full_adder.txt",
+                                                 Names()))
+    assert scanner.get_line(11) == "    A -> AND1.I1;"
@@ -0,0 +1,158 @@
+"""Test the sweep module."""
+import concurrent.futures
+import functools
+import multiprocessing
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from sweep import ColdStartSweep
+from vcd import VcdWriter
+
+
+@pytest.fixture
+def toggle_sweep():
+    """Return a ColdStartSweep for a D-type that toggles every clock edge.
+
+    The D-type's QBAR output is fed back to its DATA input, so Q depends
+    on the random D-type memory and clock phase at start-up.
+    """
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [SW1_ID, CL_ID, D_ID] = names.lookup(["Sw1", "Clock1", "D1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 3)
+    devices.make_device(D_ID, devices.D_TYPE)
+    for connection in [(D_ID, devices.QBAR_ID, D_ID, devices.DATA_ID),
+                       (CL_ID, None, D_ID, devices.CLK_ID),
+                       (SW1_ID, None, D_ID, devices.SET_ID),
+                       (SW1_ID, None, D_ID, devices.CLEAR_ID)]:
+        assert network.make_connection(*connection) == network.NO_ERROR
+    monitors.make_monitor(D_ID, devices.Q_ID)
+    monitors.make_monitor(SW1_ID, None)
+    return ColdStartSweep(names, devices, network, monitors)
+
+
+def test_sweep_statistics(toggle_sweep):
+    """Test if the signal counts add up over runs and cycles."""
+    sweep = toggle_sweep
+    devices = sweep.devices
+    [SW1_ID, D_ID] = sweep.names.lookup(["Sw1", "D1"])
+    sweep.run(40, 8, workers=1)
+
+    assert sweep.runs == 40
+    assert sweep.oscillated_runs == 0
+    for count in sweep.signal_counts[(D_ID, devices.Q_ID)]:
+        assert count[devices.LOW] + count[devices.HIGH] == 40
+    assert sweep.get_high_fraction(SW1_ID, None) == [0] * 8
+    fractions = sweep.get_high_fraction(D_ID, devices.Q_ID)
+    assert any(0 < fraction < 1 for fraction in fractions)
+    assert sweep.get_high_fraction(SW1_ID, 1) is None
+
+
+def test_sweep_process_pool(toggle_sweep):
+    """Test if the process pool gives the same counts as one process."""
+    sweep = toggle_sweep
+    sweep.run(30, 6, seed=5, workers=1)
+    expected = sweep.signal_counts
+    sweep.run(30, 6, seed=5, workers=3)
+    assert sweep.signal_counts == expected
+
+
+def test_sweep_oscillation(toggle_sweep):
+    """Test if oscillating runs are counted."""
+    sweep = toggle_sweep
+    names = sweep.names
+    devices = sweep.devices
+    [NAND1_ID, I1, I2] = names.lookup(["Nand1", "I1", "I2"])
+    devices.make_device(NAND1_ID, devices.NAND, 2)
+    sweep.network.make_connection(NAND1_ID, None, NAND1_ID, I1)
+    sweep.network.make_connection(NAND1_ID, None, NAND1_ID, I2)
+    sweep.run(4, 5, workers=2)
+    assert sweep.oscillated_runs == 4
+    [SW1_ID] = names.lookup(["Sw1"])
+    assert sweep.get_high_fraction(SW1_ID, None) == [None] * 5
+
+
+def test_sweep_unpicklable_monitors(toggle_sweep, tmp_path, monkeypatch):
+    """Test if monitors with files open can still be swept in a pool.
+
+    Worker processes are spawned, so the network state must be pickled.
+    """
+    spawn_executor = functools.partial(
+        concurrent.futures.ProcessPoolExecutor,
+        mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor",
+                        spawn_executor)
+    sweep = toggle_sweep
+    sweep.run(8, 4, seed=2, workers=1)
+    expected = sweep.signal_counts
+    monitors = sweep.monitors
+    writer = VcdWriter(sweep.names, sweep.devices, monitors,
+                       str(tmp_path / "trace.vcd"))
+    monitors.add_listener(writer)
+    assert monitors.set_storage(monitors.SPILL, tmp_path)
+    sweep.run(8, 4, seed=2, workers=2)
+    assert sweep.signal_counts == expected
+    writer.close()
+
+
+def test_sweep_leaves_network_alone(toggle_sweep):
+    """Test if an in-process sweep leaves the devices and random module."""
+    sweep = toggle_sweep
+    devices = sweep.devices
+    [D_ID] = sweep.names.lookup(["D1"])
+    assert sweep.network.execute_network()
+    outputs = [dict(device.outputs) for device in devices.devices_list]
+    memory = devices.get_device(D_ID).dtype_memory
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    sweep.run(10, 5, workers=1)
+    assert random.random() == expected
+    assert [dict(device.outputs) for device in devices.devices_list] == \
+        outputs
+    assert devices.get_device(D_ID).dtype_memory == memory
+
+
+@pytest.mark.parametrize("engine", range(4))
+def test_sweep_gates_after_dtypes(toggle_sweep, engine):
+    """Test if seeds run alike however they are split between workers.
+
+    Each seed must start from the same gate outputs, so the counts of
+    gates fed by the D-type, and of a D-type clocked by one of them, cannot
+    depend on the seeds run before it.
+    """
+    sweep = toggle_sweep
+    names = sweep.names
+    devices = sweep.devices
+    network = sweep.network
+    [SW1_ID, D_ID, CL_ID, AND1_ID, XOR1_ID, D2_ID, I1, I2] = names.lookup(
+        ["Sw1", "D1", "Clock1", "And1", "Xor1", "D2", "I1", "I2"])
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(XOR1_ID, devices.XOR)
+    devices.make_device(D2_ID, devices.D_TYPE)
+    for connection in [(D_ID, devices.Q_ID, AND1_ID, I1),
+                       (CL_ID, None, AND1_ID, I2),
+                       (AND1_ID, None, XOR1_ID, I1),
+                       (D_ID, devices.QBAR_ID, XOR1_ID, I2),
+                       (AND1_ID, None, D2_ID, devices.CLK_ID),
+                       (XOR1_ID, None, D2_ID, devices.DATA_ID),
+                       (SW1_ID, None, D2_ID, devices.SET_ID),
+                       (SW1_ID, None, D2_ID, devices.CLEAR_ID)]:
+        assert network.make_connection(*connection) == network.NO_ERROR
+    sweep.monitors.make_monitor(AND1_ID, None)
+    sweep.monitors.make_monitor(XOR1_ID, None)
+    sweep.monitors.make_monitor(D2_ID, devices.Q_ID)
+    if not network.set_engine(engine):
+        pytest.skip("engine not available")
+    sweep.run(24, 6, seed=3, workers=1)
+    expected = sweep.signal_counts
+    sweep.run(24, 6, seed=3, workers=4)
+    assert sweep.signal_counts == expected
@@ -0,0 +1,293 @@
+"""Test the traces module."""
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from traces import (RunLengthTrace, ArrayTrace, StateMatrix, SpillTrace,
+                    RingTrace, TransitionIndex, DetailPyramid,
+                    SignalStatistics)
+
+
+@pytest.fixture
+def signals():
+    """Return a list of signals with runs of different lengths."""
+    return [0, 0, 0, 1, 1, 0, 4, 4, 4, 4, 1]
+
+
+def test_run_length_indexing(signals):
+    """Test if a run-length trace behaves like a list of signals."""
+    trace = RunLengthTrace(signals)
+    assert len(trace) == len(signals)
+    assert list(trace) == signals
+    assert trace == signals
+    for index in range(-len(signals), len(signals)):
+        assert trace[index] == signals[index]
+    for start in range(len(signals) + 1):
+        for stop in range(start, len(signals) + 2):
+            assert trace[start:stop] == signals[start:stop]
+    assert trace[::2] == signals[::2]
+    with pytest.raises(IndexError):
+        trace[len(signals)]
+
+
+def test_run_length_memory(signals):
+    """Test if only one entry is stored per run."""
+    trace = RunLengthTrace(signals)
+    assert len(trace.values) == 5
+    for _ in range(1000):
+        trace.append(1)
+    assert len(trace.values) == 5
+    assert len(trace) == len(signals) + 1000
+    assert trace.runs(5, 9) == [(0, 5, 6), (4, 6, 9)]
+    assert trace.runs(10) == [(1, 10, 1011)]
+    trace.clear()
+    assert trace == []
+
+
+def test_array_indexing(signals):
+    """Test if an array trace behaves like a list of signals."""
+    trace = ArrayTrace(signals, capacity=2)
+    assert len(trace) == len(signals)
+    assert trace == signals
+    for index in range(-len(signals), len(signals)):
+        assert trace[index] == signals[index]
+    assert trace[2:7] == signals[2:7]
+    assert trace[::3] == signals[::3]
+    with pytest.raises(IndexError):
+        trace[-len(signals) - 1]
+
+
+def test_array_reserve_and_view(signals):
+    """Test if reserved traces append in place and views are zero-copy."""
+    trace = ArrayTrace(signals)
+    trace.reserve(100)
+    buffer = trace.buffer
+    for _ in range(100 - len(signals)):
+        trace.append(1)
+    assert trace.buffer is buffer  # no reallocation
+    view = trace.view(3, 5)
+    assert view.tolist() == [1, 1]
+    assert view.obj is buffer
+    # Growing the trace keeps earlier views valid
+    trace.append(0)
+    assert trace.buffer is not buffer
+    assert view.tolist() == [1, 1]
+    assert len(trace) == 101
+
+
+def test_state_matrix_vector_engine():
+    """Test if rows are copied from the vectorized engine's signals."""
+    pytest.importorskip("numpy")
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, CL_ID, NAND1_ID, I1, I2] = names.lookup(["Sw1", "Clock1",
+                                                      "Nand1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    devices.make_device(NAND1_ID, devices.NAND, 2)
+    network.make_connection(SW1_ID, None, NAND1_ID, I1)
+    network.make_connection(CL_ID, None, NAND1_ID, I2)
+    matrix = StateMatrix(devices, network)
+
+    rows = []
+    for engine in [network.LEVELIZED, network.VECTORIZED]:
+        assert network.set_engine(engine)
+        random.seed(0)
+        devices.cold_startup()
+        matrix.clear()
+        for _ in range(6):
+            assert network.execute_network()
+            matrix.record_row()
+        rows.append([matrix.get_row(cycle).tolist() for cycle in range(6)])
+    assert network.vector_engine.synchronised
+    assert rows[0] == rows[1]
+    assert matrix.get_column(NAND1_ID, None).tolist() == [
+        row[2] for row in rows[0]]
+
+
+def test_spill_trace(tmp_path):
+    """Test if a spilled trace reads old cycles back from its file."""
+    signals = [(cycle // 3) % 2 for cycle in range(100)]
+    trace = SpillTrace(signals[:50], directory=tmp_path, chunk_size=8)
+    trace.extend(signals[50:])
+    assert trace.spilled == 96
+    assert len(trace.tail) == 8
+    assert len(trace) == 100
+    assert trace == signals
+    for index in [0, 7, 8, 95, 96, 99, -1]:
+        assert trace[index] == signals[index]
+    assert trace[90:100] == signals[90:100]
+    assert trace[10:20] == signals[10:20]
+    assert trace[97:99] == signals[97:99]
+    assert trace[::7] == signals[::7]
+
+    view = trace.view(0, 40)
+    trace.clear()
+    assert view.tolist() == signals[:40]
+    assert len(trace) == 0
+    trace.append(1)
+    assert trace == [1]
+    trace.close()
+
+
+def test_prefill(tmp_path):
+    """Test if every trace type fills a prefix without a full list."""
+    for count in [0, 3, 8, 21]:
+        expected = [4] * count + [1, 0]
+        traces = [RunLengthTrace([1, 0], prefill=(4, count)),
+                  ArrayTrace([1, 0], prefill=(4, count)),
+                  SpillTrace([1, 0], tmp_path, chunk_size=8,
+                             prefill=(4, count))]
+        for trace in traces:
+            assert trace == expected
+        assert traces[0].starts.tolist() == ([0, count, count + 1] if count
+                                             else [0, 1])
+        assert traces[2].spilled == (count + 2) // 8 * 8
+        traces[2].close()
+        ring = RingTrace([1, 0], capacity=5, prefill=(4, count))
+        assert ring == expected[-5:]
+        assert ring.first_cycle == max(0, count + 2 - 5)
+
+    trace = SpillTrace([1, 0, 1], tmp_path, chunk_size=8)
+    trace.fill(0, 20)
+    assert trace == [1, 0, 1] + [0] * 20
+    trace.close()
+
+
+def test_spill_trace_empty(tmp_path):
+    """Test if a trace with nothing spilled reads from its tail."""
+    trace = SpillTrace(directory=tmp_path, chunk_size=8)
+    assert trace.view().tolist() == []
+    assert trace[:] == []
+    assert trace[0:0] == []
+    trace.extend([1, 0, 1])
+    assert trace.view(1).tolist() == [0, 1]
+    assert trace[:] == [1, 0, 1]
+    trace.extend([0] * 5)
+    assert trace.spilled == 8
+    assert trace[8:] == []
+    trace.close()
+
+
+def test_ring_trace():
+    """Test if a ring trace keeps only the most recent cycles."""
+    signals = [(cycle // 3) % 2 for cycle in range(20)]
+    trace = RingTrace(signals[:4], capacity=8)
+    assert trace == signals[:4]
+    assert trace.first_cycle == 0
+
+    trace.extend(signals[4:])
+    assert len(trace) == 8
+    assert trace.first_cycle == 12
+    assert trace == signals[12:]
+    for index in [0, 3, 7, -1]:
+        assert trace[index] == signals[12:][index]
+    assert trace[2:7] == signals[14:19]
+    assert trace[::3] == signals[12::3]
+    assert trace.view(5).tolist() == signals[17:]
+    with pytest.raises(IndexError):
+        trace[8]
+
+    trace.clear()
+    assert len(trace) == 0
+    trace.append(1)
+    assert trace == [1]
+
+
+def test_transition_index():
+    """Test edge searches, counts and value lookups of the index."""
+    devices = Devices(Names())
+    index = TransitionIndex(devices)
+    clock = [(cycle // 2) % 2 for cycle in range(20)]  # _ _ - - _ _ ...
+    other = [int(cycle >= 6) for cycle in range(20)]
+    for cycle in range(20):
+        index.record_cycle(cycle, {"clock": clock[cycle],
+                                   "other": other[cycle]})
+
+    assert index.get_changes("clock") == [0, 2, 4, 6, 8, 10, 12, 14, 16, 18]
+    assert index.get_changes("clock", 5, 12) == [6, 8, 10]
+    assert index.first_edge("clock") == 2
+    assert index.first_edge("clock", rising=False, start=7) == 8
+    assert index.first_edge("other", start=7) is None
+    assert index.count_edges("clock") == 5
+    assert index.count_edges("clock", True, 6, 14) == 2
+    assert index.count_edges("clock", False, 0, 5) == 1
+    for cycle in range(20):
+        assert index.value_at("clock", cycle) == clock[cycle]
+    assert index.value_at("clock", -1) is None
+    assert index.value_at("absent", 3) is None
+    assert index.common_changes(["clock", "other"]) == [0, 6]
+    assert index.common_changes(["clock", "other"], 1) == [6]
+    index.reset()
+    assert index.get_changes("clock") == []
+
+
+def test_detail_pyramid():
+    """Test if every bucket holds the min and max of its cycles."""
+    devices = Devices(Names())
+    pyramid = DetailPyramid(devices)
+    rng = random.Random(0)
+    signals = [(cycle // 37) % 2 if cycle < 600 else
+               rng.choice([devices.LOW, devices.HIGH, devices.BLANK])
+               for cycle in range(1000)]
+    pyramid.add_trace("trace", signals[:10])
+    for cycle in range(10, 1000):
+        pyramid.record_cycle(cycle, {"trace": signals[cycle]})
+
+    minima = pyramid.minima["trace"]
+    maxima = pyramid.maxima["trace"]
+    assert len(minima) == 10
+    for level in range(len(minima)):
+        size = 2 ** (level + 1)
+        assert len(minima[level]) == (1000 + size - 1) // size
+        for bucket in range(len(minima[level])):
+            levels = [signal for signal
+                      in signals[bucket * size:(bucket + 1) * size]
+                      if signal != devices.BLANK]
+            if levels:
+                expected = (min(levels), max(levels))
+            else:
+                expected = (1, 0)
+            assert (minima[level][bucket], maxima[level][bucket]) == expected
+
+    assert pyramid.get_buckets("trace", 0, 1000, 1000) is None
+    buckets = pyramid.get_buckets("trace", 100, 900, 100)
+    assert len(buckets) <= 101
+    assert buckets[0][2] == 100 and buckets[-1][3] == 900
+    assert all(low <= high for low, high, start, stop in buckets[:50])
+
+
+def test_detail_pyramid_late_monitor():
+    """Test if a monitor first seen after cycle 0 is padded with BLANK."""
+    devices = Devices(Names())
+    pyramid = DetailPyramid(devices)
+    pyramid.record_cycle(4, {"trace": devices.HIGH})
+    assert pyramid.lengths["trace"] == 5
+    assert pyramid.minima["trace"][0] == bytearray([1, 1, 1])
+    assert pyramid.maxima["trace"][0] == bytearray([0, 0, 1])
+
+
+def test_signal_statistics(signals):
+    """Test if the running statistics match the recorded trace."""
+    devices = Devices(Names())
+    statistics = SignalStatistics(devices)
+    assert statistics.get_statistics("a") is None
+    statistics.add_trace("a", signals[:6])
+    for cycle, signal in enumerate(signals[6:], 6):
+        statistics.record_cycle(cycle, {"a": signal, "b": devices.RISING})
+    # The BLANK cycles end the run of LOW at cycle 5
+    assert statistics.get_statistics("a") == {
+        "rising": 1, "falling": 1, "high": 3, "low": 4, "glitches": 0,
+        "longest_run": 3, "last_change": 5}
+    assert statistics.get_statistics("b")["high"] == 5
+
+    statistics.reset()
+    for cycle, signal in enumerate([0, 1, 0, 0, 3, 2, 1, 0]):
+        statistics.record_cycle(cycle, {"a": signal})
+    assert statistics.get_statistics("a") == {
+        "rising": 2, "falling": 2, "high": 3, "low": 5, "glitches": 1,
+        "longest_run": 3, "last_change": 7}
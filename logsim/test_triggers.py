@@ -0,0 +1,124 @@
+"""Test the triggers module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from triggers import Trigger, TriggerCapture
+
+
+@pytest.fixture
+def new_monitors():
+    """Return a Monitors instance with monitors on two switches and a gate.
+
+    Sw1 and Sw2 are connected to And1.
+    """
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [SW1_ID, SW2_ID, AND1_ID, I1, I2] = names.lookup(["Sw1", "Sw2", "And1",
+                                                      "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(SW2_ID, None, AND1_ID, I2)
+    monitors.make_monitor(SW1_ID, None)
+    monitors.make_monitor(AND1_ID, None)
+    return monitors
+
+
+def run(monitors, sw1_levels, sw2_levels):
+    """Run one cycle per pair of switch levels, recording the monitors."""
+    [SW1_ID, SW2_ID] = monitors.names.lookup(["Sw1", "Sw2"])
+    for sw1_level, sw2_level in zip(sw1_levels, sw2_levels):
+        monitors.devices.set_switch(SW1_ID, sw1_level)
+        monitors.devices.set_switch(SW2_ID, sw2_level)
+        assert monitors.network.execute_network()
+        monitors.record_signals()
+
+
+def test_trigger_conditions(new_monitors):
+    """Test if edge, value and cycle conditions must all hold."""
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, AND1_ID] = new_monitors.names.lookup(["Sw1", "Sw2",
+                                                           "And1"])
+    trigger = Trigger(devices, new_monitors.network)
+    assert not trigger.add_edge(SW1_ID, None, devices.HIGH)
+    assert not trigger.add_edge(AND1_ID, SW1_ID, devices.RISING)
+    assert not trigger.add_values({(SW2_ID, None): devices.RISING})
+    assert not trigger.add_cycles(5, 5)
+    assert trigger.conditions == []
+
+    assert trigger.add_edge(SW1_ID, None, devices.RISING)
+    assert trigger.add_values({(SW2_ID, None): devices.HIGH})
+    assert trigger.add_cycles(2)
+    capture = new_monitors.set_trigger(trigger, pre=0, post=0, rearm=True)
+    run(new_monitors, [1, 0, 1, 0, 1, 0, 1], [1, 1, 0, 0, 1, 1, 1])
+    assert [cycle for cycle, window in capture.captures] == [4, 6]
+
+
+def test_trigger_capture(new_monitors):
+    """Test if the windows around a trigger are captured once."""
+    devices = new_monitors.devices
+    [SW1_ID, AND1_ID] = new_monitors.names.lookup(["Sw1", "And1"])
+    trigger = Trigger(devices, new_monitors.network)
+    trigger.add_edge(SW1_ID, None, devices.FALLING)
+    capture = new_monitors.set_trigger(trigger, pre=2, post=1)
+
+    sw1_levels = [1, 1, 1, 0, 1, 1, 0, 1, 0]
+    run(new_monitors, sw1_levels, [1] * 9)
+    assert capture.captures == [(3, {(SW1_ID, None): [1, 1, 0, 1],
+                                     (AND1_ID, None): [1, 1, 0, 1]})]
+    assert capture.state == capture.DONE
+    assert new_monitors.monitors_dictionary[(SW1_ID, None)] == []
+
+    # Windows are cut short at the start of a run
+    new_monitors.reset_monitors()
+    assert capture.captures == []
+    run(new_monitors, [1, 0, 1], [1] * 3)
+    assert capture.captures == [(1, {(SW1_ID, None): [1, 0, 1],
+                                     (AND1_ID, None): [1, 0, 1]})]
+
+    assert new_monitors.clear_trigger()
+    assert not new_monitors.clear_trigger()
+    run(new_monitors, [1, 0], [1] * 2)
+    assert new_monitors.monitors_dictionary[(SW1_ID, None)] == [1, 0]
+
+
+def test_trigger_rearm(new_monitors):
+    """Test if a re-armed capture keeps every window after the first."""
+    devices = new_monitors.devices
+    [SW1_ID] = new_monitors.names.lookup(["Sw1"])
+    trigger = Trigger(devices, new_monitors.network)
+    trigger.add_edge(SW1_ID, None, devices.RISING)
+    capture = TriggerCapture(trigger, pre=1, post=2, rearm=True)
+    new_monitors.add_listener(capture)
+
+    # The rising edge at cycle 3 is within the first window
+    run(new_monitors, [0, 1, 0, 1, 0, 0, 0, 1, 1, 1], [0] * 10)
+    assert [(cycle, window[(SW1_ID, None)])
+            for cycle, window in capture.captures] == [(1, [0, 1, 0, 1]),
+                                                       (7, [0, 1, 1, 1])]
+    assert len(new_monitors.monitors_dictionary[(SW1_ID, None)]) == 10
+
+
+def test_trigger_statistics(new_monitors):
+    """Test if statistics count the cycles not kept while a trigger is set."""
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID] = new_monitors.names.lookup(["Sw1", "Sw2"])
+    run(new_monitors, [0, 1], [0, 0])
+    new_monitors.get_statistics()
+    trigger = Trigger(devices, new_monitors.network)
+    trigger.add_edge(SW2_ID, None, devices.RISING)
+    new_monitors.set_trigger(trigger)
+    run(new_monitors, [0, 1, 0], [0, 0, 0])
+
+    assert len(new_monitors.monitors_dictionary[(SW1_ID, None)]) == 2
+    assert new_monitors.get_first_cycle(SW1_ID, None) == 0
+    statistics = new_monitors.get_statistics()[(SW1_ID, None)]
+    assert statistics["rising"] == 2
+    assert statistics["low"] == 3
+    assert statistics["last_change"] == 4
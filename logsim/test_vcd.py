@@ -0,0 +1,66 @@
+"""Test the vcd module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from vcd import VcdWriter
+
+
+@pytest.fixture
+def new_monitors():
+    """Return a Monitors instance with monitors on a switch and a NOT gate."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [SW1_ID, NAND1_ID, I1] = names.lookup(["Sw1", "Nand1", "I1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(NAND1_ID, devices.NAND, 1)
+    network.make_connection(SW1_ID, None, NAND1_ID, I1)
+    monitors.make_monitor(SW1_ID, None)
+    monitors.make_monitor(NAND1_ID, None)
+    return monitors
+
+
+def test_get_identifier(new_monitors, tmp_path):
+    """Test if identifier codes are unique printable strings."""
+    writer = VcdWriter(new_monitors.names, new_monitors.devices,
+                       new_monitors, tmp_path / "out.vcd")
+    identifiers = [writer.get_identifier(number) for number in range(9000)]
+    assert identifiers[:2] == ["!", '"']
+    assert len(set(identifiers)) == 9000
+    assert all(33 <= ord(char) <= 126 for identifier in identifiers
+               for char in identifier)
+    writer.close()
+
+
+def test_vcd_changes(new_monitors, tmp_path):
+    """Test if only the changed signals are written each cycle."""
+    monitors = new_monitors
+    devices = monitors.devices
+    network = monitors.network
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    path = tmp_path / "out.vcd"
+    writer = VcdWriter(monitors.names, devices, monitors, path)
+    monitors.add_listener(writer)
+
+    for state in [0, 0, 1, 1, 0]:
+        devices.set_switch(SW1_ID, state)
+        network.execute_network()
+        monitors.record_signals()
+    monitors.reset_monitors()
+    network.execute_network()
+    monitors.record_signals()  # nothing changes after the reset
+    assert monitors.remove_listener(writer)
+    writer.close()
+
+    lines = path.read_text().splitlines()
+    assert "$var wire 1 ! Sw1 $end" in lines
+    assert '$var wire 1 " Nand1 $end' in lines
+    body = lines[lines.index("$enddefinitions $end") + 1:]
+    assert body == ["#0", "$dumpvars", "0!", '1"', "$end",
+                    "#2", "1!", '0"',
+                    "#4", "0!", '1"',
+                    "#6"]
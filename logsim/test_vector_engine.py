@@ -0,0 +1,170 @@
+"""Test the vector_engine module."""
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def counter_network():
+    """Return a Network with a clocked D-type and a chain of gates.
+
+    D1 toggles through an XOR with a switch, and its output drives a chain
+    of gates of every kind.
+    """
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+
+    [SW1_ID, SW2_ID, CL_ID, D_ID, XOR1_ID, AND1_ID, OR1_ID, NAND1_ID,
+     NOR1_ID, I1, I2, I3] = new_names.lookup(
+        ["Sw1", "Sw2", "Clock1", "D1", "Xor1", "And1", "Or1", "Nand1",
+         "Nor1", "I1", "I2", "I3"])
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 1)
+    new_devices.make_device(SW2_ID, new_devices.SWITCH, 0)
+    new_devices.make_device(CL_ID, new_devices.CLOCK, 1)
+    new_devices.make_device(D_ID, new_devices.D_TYPE)
+    new_devices.make_device(XOR1_ID, new_devices.XOR)
+    new_devices.make_device(AND1_ID, new_devices.AND, 2)
+    new_devices.make_device(OR1_ID, new_devices.OR, 3)
+    new_devices.make_device(NAND1_ID, new_devices.NAND, 2)
+    new_devices.make_device(NOR1_ID, new_devices.NOR, 1)
+
+    connections = [(SW1_ID, None, XOR1_ID, I1),
+                   (D_ID, new_devices.Q_ID, XOR1_ID, I2),
+                   (XOR1_ID, None, D_ID, new_devices.DATA_ID),
+                   (CL_ID, None, D_ID, new_devices.CLK_ID),
+                   (SW2_ID, None, D_ID, new_devices.SET_ID),
+                   (SW2_ID, None, D_ID, new_devices.CLEAR_ID),
+                   (D_ID, new_devices.QBAR_ID, AND1_ID, I1),
+                   (SW1_ID, None, AND1_ID, I2),
+                   (AND1_ID, None, OR1_ID, I1),
+                   (SW2_ID, None, OR1_ID, I2),
+                   (D_ID, new_devices.Q_ID, OR1_ID, I3),
+                   (OR1_ID, None, NAND1_ID, I1),
+                   (XOR1_ID, None, NAND1_ID, I2),
+                   (NAND1_ID, None, NOR1_ID, I1)]
+    for connection in connections:
+        assert new_network.make_connection(*connection) == \
+            new_network.NO_ERROR
+    return new_network
+
+
+def run_engine(network, engine, cycles):
+    """Return the output signals of every device after each cycle."""
+    devices = network.devices
+    assert network.set_engine(engine)
+    random.seed(0)
+    devices.cold_startup()
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    signals = []
+    for cycle in range(cycles):
+        devices.set_switch(SW1_ID, int(cycle % 5 < 2))
+        assert network.execute_network()
+        signals.append([dict(device.outputs)
+                        for device in devices.devices_list])
+    return signals
+
+
+def test_vectorized_matches_levelized(counter_network):
+    """Test if the vectorized engine gives the same signals as levelized."""
+    network = counter_network
+    levelized = run_engine(network, network.LEVELIZED, 30)
+    vectorized = run_engine(network, network.VECTORIZED, 30)
+    assert network.vector_engine is not None
+    assert vectorized == levelized
+
+
+def test_vectorized_rising_and_falling(counter_network):
+    """Test if the signal vector keeps RISING and FALLING edges."""
+    network = counter_network
+    devices = network.devices
+    assert network.set_engine(network.VECTORIZED)
+    assert network.execute_network()
+    engine = network.vector_engine
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    slot = engine.slots.index((devices.get_device(SW1_ID), None))
+
+    assert engine.update_table[devices.LOW, devices.HIGH] == devices.RISING
+    assert engine.update_table[devices.RISING, devices.HIGH] == devices.HIGH
+    assert engine.update_table[devices.HIGH, devices.LOW] == devices.FALLING
+    assert engine.update_table[devices.BLANK, devices.LOW] == -1
+    assert engine.signals[slot] == devices.HIGH
+    devices.set_switch(SW1_ID, devices.LOW)
+    assert network.execute_network()
+    assert engine.signals[slot] == devices.LOW
+    assert network.get_output_signal(SW1_ID, None) == devices.LOW
+
+
+def test_vectorized_dtype_chain():
+    """Test if D-types clocked by other D-types match the levelized engine.
+
+    DA toggles on each clock edge and clocks DB, which captures the clock
+    signal itself. The levelized engine clocks DB in the same iteration as
+    DA, while the clock is still RISING.
+    """
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, CL_ID, DA_ID, DB_ID] = names.lookup(["Sw1", "Clock1", "DA",
+                                                  "DB"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    devices.make_device(DA_ID, devices.D_TYPE)
+    devices.make_device(DB_ID, devices.D_TYPE)
+    connections = [(CL_ID, None, DA_ID, devices.CLK_ID),
+                   (DA_ID, devices.QBAR_ID, DA_ID, devices.DATA_ID),
+                   (DA_ID, devices.Q_ID, DB_ID, devices.CLK_ID),
+                   (CL_ID, None, DB_ID, devices.DATA_ID)]
+    for device_id in [DA_ID, DB_ID]:
+        connections.extend([(SW1_ID, None, device_id, devices.SET_ID),
+                            (SW1_ID, None, device_id, devices.CLEAR_ID)])
+    for connection in connections:
+        assert network.make_connection(*connection) == network.NO_ERROR
+
+    levelized = run_engine(network, network.LEVELIZED, 12)
+    vectorized = run_engine(network, network.VECTORIZED, 12)
+    assert [len(stage[0]) for stage in network.vector_engine.dtype_stages] \
+        == [1, 1]
+    assert vectorized == levelized
+
+
+def test_vectorized_dtype_pass_order():
+    """Test if D-type stages keep the order the levelized engine uses.
+
+    D1 reads D0, so it cannot be in the first stage, but it must still
+    run before D2, which clocks it and comes after it in the pass order.
+    """
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, SW2_ID, CL_ID, D0_ID, D1_ID, D2_ID] = names.lookup(
+        ["Sw1", "Sw2", "Clock1", "D0", "D1", "D2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 1)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    for device_id in [D0_ID, D1_ID, D2_ID]:
+        devices.make_device(device_id, devices.D_TYPE)
+    connections = [(SW1_ID, None, D0_ID, devices.CLK_ID),
+                   (SW1_ID, None, D0_ID, devices.DATA_ID),
+                   (SW1_ID, None, D0_ID, devices.SET_ID),
+                   (SW2_ID, None, D0_ID, devices.CLEAR_ID),
+                   (D2_ID, devices.Q_ID, D1_ID, devices.CLK_ID),
+                   (CL_ID, None, D1_ID, devices.DATA_ID),
+                   (D0_ID, devices.Q_ID, D1_ID, devices.SET_ID),
+                   (SW1_ID, None, D1_ID, devices.CLEAR_ID),
+                   (CL_ID, None, D2_ID, devices.CLK_ID),
+                   (D2_ID, devices.QBAR_ID, D2_ID, devices.DATA_ID),
+                   (SW1_ID, None, D2_ID, devices.SET_ID),
+                   (SW1_ID, None, D2_ID, devices.CLEAR_ID)]
+    for connection in connections:
+        assert network.make_connection(*connection) == network.NO_ERROR
+
+    levelized = run_engine(network, network.LEVELIZED, 12)
+    vectorized = run_engine(network, network.VECTORIZED, 12)
+    assert vectorized == levelized
@@ -0,0 +1,1022 @@
+"""Store and index recorded signal traces.
+
+Used in the Logic Simulator project as alternative storage for the signal
+traces kept by the Monitors class, and as indexes over them that are kept
+up to date as cycles are recorded.
+
+Classes
+-------
+RunLengthTrace - stores a trace as runs of equal signals.
+
+ArrayTrace - stores a trace as one byte per cycle in a growable buffer.
+
+StateMatrix - records every output signal as one row per cycle.
+
+SpillTrace - stores a trace in a temporary file with an in-memory tail.
+
+RingTrace - keeps only the most recent cycles of a trace.
+
+TransitionIndex - indexes the cycles at which monitored signals change.
+
+DetailPyramid - keeps min/max summaries of monitored signals at coarser
+                resolutions.
+
+SignalStatistics - keeps running activity statistics of monitored signals.
+"""
+import array
+import bisect
+import mmap
+import tempfile
+
+
+class RunLengthTrace:
+
+    """Store a trace as runs of equal signals.
+
+    Only the signal and first cycle of each run are stored, so memory grows
+    with the number of transitions rather than the number of cycles. The
+    trace behaves like a list of signals: it can be appended to, indexed,
+    sliced and iterated over. Indexing is a binary search over the run
+    starts, and iteration expands the runs one cycle at a time.
+
+    Parameters
+    ----------
+    signals: optional iterable of signals to start the trace with.
+    prefill: optional (signal, count) tuple to add before signals.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal to the end of the trace.
+
+    extend(self, signals): Adds signals to the end of the trace.
+
+    fill(self, signal, count): Adds count copies of a signal.
+
+    clear(self): Removes every signal from the trace.
+
+    runs(self, start=0, stop=None): Returns (signal, start, stop) for each
+                                    run overlapping the range of cycles.
+    """
+
+    def __init__(self, signals=(), prefill=None):
+        """Initialise the run arrays."""
+        self.values = array.array("b")  # signal of each run
+        self.starts = array.array("q")  # first cycle of each run
+        self.length = 0
+        if prefill is not None:
+            self.fill(*prefill)
+        self.extend(signals)
+
+    def append(self, signal):
+        """Add a signal to the end of the trace."""
+        if not self.values or self.values[-1] != signal:
+            self.values.append(signal)
+            self.starts.append(self.length)
+        self.length += 1
+
+    def extend(self, signals):
+        """Add signals to the end of the trace."""
+        for signal in signals:
+            self.append(signal)
+
+    def fill(self, signal, count):
+        """Add count copies of a signal as a single run."""
+        if count <= 0:
+            return
+        if not self.values or self.values[-1] != signal:
+            self.values.append(signal)
+            self.starts.append(self.length)
+        self.length += count
+
+    def clear(self):
+        """Remove every signal from the trace."""
+        del self.values[:]
+        del self.starts[:]
+        self.length = 0
+
+    def runs(self, start=0, stop=None):
+        """Return (signal, start, stop) for each run in the range of cycles.
+
+        Runs are clipped to the range, so together they cover exactly the
+        cycles from start up to but not including stop.
+        """
+        if stop is None or stop > self.length:
+            stop = self.length
+        runs = []
+        if start >= stop:
+            return runs
+        run = bisect.bisect_right(self.starts, start) - 1
+        while run < len(self.starts) and self.starts[run] < stop:
+            if run + 1 < len(self.starts):
+                run_stop = min(self.starts[run + 1], stop)
+            else:
+                run_stop = stop
+            runs.append((self.values[run], max(self.starts[run], start),
+                         run_stop))
+            run += 1
+        return runs
+
+    def __len__(self):
+        """Return the number of cycles in the trace."""
+        return self.length
+
+    def __getitem__(self, index):
+        """Return the signal at index, or a list of signals for a slice."""
+        if isinstance(index, slice):
+            [start, stop, step] = index.indices(self.length)
+            if step != 1:
+                return list(self)[index]
+            signals = []
+            for signal, run_start, run_stop in self.runs(start, stop):
+                signals.extend([signal] * (run_stop - run_start))
+            return signals
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("trace index out of range")
+        return self.values[bisect.bisect_right(self.starts, index) - 1]
+
+    def __iter__(self):
+        """Iterate over the signals one cycle at a time."""
+        for signal, run_start, run_stop in self.runs():
+            for _ in range(run_stop - run_start):
+                yield signal
+
+    def __eq__(self, other):
+        """Return True if other holds the same signals."""
+        if isinstance(other, RunLengthTrace):
+            return (self.length == other.length and
+                    self.values == other.values and
+                    self.starts == other.starts)
+        try:
+            return len(other) == self.length and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the trace as a list of runs."""
+        return "RunLengthTrace(" + repr(self.runs()) + ")"
+
+
+class ArrayTrace:
+
+    """Store a trace as one byte per cycle in a growable buffer.
+
+    Signals only take the values in Devices.signal_types, so each cycle is
+    stored as one byte of a bytearray rather than a reference to a Python
+    int. The buffer has spare capacity, so appending writes into it without
+    allocating, and reserve() can size it for a whole run in advance. When
+    the buffer fills up it is replaced by one twice the size, so views
+    taken earlier stay valid.
+
+    Parameters
+    ----------
+    signals: optional iterable of signals to start the trace with.
+    capacity: optional number of cycles to allocate space for.
+    prefill: optional (signal, count) tuple to add before signals.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal to the end of the trace.
+
+    extend(self, signals): Adds signals to the end of the trace.
+
+    fill(self, signal, count): Adds count copies of a signal.
+
+    clear(self): Removes every signal from the trace.
+
+    reserve(self, capacity): Makes space for capacity cycles in total.
+
+    view(self, start=0, stop=None): Returns a zero-copy memoryview of a
+                                    range of cycles.
+    """
+
+    def __init__(self, signals=(), capacity=16, prefill=None):
+        """Initialise the buffer."""
+        self.buffer = bytearray(max(capacity, 1))
+        self.length = 0
+        if prefill is not None:
+            self.fill(*prefill)
+        self.extend(signals)
+
+    def reserve(self, capacity):
+        """Make space for capacity cycles in total."""
+        if capacity > len(self.buffer):
+            buffer = bytearray(capacity)
+            buffer[:self.length] = self.buffer[:self.length]
+            self.buffer = buffer
+
+    def append(self, signal):
+        """Add a signal to the end of the trace."""
+        if self.length == len(self.buffer):
+            self.reserve(2 * self.length)
+        self.buffer[self.length] = signal
+        self.length += 1
+
+    def extend(self, signals):
+        """Add signals to the end of the trace."""
+        for signal in signals:
+            self.append(signal)
+
+    def fill(self, signal, count):
+        """Add count copies of a signal."""
+        if count <= 0:
+            return
+        self.reserve(self.length + count)
+        self.buffer[self.length:self.length + count] = bytes([signal]) * count
+        self.length += count
+
+    def clear(self):
+        """Remove every signal from the trace."""
+        self.buffer = bytearray(len(self.buffer))
+        self.length = 0
+
+    def view(self, start=0, stop=None):
+        """Return a zero-copy memoryview of the signals from start to stop."""
+        return memoryview(self.buffer)[:self.length][start:stop]
+
+    def __len__(self):
+        """Return the number of cycles in the trace."""
+        return self.length
+
+    def __getitem__(self, index):
+        """Return the signal at index, or a list of signals for a slice."""
+        if isinstance(index, slice):
+            return self.view()[index].tolist()
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("trace index out of range")
+        return self.buffer[index]
+
+    def __iter__(self):
+        """Iterate over the signals."""
+        return iter(self.view())
+
+    def __eq__(self, other):
+        """Return True if other holds the same signals."""
+        if isinstance(other, ArrayTrace):
+            return self.view() == other.view()
+        try:
+            return len(other) == self.length and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the trace as a list of signals."""
+        return "ArrayTrace(" + repr(self.view().tolist()) + ")"
+
+
+class StateMatrix:
+
+    """Record every output signal as one row per cycle.
+
+    The outputs are given a fixed slot order when the matrix is made: the
+    devices in Devices.devices_list order, and the outputs of each device
+    in turn. Each cycle adds one row of bytes to a (cycles x outputs)
+    matrix stored row by row in a bytearray. The row is gathered in one
+    pass over a precomputed list of output dictionaries. If the vectorized
+    engine is in use its signal vector already has this slot order, so the
+    row is a single copy of it.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+
+    Public methods
+    --------------
+    record_row(self): Adds a row with the current output signals.
+
+    clear(self): Removes every row.
+
+    reserve(self, rows): Makes space for rows rows in total.
+
+    get_slot(self, device_id, output_id): Returns the column of an output.
+
+    get_row(self, cycle): Returns a memoryview of one cycle's signals.
+
+    get_column(self, device_id, output_id): Returns a memoryview of one
+                                            output's signals.
+    """
+
+    def __init__(self, devices, network):
+        """Build the slot order and the empty matrix."""
+        self.network = network
+        self.slots = []  # (device_id, output_id) of each column
+        self.sources = []  # (outputs dictionary, output_id) of each column
+        for device in devices.devices_list:
+            for output_id in device.outputs:
+                self.slots.append((device.device_id, output_id))
+                self.sources.append((device.outputs, output_id))
+        self.slot_index = {slot: column
+                           for column, slot in enumerate(self.slots)}
+        self.width = len(self.slots)
+        self.buffer = bytearray(self.width * 16)
+        self.rows = 0
+
+    def reserve(self, rows):
+        """Make space for rows rows in total."""
+        if rows * self.width > len(self.buffer):
+            buffer = bytearray(rows * self.width)
+            size = self.rows * self.width
+            buffer[:size] = self.buffer[:size]
+            self.buffer = buffer
+
+    def record_row(self):
+        """Add a row with the current signal of every output."""
+        engine = self.network.vector_engine
+        if (engine is not None and engine.synchronised and
+                len(engine.slots) == self.width):
+            row = engine.signals.tobytes()
+        else:
+            row = bytes([outputs[output_id]
+                         for outputs, output_id in self.sources])
+        if (self.rows + 1) * self.width > len(self.buffer):
+            self.reserve(2 * self.rows + 1)
+        start = self.rows * self.width
+        self.buffer[start:start + self.width] = row
+        self.rows += 1
+
+    def clear(self):
+        """Remove every row."""
+        self.buffer = bytearray(len(self.buffer))
+        self.rows = 0
+
+    def get_slot(self, device_id, output_id):
+        """Return the column of the specified output, or None if absent."""
+        return self.slot_index.get((device_id, output_id))
+
+    def get_row(self, cycle):
+        """Return a memoryview of the signals recorded at cycle."""
+        start = cycle * self.width
+        return memoryview(self.buffer)[start:start + self.width]
+
+    def get_column(self, device_id, output_id):
+        """Return a memoryview of every recorded signal of an output.
+
+        Return None if the output has no column.
+        """
+        column = self.get_slot(device_id, output_id)
+        if column is None:
+            return None
+        return memoryview(self.buffer)[column:self.rows * self.width:
+                                       self.width]
+
+
+class SpillTrace:
+
+    """Store a trace in a temporary file with an in-memory tail.
+
+    New signals are written to a tail buffer of chunk_size bytes. When the
+    tail is full it is appended to a temporary file, one file per trace,
+    so memory use stays bounded however long the run is. Older cycles are
+    read back through an mmap of the file, which is only remapped when the
+    file has grown. The trace supports the same indexing, slicing,
+    iteration and view() access as ArrayTrace.
+
+    Parameters
+    ----------
+    signals: optional iterable of signals to start the trace with.
+    directory: optional directory for the temporary file.
+    chunk_size: optional number of cycles kept in memory.
+    prefill: optional (signal, count) tuple to add before signals.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal to the end of the trace.
+
+    extend(self, signals): Adds signals to the end of the trace.
+
+    fill(self, signal, count): Adds count copies of a signal.
+
+    clear(self): Removes every signal from the trace.
+
+    view(self, start=0, stop=None): Returns a memoryview of a range of
+                                    cycles.
+
+    close(self): Closes and deletes the temporary file.
+    """
+
+    def __init__(self, signals=(), directory=None, chunk_size=65536,
+                 prefill=None):
+        """Create the temporary file and the tail buffer."""
+        self.directory = directory
+        self.file = tempfile.TemporaryFile(dir=directory, buffering=0)
+        self.tail = bytearray(chunk_size)
+        self.tail_length = 0
+        self.spilled = 0  # number of cycles in the file
+        self.map = None
+        if prefill is not None:
+            self.fill(*prefill)
+        self.extend(signals)
+
+    def append(self, signal):
+        """Add a signal to the end of the trace."""
+        self.tail[self.tail_length] = signal
+        self.tail_length += 1
+        if self.tail_length == len(self.tail):
+            self.file.write(self.tail)
+            self.spilled += self.tail_length
+            self.tail_length = 0
+
+    def extend(self, signals):
+        """Add signals to the end of the trace."""
+        for signal in signals:
+            self.append(signal)
+
+    def fill(self, signal, count):
+        """Add count copies of a signal.
+
+        Whole chunks go straight to the file, so memory use stays bounded.
+        """
+        chunk_size = len(self.tail)
+        while count > 0:
+            if self.tail_length == 0 and count >= chunk_size:
+                chunks = count // chunk_size
+                block = bytes([signal]) * chunk_size
+                for _ in range(chunks):
+                    self.file.write(block)
+                self.spilled += chunks * chunk_size
+                count -= chunks * chunk_size
+                continue
+            length = min(count, chunk_size - self.tail_length)
+            self.tail[self.tail_length:self.tail_length + length] = \
+                bytes([signal]) * length
+            count -= length
+            self.tail_length += length
+            if self.tail_length == chunk_size:
+                self.file.write(self.tail)
+                self.spilled += chunk_size
+                self.tail_length = 0
+
+    def clear(self):
+        """Remove every signal from the trace."""
+        # Start a new file, so views of the old one stay readable
+        self.close()
+        self.file = tempfile.TemporaryFile(dir=self.directory, buffering=0)
+        self.spilled = 0
+        self.tail_length = 0
+
+    def close(self):
+        """Close and delete the temporary file."""
+        self.map = None
+        self.file.close()
+
+    def get_map(self):
+        """Return an mmap covering every spilled cycle."""
+        if self.map is None or len(self.map) < self.spilled:
+            self.map = mmap.mmap(self.file.fileno(), self.spilled,
+                                 access=mmap.ACCESS_READ)
+        return self.map
+
+    def view(self, start=0, stop=None):
+        """Return a memoryview of the signals from start to stop.
+
+        Ranges held entirely in the file or in the tail are not copied.
+        """
+        [start, stop, step] = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        tail = memoryview(self.tail)[:self.tail_length]
+        if start >= self.spilled:  # also covers an empty file
+            return tail[start - self.spilled:stop - self.spilled]
+        if stop <= self.spilled:
+            return memoryview(self.get_map())[start:stop]
+        return memoryview(self.get_map()[start:self.spilled] +
+                          tail[:stop - self.spilled].tobytes())
+
+    def __len__(self):
+        """Return the number of cycles in the trace."""
+        return self.spilled + self.tail_length
+
+    def __getitem__(self, index):
+        """Return the signal at index, or a list of signals for a slice."""
+        if isinstance(index, slice):
+            [start, stop, step] = index.indices(len(self))
+            if step != 1:
+                return self.view().tolist()[index]
+            return self.view(start, stop).tolist()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("trace index out of range")
+        if index < self.spilled:
+            return self.get_map()[index]
+        return self.tail[index - self.spilled]
+
+    def __iter__(self):
+        """Iterate over the signals one chunk at a time."""
+        length = len(self)
+        for start in range(0, length, len(self.tail)):
+            yield from self.view(start, min(start + len(self.tail), length))
+
+    def __eq__(self, other):
+        """Return True if other holds the same signals."""
+        try:
+            return len(other) == len(self) and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the length of the trace and the number spilled."""
+        return "".join(["SpillTrace(", str(len(self)), " cycles, ",
+                        str(self.spilled), " on disk)"])
+
+
+class RingTrace:
+
+    """Keep only the most recent cycles of a trace.
+
+    Signals are written round a bytearray of capacity bytes, so once it is
+    full each new cycle replaces the oldest. Indexing, slicing, iteration
+    and view() cover the retained cycles, oldest first, and first_cycle is
+    the number of cycles that have been dropped.
+
+    Parameters
+    ----------
+    signals: optional iterable of signals to start the trace with.
+    capacity: optional number of cycles to keep.
+    prefill: optional (signal, count) tuple to add before signals.
+
+    Public methods
+    --------------
+    append(self, signal): Adds a signal, dropping the oldest if full.
+
+    extend(self, signals): Adds signals to the end of the trace.
+
+    fill(self, signal, count): Adds count copies of a signal.
+
+    clear(self): Removes every signal from the trace.
+
+    view(self, start=0, stop=None): Returns a memoryview of a range of the
+                                    retained cycles.
+    """
+
+    def __init__(self, signals=(), capacity=1024, prefill=None):
+        """Initialise the ring buffer."""
+        self.buffer = bytearray(max(capacity, 1))
+        self.total = 0  # number of cycles ever appended
+        if prefill is not None:
+            self.fill(*prefill)
+        self.extend(signals)
+
+    @property
+    def first_cycle(self):
+        """Return the cycle of the oldest retained signal."""
+        return self.total - len(self)
+
+    def append(self, signal):
+        """Add a signal, dropping the oldest if the trace is full."""
+        self.buffer[self.total % len(self.buffer)] = signal
+        self.total += 1
+
+    def extend(self, signals):
+        """Add signals to the end of the trace."""
+        for signal in signals:
+            self.append(signal)
+
+    def fill(self, signal, count):
+        """Add count copies of a signal, writing at most one buffer's worth."""
+        if count <= 0:
+            return
+        kept = min(count, len(self.buffer))
+        self.total += count - kept  # cycles that would be dropped at once
+        for _ in range(kept):
+            self.append(signal)
+
+    def clear(self):
+        """Remove every signal from the trace."""
+        self.total = 0
+
+    def view(self, start=0, stop=None):
+        """Return a memoryview of the retained signals from start to stop.
+
+        The view is only copied if the range wraps round the buffer.
+        """
+        [start, stop, step] = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        capacity = len(self.buffer)
+        first = (self.first_cycle + start) % capacity
+        last = first + stop - start
+        if last <= capacity:
+            return memoryview(self.buffer)[first:last]
+        return memoryview(self.buffer[first:] +
+                          self.buffer[:last - capacity])
+
+    def __len__(self):
+        """Return the number of retained cycles."""
+        return min(self.total, len(self.buffer))
+
+    def __getitem__(self, index):
+        """Return the signal at index, or a list of signals for a slice."""
+        if isinstance(index, slice):
+            [start, stop, step] = index.indices(len(self))
+            if step != 1:
+                return self.view().tolist()[index]
+            return self.view(start, stop).tolist()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("trace index out of range")
+        return self.buffer[(self.first_cycle + index) % len(self.buffer)]
+
+    def __iter__(self):
+        """Iterate over the retained signals, oldest first."""
+        return iter(self.view())
+
+    def __eq__(self, other):
+        """Return True if other holds the same retained signals."""
+        try:
+            return len(other) == len(self) and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the retained signals."""
+        return "RingTrace(" + repr(self.view().tolist()) + ")"
+
+
+class TransitionIndex:
+
+    """Index the cycles at which monitored signals change.
+
+    The index is a Monitors listener, so it is extended as each cycle is
+    recorded. For every monitor it keeps sorted arrays of the cycles at
+    which the signal changed, the signal from each of those cycles on, and
+    the cycles of rising and falling edges. An edge is a change in the level
+    a signal is at or heading to, so RISING counts as HIGH and FALLING as
+    LOW. All queries are binary searches over these arrays.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+
+    Public methods
+    --------------
+    record_cycle(self, cycle, signals): Adds the signals of one cycle.
+
+    reset(self): Removes everything from the index.
+
+    add_trace(self, key, signal_list, first_cycle=0): Adds a recorded trace
+                                                      to the index.
+
+    value_at(self, key, cycle): Returns the signal of a monitor at a cycle.
+
+    get_changes(self, key, start=0, stop=None): Returns the cycles at which
+                                                a monitor changed.
+
+    first_edge(self, key, rising=True, start=0): Returns the first edge at
+                                                 or after a cycle.
+
+    count_edges(self, key, rising=True, start=0, stop=None): Returns the
+                                                number of edges in a range.
+
+    common_changes(self, keys, start=0, stop=None): Returns the cycles at
+                                                    which every monitor
+                                                    changed.
+    """
+
+    def __init__(self, devices):
+        """Initialise the empty index."""
+        self.devices = devices
+        self.levels = {devices.LOW: 0, devices.FALLING: 0, devices.HIGH: 1,
+                       devices.RISING: 1}
+        # Each of these stores {(device_id, output_id): array of cycles}
+        self.changes = {}
+        self.rising = {}
+        self.falling = {}
+        self.values = {}  # {(device_id, output_id): signal after each change}
+
+    def record_cycle(self, cycle, signals):
+        """Add the signals of one cycle to the index."""
+        for key, signal in signals.items():
+            values = self.values.get(key)
+            if values is None:
+                values = self.values[key] = array.array("b")
+                self.changes[key] = array.array("q")
+                self.rising[key] = array.array("q")
+                self.falling[key] = array.array("q")
+            elif values[-1] == signal:
+                continue
+            if values:
+                old_level = self.levels.get(values[-1])
+                new_level = self.levels.get(signal)
+                if old_level == 0 and new_level == 1:
+                    self.rising[key].append(cycle)
+                elif old_level == 1 and new_level == 0:
+                    self.falling[key].append(cycle)
+            values.append(signal)
+            self.changes[key].append(cycle)
+
+    def reset(self):
+        """Remove everything from the index."""
+        self.changes = {}
+        self.rising = {}
+        self.falling = {}
+        self.values = {}
+
+    def add_trace(self, key, signal_list, first_cycle=0):
+        """Add a trace recorded before the index was made.
+
+        Cycle first_cycle + i of the trace is taken to be signal_list[i],
+        so a RING trace keeps the cycle numbers it was recorded at.
+        """
+        for cycle, signal in enumerate(signal_list, first_cycle):
+            self.record_cycle(cycle, {key: signal})
+
+    def value_at(self, key, cycle):
+        """Return the signal of a monitor at the specified cycle.
+
+        Return None if the monitor was not recorded at that cycle.
+        """
+        changes = self.changes.get(key)
+        if changes is None:
+            return None
+        change = bisect.bisect_right(changes, cycle) - 1
+        if change < 0:
+            return None
+        return self.values[key][change]
+
+    def get_changes(self, key, start=0, stop=None):
+        """Return the cycles from start to stop at which a monitor changed.
+
+        The first recorded cycle of a monitor counts as a change.
+        """
+        changes = self.changes.get(key, ())
+        first = bisect.bisect_left(changes, start)
+        if stop is None:
+            return list(changes[first:])
+        return list(changes[first:bisect.bisect_left(changes, stop)])
+
+    def first_edge(self, key, rising=True, start=0):
+        """Return the first rising or falling edge at or after start.
+
+        Return None if there is no such edge.
+        """
+        edges = self.rising.get(key, ()) if rising else \
+            self.falling.get(key, ())
+        edge = bisect.bisect_left(edges, start)
+        if edge == len(edges):
+            return None
+        return edges[edge]
+
+    def count_edges(self, key, rising=True, start=0, stop=None):
+        """Return the number of rising or falling edges from start to stop."""
+        edges = self.rising.get(key, ()) if rising else \
+            self.falling.get(key, ())
+        if stop is None:
+            stop_edge = len(edges)
+        else:
+            stop_edge = bisect.bisect_left(edges, stop)
+        return max(0, stop_edge - bisect.bisect_left(edges, start))
+
+    def common_changes(self, keys, start=0, stop=None):
+        """Return the cycles from start to stop at which every monitor changed.
+
+        The monitor with the fewest changes is searched for in the others.
+        """
+        change_lists = sorted((self.get_changes(key, start, stop)
+                               for key in keys), key=len)
+        if not change_lists:
+            return []
+        common = []
+        for cycle in change_lists[0]:
+            for changes in change_lists[1:]:
+                change = bisect.bisect_left(changes, cycle)
+                if change == len(changes) or changes[change] != cycle:
+                    break
+            else:
+                common.append(cycle)
+        return common
+
+
+class DetailPyramid:
+
+    """Keep min/max summaries of monitored signals at coarser resolutions.
+
+    The pyramid is a Monitors listener. Level j of a monitor's pyramid has
+    one bucket per 2**(j + 1) cycles, holding the lowest and highest level
+    the signal was at in those cycles (RISING counts as HIGH, FALLING as
+    LOW), so a bucket with a low of 0 and a high of 1 toggled. BLANK cycles
+    are left out, and a bucket with only BLANK cycles has a low of 1 and a
+    high of 0. A new level is added each time the number of cycles
+    doubles.
+
+    Each new cycle updates its level 0 bucket and then the parent buckets
+    above it, stopping at the first one it does not change. A bucket that
+    has toggled never changes again, so the work per cycle is constant on
+    average. A renderer asks for a number of buckets about equal to its
+    width in pixels and gets the level whose buckets fit it.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+
+    Public methods
+    --------------
+    record_cycle(self, cycle, signals): Adds the signals of one cycle.
+
+    reset(self): Removes every summary.
+
+    add_trace(self, key, signal_list): Adds a recorded trace.
+
+    add_sample(self, key, signal): Adds the next cycle of one monitor.
+
+    get_buckets(self, key, start, stop, count): Returns about count
+                                                (low, high, start, stop)
+                                                buckets for a range.
+    """
+
+    def __init__(self, devices):
+        """Initialise the empty pyramid."""
+        self.levels = {devices.LOW: 0, devices.FALLING: 0, devices.HIGH: 1,
+                       devices.RISING: 1}
+        self.blank = devices.BLANK
+        # Each of these stores {(device_id, output_id): [bytearray per level]}
+        self.minima = {}
+        self.maxima = {}
+        self.lengths = {}  # {(device_id, output_id): number of cycles}
+
+    def record_cycle(self, cycle, signals):
+        """Add the signals of one cycle.
+
+        Monitors first seen after cycle 0 are padded with BLANK cycles.
+        """
+        for key, signal in signals.items():
+            if key not in self.lengths:
+                for _ in range(cycle):
+                    self.add_sample(key, self.blank)
+            self.add_sample(key, signal)
+
+    def reset(self):
+        """Remove every summary."""
+        self.minima = {}
+        self.maxima = {}
+        self.lengths = {}
+
+    def add_trace(self, key, signal_list):
+        """Add a trace recorded before the pyramid was made."""
+        for signal in signal_list:
+            self.add_sample(key, signal)
+
+    def add_sample(self, key, signal):
+        """Add the next cycle of one monitor and update its buckets."""
+        position = self.lengths.get(key, 0)
+        self.lengths[key] = position + 1
+        minima = self.minima.setdefault(key, [])
+        maxima = self.maxima.setdefault(key, [])
+        level = self.levels.get(signal)
+        if level is None:  # BLANK
+            [low, high] = [1, 0]
+        else:
+            [low, high] = [level, level]
+
+        for j in range(len(minima) + 1):
+            if j == len(minima):
+                # Add a level once the one below has two buckets
+                if j == 0:
+                    minima.append(bytearray([low]))
+                    maxima.append(bytearray([high]))
+                elif position >> j:
+                    below = range(0, len(minima[j - 1]), 2)
+                    minima.append(bytearray(min(minima[j - 1][b:b + 2])
+                                            for b in below))
+                    maxima.append(bytearray(max(maxima[j - 1][b:b + 2])
+                                            for b in below))
+                return
+            bucket = position >> (j + 1)
+            if bucket == len(minima[j]):
+                minima[j].append(low)
+                maxima[j].append(high)
+            else:
+                new_low = min(minima[j][bucket], low)
+                new_high = max(maxima[j][bucket], high)
+                if (new_low == minima[j][bucket] and
+                        new_high == maxima[j][bucket]):
+                    return
+                minima[j][bucket] = new_low
+                maxima[j][bucket] = new_high
+            [low, high] = [minima[j][bucket], maxima[j][bucket]]
+
+    def get_buckets(self, key, start, stop, count):
+        """Return about count buckets covering the cycles from start to stop.
+
+        Each bucket is a (low, high, start, stop) tuple. The level used is
+        the finest one with no more than count buckets in the range, or the
+        coarsest level there is. Return None if the monitor is not in the
+        pyramid or the range fits in count single cycles.
+        """
+        minima = self.minima.get(key)
+        length = self.lengths.get(key, 0)
+        stop = min(stop, length)
+        if not minima or stop - start <= count:
+            return None
+        j = 0
+        while j + 1 < len(minima) and (stop - start) >> (j + 1) > count:
+            j += 1
+        size = 1 << (j + 1)
+        buckets = []
+        for bucket in range(start // size, (stop - 1) // size + 1):
+            buckets.append((minima[j][bucket], self.maxima[key][j][bucket],
+                            max(bucket * size, start),
+                            min((bucket + 1) * size, stop)))
+        return buckets
+
+
+class SignalStatistics:
+
+    """Keep running activity statistics of monitored signals.
+
+    The statistics are a Monitors listener, updated in constant time as
+    each cycle is recorded, so they never need a pass over the traces. As
+    in TransitionIndex, RISING counts as HIGH and FALLING as LOW, and BLANK
+    cycles are not at either level. A glitch is a level that lasted a
+    single cycle between two edges. Every recorded cycle is counted, so
+    while a Monitors trigger is set the statistics include cycles that
+    are not kept in the traces.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+
+    Public methods
+    --------------
+    record_cycle(self, cycle, signals): Adds the signals of one cycle.
+
+    reset(self): Clears the statistics of every monitor.
+
+    add_trace(self, key, signal_list, first_cycle=0): Adds a recorded
+                                                      trace to the
+                                                      statistics.
+
+    get_statistics(self, key): Returns the statistics of a monitor.
+    """
+
+    def __init__(self, devices):
+        """Initialise the empty statistics."""
+        self.devices = devices
+        self.levels = {devices.LOW: 0, devices.FALLING: 0, devices.HIGH: 1,
+                       devices.RISING: 1}
+        # counts stores {(device_id, output_id): {statistic: value}}
+        self.counts = {}
+        self.last_levels = {}  # {(device_id, output_id): level or None}
+        self.run_lengths = {}  # {(device_id, output_id): current run}
+
+    def record_cycle(self, cycle, signals):
+        """Add the signals of one cycle to the statistics."""
+        for key, signal in signals.items():
+            counts = self.counts.get(key)
+            if counts is None:
+                counts = self.counts[key] = {
+                    "rising": 0, "falling": 0, "high": 0, "low": 0,
+                    "glitches": 0, "longest_run": 0, "last_change": None}
+                self.last_levels[key] = None
+                self.run_lengths[key] = 0
+            level = self.levels.get(signal)
+            last_level = self.last_levels[key]
+            if level is None:
+                self.run_lengths[key] = 0
+            elif level == last_level:
+                self.run_lengths[key] += 1
+            else:
+                if last_level is not None:
+                    counts["rising" if level else "falling"] += 1
+                    if (self.run_lengths[key] == 1 and
+                            counts["last_change"] == cycle - 1):
+                        counts["glitches"] += 1
+                    counts["last_change"] = cycle
+                self.run_lengths[key] = 1
+            if level is not None:
+                counts["high" if level else "low"] += 1
+                if self.run_lengths[key] > counts["longest_run"]:
+                    counts["longest_run"] = self.run_lengths[key]
+            self.last_levels[key] = level
+
+    def reset(self):
+        """Clear the statistics of every monitor."""
+        self.counts = {}
+        self.last_levels = {}
+        self.run_lengths = {}
+
+    def add_trace(self, key, signal_list, first_cycle=0):
+        """Add a trace recorded before the statistics were made.
+
+        Cycle first_cycle + i of the trace is taken to be signal_list[i],
+        so a RING trace keeps the cycle numbers it was recorded at.
+        """
+        for cycle, signal in enumerate(signal_list, first_cycle):
+            self.record_cycle(cycle, {key: signal})
+
+    def get_statistics(self, key):
+        """Return a dictionary of the statistics of a monitor.
+
+        The statistics are the number of rising and falling edges, of
+        cycles spent HIGH and LOW and of glitches, the longest number of
+        cycles at one level, and the cycle of the last edge, or None if
+        there has not been one. Return None if the monitor has no recorded
+        cycles.
+        """
+        counts = self.counts.get(key)
+        if counts is None:
+            return None
+        return dict(counts)
@@ -0,0 +1,230 @@
+"""Capture the cycles around trigger events.
+
+Used in the Logic Simulator project to keep only the cycles around an event
+of interest in very long runs, instead of the whole signal traces.
+
+Classes
+-------
+Trigger - a set of conditions on the network signals.
+TriggerCapture - captures the monitored signals around each trigger.
+"""
+import collections
+
+from traces import RingTrace
+
+
+class Trigger:
+
+    """Hold a set of conditions on the network signals.
+
+    The trigger fires in a cycle when all of its conditions hold. A
+    condition is an edge on an output signal, a combination of output
+    signal levels, or a range of cycles. Conditions read the network
+    directly, so the signals do not need to be monitored. A trigger with
+    no conditions fires in every cycle.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+
+    Public methods
+    --------------
+    add_edge(self, device_id, output_id, direction): Adds a condition on an
+                                                     edge of a signal.
+
+    add_values(self, values): Adds a condition on the levels of signals.
+
+    add_cycles(self, start, stop=None): Adds a condition on the cycle.
+
+    check(self, cycle): Returns True if every condition holds.
+
+    reset(self): Forgets the previous levels of the edge conditions.
+    """
+
+    def __init__(self, devices, network):
+        """Initialise the list of conditions."""
+        self.devices = devices
+        self.network = network
+
+        self.condition_types = [self.EDGE, self.VALUES,
+                                self.CYCLES] = range(3)
+        # conditions stores [condition_type, arguments] lists
+        self.conditions = []
+        # last_levels stores {(device_id, output_id): level} for the edge
+        # conditions, from the previous check
+        self.last_levels = {}
+
+    def get_level(self, device_id, output_id):
+        """Return the level a signal is at or heading to.
+
+        Return None if the signal is BLANK or does not exist.
+        """
+        signal = self.network.get_output_signal(device_id, output_id)
+        if signal in [self.devices.HIGH, self.devices.RISING]:
+            return self.devices.HIGH
+        elif signal in [self.devices.LOW, self.devices.FALLING]:
+            return self.devices.LOW
+        return None
+
+    def add_edge(self, device_id, output_id, direction):
+        """Add a condition on an edge of the specified output signal.
+
+        direction is RISING or FALLING. The condition holds in a cycle if
+        the signal level changed in that direction since the previous
+        cycle. Return True if successful.
+        """
+        if direction not in [self.devices.RISING, self.devices.FALLING]:
+            return False
+        if self.network.get_output_signal(device_id, output_id) is None:
+            return False
+        self.conditions.append([self.EDGE, (device_id, output_id,
+                                            direction)])
+        return True
+
+    def add_values(self, values):
+        """Add a condition on the levels of the specified output signals.
+
+        values is a {(device_id, output_id): level} dictionary with LOW or
+        HIGH levels. The condition holds if every signal is at its level.
+        Return True if successful.
+        """
+        for (device_id, output_id), level in values.items():
+            if level not in [self.devices.LOW, self.devices.HIGH]:
+                return False
+            if self.network.get_output_signal(device_id, output_id) is None:
+                return False
+        self.conditions.append([self.VALUES, list(values.items())])
+        return True
+
+    def add_cycles(self, start, stop=None):
+        """Add a condition that holds from cycle start up to cycle stop.
+
+        stop is not included, and None means there is no end. Cycles are
+        counted from the last reset of the monitors. Return True if
+        successful.
+        """
+        if start < 0 or (stop is not None and stop <= start):
+            return False
+        self.conditions.append([self.CYCLES, (start, stop)])
+        return True
+
+    def check(self, cycle):
+        """Return True if every condition holds in the specified cycle.
+
+        This function is called at every simulation cycle, as the edge
+        conditions compare the levels with the previous check.
+        """
+        fired = True
+        for condition_type, arguments in self.conditions:
+            if condition_type == self.EDGE:
+                (device_id, output_id, direction) = arguments
+                level = self.get_level(device_id, output_id)
+                last_level = self.last_levels.get((device_id, output_id))
+                self.last_levels[(device_id, output_id)] = level
+                if direction == self.devices.RISING:
+                    edge = [last_level, level] == [self.devices.LOW,
+                                                   self.devices.HIGH]
+                else:
+                    edge = [last_level, level] == [self.devices.HIGH,
+                                                   self.devices.LOW]
+                fired = fired and edge
+            elif not fired:
+                continue  # only the edge conditions need checking
+            elif condition_type == self.VALUES:
+                for (device_id, output_id), level in arguments:
+                    if self.get_level(device_id, output_id) != level:
+                        fired = False
+                        break
+            else:
+                (start, stop) = arguments
+                fired = cycle >= start and (stop is None or cycle < stop)
+        return fired
+
+    def reset(self):
+        """Forget the previous levels of the edge conditions."""
+        self.last_levels = {}
+
+
+class TriggerCapture:
+
+    """Capture the monitored signals around each trigger.
+
+    The capture is a Monitors listener. While it is armed it keeps only
+    the last pre cycles of each monitored signal in a ring buffer. When
+    the trigger fires, it keeps the trigger cycle and the post cycles
+    after it, then adds the window to captures. If rearm is True it is
+    then armed again for the next trigger, otherwise it stops recording.
+    Triggers that fire during a window are ignored.
+
+    Each capture is a (trigger_cycle, {(device_id, output_id): signals})
+    tuple, where signals is the list of pre + 1 + post signals around the
+    trigger, or fewer if the trigger fired within pre cycles of the start.
+
+    Parameters
+    ----------
+    trigger: instance of the Trigger() class.
+    pre: number of cycles kept before the trigger.
+    post: number of cycles kept after the trigger.
+    rearm: True to capture every trigger rather than only the first.
+
+    Public methods
+    --------------
+    record_cycle(self, cycle, signals): Records the signals of a cycle.
+
+    reset(self): Clears the captures and arms the capture again.
+    """
+
+    def __init__(self, trigger, pre=16, post=16, rearm=False):
+        """Initialise the ring buffers and the list of captures."""
+        self.trigger = trigger
+        self.pre = pre
+        self.post = post
+        self.rearm = rearm
+
+        self.states = [self.ARMED, self.CAPTURING, self.DONE] = range(3)
+        self.state = self.ARMED
+        # rings stores {(device_id, output_id): RingTrace} with the pre
+        # cycles before, and including, the current cycle
+        self.rings = {}
+        self.captures = []
+        self.window = None  # the capture being filled
+        self.remaining = 0  # cycles left in the window
+
+    def record_cycle(self, cycle, signals):
+        """Record the monitored signals of a cycle."""
+        if self.state == self.DONE:
+            return
+        fired = self.trigger.check(cycle)
+        if self.state == self.CAPTURING:
+            for key, signal in signals.items():
+                if key in self.window[1]:
+                    self.window[1][key].append(signal)
+            self.remaining -= 1
+        else:
+            for key, signal in signals.items():
+                ring = self.rings.get(key)
+                if ring is None:
+                    ring = self.rings[key] = RingTrace(capacity=self.pre + 1)
+                ring.append(signal)
+            if not fired:
+                return
+            self.window = (cycle, collections.OrderedDict(
+                (key, list(self.rings[key])) for key in signals))
+            self.remaining = self.post
+            self.state = self.CAPTURING
+        if self.remaining == 0:
+            self.captures.append(self.window)
+            self.window = None
+            for ring in self.rings.values():
+                ring.clear()
+            self.state = self.ARMED if self.rearm else self.DONE
+
+    def reset(self):
+        """Clear the captures and arm the capture again."""
+        self.trigger.reset()
+        self.state = self.ARMED
+        self.rings = {}
+        self.captures = []
+        self.window = None
+        self.remaining = 0
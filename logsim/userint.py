@@ -7,6 +7,9 @@ Classes:
 --------
 UserInterface - reads and parses user commands.
 """
+from faults import FaultSimulator
+from sweep import ColdStartSweep
+from vcd import VcdWriter
 
 
 class UserInterface:
@@ -64,6 +67,20 @@ class UserInterface:
     run_command(self): Runs the simulation from scratch.
 
     continue_command(self): Continues a previously run simulation.
+
+    fault_command(self): Runs a stuck-at fault simulation from scratch.
+
+    sweep_command(self): Runs many seeded cold starts and displays the
+                         monitor statistics.
+
+    dump_command(self): Starts or stops writing the monitored signals to a
+                        VCD file.
+
+    edge_command(self): Displays the edges of a monitor, using the
+                        transition index.
+
+    activity_command(self): Displays the activity statistics of every
+                            monitor.
     """
 
     def __init__(self, names, devices, network, monitors):
@@ -79,6 +96,8 @@ class UserInterface:
         self.line = ""  # current string entered by the user
         self.cursor = 0  # cursor position
 
+        self.vcd_writer = None  # writes monitored signals to a VCD file
+
     def command_interface(self):
         """Read the command entered and call the corresponding function."""
         print("Logic Simulator: interactive command line user interface.\n"
@@ -98,10 +117,23 @@ class UserInterface:
                 self.run_command()
             elif command == "c":
                 self.continue_command()
+            elif command == "f":
+                self.fault_command()
+            elif command == "w":
+                self.sweep_command()
+            elif command == "d":
+                self.dump_command()
+            elif command == "e":
+                self.edge_command()
+            elif command == "a":
+                self.activity_command()
             else:
                 print("Invalid command. Enter 'h' for help.")
             self.get_line()  # get the user entry
             command = self.read_command()  # read the first character
+        if self.vcd_writer is not None:
+            self.monitors.remove_listener(self.vcd_writer)
+            self.vcd_writer.close()
 
     def get_line(self):
         """Print prompt for the user and update the user entry."""
@@ -207,6 +239,12 @@ class UserInterface:
         print("s X N     - set switch X to N (0 or 1)")
         print("m X       - set a monitor on signal X")
         print("z X       - zap the monitor on signal X")
+        print("f N       - fault simulate for N cycles from a cold start")
+        print("w K N     - sweep K seeded cold starts of N cycles each")
+        print("d F       - write monitored signals to VCD file F")
+        print("d         - stop writing the VCD file")
+        print("e X [A B] - show the edges of monitor X [from cycle A to B]")
+        print("a         - show the activity statistics of every monitor")
         print("h         - help (this command)")
         print("q         - quit the program")
 
@@ -248,6 +286,7 @@ class UserInterface:
 
         Return True if successful.
         """
+        self.monitors.reserve(cycles)
         for _ in range(cycles):
             if self.network.execute_network():
                 self.monitors.record_signals()
@@ -279,3 +318,127 @@ class UserInterface:
                 self.cycles_completed += cycles
                 print(" ".join(["Continuing for", str(cycles), "cycles.",
                                 "Total:", str(self.cycles_completed)]))
+
+    def fault_command(self):
+        """Run a stuck-at fault simulation from scratch.
+
+        Every stuck-at fault is simulated with the current switch settings,
+        and the faults not detected at the monitors are listed. As with a
+        run, the network is cold started, so the monitors are reset and
+        there is nothing to continue afterwards.
+        """
+        cycles = self.read_number(0, None)
+        if cycles is not None:  # if the number of cycles provided is valid
+            self.cycles_completed = 0
+            self.monitors.reset_monitors()
+            print("".join(["Fault simulating for ", str(cycles), " cycles"]))
+            self.devices.cold_startup()
+            simulator = FaultSimulator(self.names, self.devices,
+                                       self.network, self.monitors)
+            results = simulator.simulate({}, cycles)
+            if results is None:
+                print("Error! Network cannot be fault simulated.")
+                return
+            undetected = [fault for fault, cycle in results.items()
+                          if cycle is None]
+            print(" ".join(["Detected", str(len(results) - len(undetected)),
+                            "of", str(len(results)), "faults."]))
+            for fault in undetected:
+                print("Undetected: " + simulator.get_fault_name(fault))
+
+    def sweep_command(self):
+        """Run many seeded cold starts and display the monitor statistics."""
+        runs = self.read_number(1, None)
+        if runs is not None:
+            cycles = self.read_number(0, None)
+            if cycles is not None:
+                print(" ".join(["Sweeping", str(runs), "cold starts of",
+                                str(cycles), "cycles"]))
+                sweep = ColdStartSweep(self.names, self.devices,
+                                       self.network, self.monitors)
+                sweep.run(runs, cycles)
+                sweep.display_statistics()
+
+    def dump_command(self):
+        """Start or stop writing the monitored signals to a VCD file.
+
+        A file path starts writing to that file, closing any earlier one,
+        and no path stops writing.
+        """
+        self.skip_spaces()
+        path = (self.character + self.line[self.cursor:]).strip()
+        if self.vcd_writer is not None:
+            self.monitors.remove_listener(self.vcd_writer)
+            self.vcd_writer.close()
+            print("Closed VCD file " + self.vcd_writer.path)
+            self.vcd_writer = None
+        if path:
+            try:
+                self.vcd_writer = VcdWriter(self.names, self.devices,
+                                            self.monitors, path)
+            except OSError:
+                print("Error! Could not open " + path)
+                return
+            self.monitors.add_listener(self.vcd_writer)
+            print("Writing monitored signals to " + path)
+
+    def edge_command(self):
+        """Display the edges of a monitor, using the transition index.
+
+        The edges are counted over every recorded cycle, or from cycle A up
+        to but not including cycle B if they are given.
+        """
+        monitor = self.read_signal_name()
+        if monitor is None:
+            return
+        key = tuple(monitor)
+        if key not in self.monitors.monitors_dictionary:
+            print("Error! Not a monitored signal.")
+            return
+        start = 0
+        stop = None
+        if self.character.strip() or self.line[self.cursor:].strip():
+            start = self.read_number(0, None)
+            if start is None:
+                return
+            stop = self.read_number(start, None)
+            if stop is None:
+                return
+
+        index = self.monitors.index_transitions()
+        name = self.devices.get_signal_name(*key)
+        print(" ".join([name + ":", str(index.count_edges(key, True, start,
+                                                          stop)),
+                        "rising and", str(index.count_edges(key, False,
+                                                            start, stop)),
+                        "falling edges"]))
+        for rising, edge_name in [(True, "rising"), (False, "falling")]:
+            edge = index.first_edge(key, rising, start)
+            if edge is not None and (stop is None or edge < stop):
+                print(" ".join(["First", edge_name, "edge at cycle",
+                                str(edge)]))
+
+    def activity_command(self):
+        """Display the activity statistics of every monitor."""
+        statistics = self.monitors.get_statistics()
+        if not statistics:
+            print("Error! No signals are being monitored.")
+            return
+        margin = self.monitors.get_margin()
+        for key, counts in statistics.items():
+            name = self.devices.get_signal_name(*key)
+            print(name + (margin - len(name)) * " ", end=": ")
+            if counts is None:
+                print("no cycles recorded")
+                continue
+            if counts["last_change"] is None:
+                last_change = "never"
+            else:
+                last_change = str(counts["last_change"])
+            print(", ".join([str(counts["rising"]) + " rising",
+                             str(counts["falling"]) + " falling",
+                             str(counts["high"]) + " HIGH",
+                             str(counts["low"]) + " LOW",
+                             str(counts["glitches"]) + " glitches",
+                             "longest run " + str(counts["longest_run"]),
+                             "last change " + last_change]))
@@ -0,0 +1,116 @@
+"""Write monitored signals to a Value Change Dump (VCD) file.
+
+Used in the Logic Simulator project to export signal traces to standard
+waveform viewers while the simulation runs.
+
+Classes
+-------
+VcdWriter - streams the changes of monitored signals to a VCD file.
+"""
+import time
+
+
+class VcdWriter:
+
+    """Stream the changes of monitored signals to a VCD file.
+
+    The writer is a Monitors listener: Monitors.record_signals passes it
+    the monitored signals of every cycle, and only the signals that changed
+    since the previous cycle are written. Nothing is kept apart from the
+    last value of each signal, so the trace is never held in memory. Each
+    simulation cycle is one time unit. Writes go through a large file
+    buffer.
+
+    The variables are declared from the monitors present at the first
+    recorded cycle. Monitors added later are not written. VCD time must
+    increase, so the time keeps counting when the monitors are reset.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    monitors: instance of the monitors.Monitors() class.
+    path: path of the VCD file to write.
+
+    Public methods
+    --------------
+    write_header(self, keys): Writes the declarations for the monitors.
+
+    record_cycle(self, cycle, signals): Writes the signals that changed.
+
+    reset(self): Called when the monitors are reset.
+
+    close(self): Writes the final time and closes the file.
+    """
+
+    def __init__(self, names, devices, monitors, path):
+        """Open the VCD file."""
+        self.names = names
+        self.devices = devices
+        self.monitors = monitors
+        self.path = path
+        self.file = open(path, "w", buffering=1 << 16)
+
+        self.identifiers = None  # {(device_id, output_id): identifier code}
+        self.last_values = {}  # {(device_id, output_id): last value written}
+        self.time = 0  # VCD time of the next cycle
+
+        # VCD value of each signal: edges are written as the level they
+        # are heading to, and BLANK as unknown
+        self.values = {devices.LOW: "0", devices.HIGH: "1",
+                       devices.RISING: "1", devices.FALLING: "0",
+                       devices.BLANK: "x"}
+
+    def get_identifier(self, number):
+        """Return the VCD identifier code for the specified number.
+
+        Identifier codes are written in base 94 using the printable ASCII
+        characters from "!" to "~".
+        """
+        identifier = ""
+        while True:
+            identifier += chr(33 + number % 94)
+            number //= 94
+            if number == 0:
+                return identifier
+
+    def write_header(self, keys):
+        """Write the declarations for the specified monitors."""
+        self.identifiers = {}
+        lines = ["$date " + time.asctime() + " $end",
+                 "$version Logic Simulator $end",
+                 "$timescale 1 ns $end",
+                 "$scope module logsim $end"]
+        for number, (device_id, output_id) in enumerate(keys):
+            identifier = self.get_identifier(number)
+            self.identifiers[(device_id, output_id)] = identifier
+            name = self.devices.get_signal_name(device_id, output_id)
+            lines.append(" ".join(["$var wire 1", identifier, name, "$end"]))
+        lines.extend(["$upscope $end", "$enddefinitions $end"])
+        self.file.write("\n".join(lines) + "\n")
+
+    def record_cycle(self, cycle, signals):
+        """Write the signals that changed since the previous cycle."""
+        if self.identifiers is None:
+            self.write_header(list(signals))
+        changes = []
+        for key, signal in signals.items():
+            value = self.values[signal]
+            if self.last_values.get(key) != value and key in self.identifiers:
+                self.last_values[key] = value
+                changes.append(value + self.identifiers[key])
+        if changes:
+            if self.time == 0:  # initial values
+                changes = ["$dumpvars"] + changes + ["$end"]
+            self.file.write("#" + str(self.time) + "\n" +
+                            "\n".join(changes) + "\n")
+        self.time += 1
+
+    def reset(self):
+        """Keep counting time when the monitors are reset."""
+
+    def close(self):
+        """Write the final time and close the file."""
+        if not self.file.closed:
+            self.file.write("#" + str(self.time) + "\n")
+            self.file.close()
@@ -0,0 +1,266 @@
+"""Execute a levelized network with NumPy array operations.
+
+Used in the Logic Simulator project as an optional simulation engine. It
+needs NumPy, so it is only imported when the vectorized engine is selected.
+
+Classes
+-------
+VectorEngine - executes the network using flat NumPy arrays.
+"""
+import numpy as np
+
+
+class VectorEngine:
+
+    """Execute the network using flat NumPy arrays.
+
+    Every output port in the network is given a slot in a signal vector.
+    The gates of each level of the compiled schedule are stored as an input
+    index matrix padded to Devices.max_gate_inputs columns, with masks for
+    the padding and for XOR gates, so one level is evaluated in a few array
+    operations. D-types, switches, clocks and signal generators are also
+    executed as arrays. The signal vector is copied into the Device objects
+    at the end of every cycle, so the rest of the simulator is unaffected.
+
+    Signals follow the same rules as Network.update_signal and
+    Network.execute_compiled_gate. The levelized engine executes D-types
+    one at a time, so a D-type sees the new outputs of any D-type executed
+    before it in the same iteration. To match it, D-types are split into
+    stages of consecutive D-types in execution order, and a new stage is
+    started at any D-type with an input connected directly to the output
+    of an earlier D-type in the current stage. Each stage is executed as
+    one array operation, so a D-type still sees the old outputs of any
+    D-type executed after it.
+
+    Parameters
+    ----------
+    network: instance of the network.Network() class, compiled with
+             compile_network().
+
+    Public methods
+    --------------
+    load_signals(self): Copies all signals and D-type memories from the
+                        Device objects into the arrays.
+
+    load_sources(self): Copies switch states and clock and signal generator
+                        signals from the Device objects into the arrays.
+
+    store_signals(self): Copies changed signals and D-type memories from the
+                         arrays back to the Device objects.
+
+    execute_network(self): Executes all the devices in the network for one
+                           simulation cycle.
+    """
+
+    def __init__(self, network):
+        """Build the signal vector, index matrices and lookup tables."""
+        self.network = network
+        self.devices = network.devices
+        devices = self.devices
+        LOW, HIGH = devices.LOW, devices.HIGH
+        RISING, FALLING = devices.RISING, devices.FALLING
+
+        # The signal vector has one slot per (device, output_id)
+        self.slots = []
+        slot_index = {}
+        for device in devices.devices_list:
+            for output_id in device.outputs:
+                slot_index[(device.device_id, output_id)] = len(self.slots)
+                self.slots.append((device, output_id))
+        self.signals = np.zeros(len(self.slots), dtype=np.int8)
+
+        # Lookup tables indexed by signal value. update_table[signal, target]
+        # is Network.update_signal(signal, target), or -1 if it fails.
+        self.update_table = np.full((len(devices.signal_types), 2), -1,
+                                    dtype=np.int8)
+        self.update_table[[LOW, FALLING], LOW] = LOW
+        self.update_table[[LOW, FALLING], HIGH] = RISING
+        self.update_table[[HIGH, RISING], LOW] = FALLING
+        self.update_table[[HIGH, RISING], HIGH] = HIGH
+        # The level a signal is heading to, as read by compiled gates
+        self.target_level = np.array([LOW, HIGH, HIGH, LOW, LOW],
+                                     dtype=np.int8)
+        # The level a D-type DATA input is captured as, or -1 for BLANK
+        self.data_level = np.array([LOW, HIGH, LOW, HIGH, -1], dtype=np.int8)
+
+        def slots_of(connected_outputs):
+            return np.array([slot_index[connected_output]
+                             for connected_output in connected_outputs],
+                            dtype=np.intp)
+
+        self.switch_devices = [devices.get_device(device_id) for device_id
+                               in devices.find_devices(devices.SWITCH)]
+        self.switch_slots = slots_of((device.device_id, None)
+                                     for device in self.switch_devices)
+
+        self.timed_devices = [devices.get_device(device_id) for device_id
+                              in devices.find_devices(devices.CLOCK) +
+                              devices.find_devices(devices.SIGGEN)]
+        self.timed_slots = slots_of((device.device_id, None)
+                                    for device in self.timed_devices)
+
+        self.dtype_devices = [devices.get_device(device_id) for device_id
+                              in devices.find_devices(devices.D_TYPE)]
+        self.dtype_memory = np.zeros(len(self.dtype_devices), dtype=np.int8)
+        self.q_slots = slots_of((device.device_id, devices.Q_ID)
+                                for device in self.dtype_devices)
+        self.qbar_slots = slots_of((device.device_id, devices.QBAR_ID)
+                                   for device in self.dtype_devices)
+        [self.clk_slots, self.set_slots, self.clear_slots,
+         self.data_slots] = [slots_of(device.inputs[input_id]
+                                      for device in self.dtype_devices)
+                             for input_id in devices.dtype_input_ids]
+
+        # One (indices, CLK, SET, CLEAR, DATA, Q and QBAR slots) tuple per
+        # stage of D-types, in the order execute_sources runs them
+        dtype_index = {device.device_id: index
+                       for index, device in enumerate(self.dtype_devices)}
+        stages = []
+        stage = 0
+        stage_start = 0
+        for index, device in enumerate(self.dtype_devices):
+            for input_id in devices.dtype_input_ids:
+                (source_id, output_id) = device.inputs[input_id]
+                source_index = dtype_index.get(source_id)
+                if (source_index is not None
+                        and stage_start <= source_index < index):
+                    stage += 1
+                    stage_start = index
+                    break
+            stages.append(stage)
+        self.dtype_stages = []
+        for stage in range(max(stages, default=-1) + 1):
+            indices = np.flatnonzero(np.array(stages) == stage)
+            self.dtype_stages.append(
+                (indices, self.clk_slots[indices], self.set_slots[indices],
+                 self.clear_slots[indices], self.data_slots[indices],
+                 self.q_slots[indices], self.qbar_slots[indices]))
+
+        # One (output slots, input matrix, padding mask, x, y, XOR mask)
+        # tuple per level of the compiled schedule
+        self.gate_levels = []
+        width = devices.max_gate_inputs
+        for level in network.gate_levels:
+            output_slots = slots_of((device.device_id, None)
+                                    for (device, x, y, sources) in level)
+            input_matrix = np.zeros((len(level), width), dtype=np.intp)
+            padding = np.ones((len(level), width), dtype=bool)
+            x_levels = np.zeros(len(level), dtype=np.int8)
+            y_levels = np.zeros(len(level), dtype=np.int8)
+            xor_mask = np.zeros(len(level), dtype=bool)
+            for row, (device, x, y, sources) in enumerate(level):
+                for column, input_id in enumerate(device.inputs):
+                    input_matrix[row, column] = slot_index[
+                        device.inputs[input_id]]
+                    padding[row, column] = False
+                if x is None:
+                    xor_mask[row] = True
+                else:
+                    x_levels[row] = x
+                    y_levels[row] = y
+            self.gate_levels.append((output_slots, input_matrix, padding,
+                                     x_levels[:, np.newaxis], y_levels,
+                                     xor_mask))
+
+        self.synchronised = False  # True if the arrays match the devices
+        self.startup_count = None
+
+    def load_signals(self):
+        """Copy all signals and D-type memories from the devices."""
+        self.signals[:] = [device.outputs[output_id]
+                           for device, output_id in self.slots]
+        self.dtype_memory[:] = [device.dtype_memory
+                                for device in self.dtype_devices]
+        self.startup_count = self.devices.startup_count
+        self.synchronised = True
+
+    def load_sources(self):
+        """Copy switch states and clock and signal generator signals.
+
+        Return the array of switch states.
+        """
+        if (not self.synchronised or
+                self.startup_count != self.devices.startup_count):
+            self.load_signals()
+        self.signals[self.timed_slots] = [device.outputs[None]
+                                          for device in self.timed_devices]
+        return np.array([device.switch_state
+                         for device in self.switch_devices], dtype=np.int8)
+
+    def store_signals(self, start_signals, start_memory):
+        """Copy changed signals and D-type memories back to the devices."""
+        for slot in np.flatnonzero(self.signals != start_signals).tolist():
+            (device, output_id) = self.slots[slot]
+            device.outputs[output_id] = int(self.signals[slot])
+        for index in np.flatnonzero(
+                self.dtype_memory != start_memory).tolist():
+            self.dtype_devices[index].dtype_memory = int(
+                self.dtype_memory[index])
+
+    def update(self, slots, targets):
+        """Update the signals at slots towards targets.
+
+        Return True if any signal changed, or None if an update failed.
+        """
+        old_signals = self.signals[slots]
+        new_signals = self.update_table[old_signals, targets]
+        if (new_signals < 0).any():
+            return None
+        self.signals[slots] = new_signals
+        return bool((new_signals != old_signals).any())
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Network.update_clocks and Network.update_siggens must already have
+        been called for this cycle. Return True if successful and the
+        network does not oscillate.
+        """
+        devices = self.devices
+        network = self.network
+        switch_states = self.load_sources()
+        signals = self.signals
+        start_signals = signals.copy()
+        start_memory = self.dtype_memory.copy()
+
+        network.iterations = 0
+        while network.iterations < network.iteration_limit:
+            network.iterations += 1
+            changes = [self.update(self.switch_slots, switch_states)]
+
+            for (indices, clk_slots, set_slots, clear_slots, data_slots,
+                 q_slots, qbar_slots) in self.dtype_stages:
+                memory = self.dtype_memory[indices]
+                data = self.data_level[signals[data_slots]]
+                capture = (signals[clk_slots] == devices.RISING) & (
+                    data >= 0)
+                memory[capture] = data[capture]
+                memory[signals[set_slots] == devices.HIGH] = devices.HIGH
+                memory[signals[clear_slots] == devices.HIGH] = devices.LOW
+                self.dtype_memory[indices] = memory
+                changes.append(self.update(q_slots, memory))
+                changes.append(self.update(qbar_slots, 1 - memory))
+
+            # Complete clock and signal generator edges
+            changes.append(self.update(
+                self.timed_slots,
+                self.target_level[signals[self.timed_slots]]))
+
+            for (output_slots, input_matrix, padding, x_levels, y_levels,
+                 xor_mask) in self.gate_levels:
+                levels = self.target_level[signals[input_matrix]]
+                all_x = ((levels == x_levels) | padding).all(axis=1)
+                targets = np.where(all_x, y_levels, 1 - y_levels)
+                targets[xor_mask] = (levels[xor_mask, 0] !=
+                                     levels[xor_mask, 1])
+                changes.append(self.update(output_slots, targets))
+
+            if None in changes:
+                self.synchronised = False
+                return False
+            network.steady_state = not any(changes)
+            if network.steady_state:
+                break
+
+        self.store_signals(start_signals, start_memory)
+        return network.steady_state